@@ -0,0 +1,694 @@
+"""
+Incrementally maintained study analytics for Smart Study Orchestrator
+"""
+import atexit
+import bisect
+import math
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from config import Config
+from models import Analytics
+from storage import get_storage_backend
+from utils import thaw_json
+
+# Try to import NumPy for the columnar analytics engine
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    print("Warning: NumPy not installed. Columnar analytics disabled (pip install numpy).")
+
+AGGREGATE_METRICS = (
+    'sessions', 'minutes', 'focus_count', 'focus_sum', 'focus_sq_sum',
+    'goals', 'goals_completed', 'distractions', 'breaks'
+)
+
+def empty_bucket() -> Dict[str, float]:
+    return {metric: 0 for metric in AGGREGATE_METRICS}
+
+def parse_session_time(session: Dict[str, Any]) -> Optional[datetime]:
+    """Time a session is bucketed under (start time, or end time if it never started)"""
+    value = session.get('start_time') or session.get('end_time')
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+
+def session_contribution(session: Optional[Dict[str, Any]]) -> Optional[Dict[str, float]]:
+    """Metrics a completed session adds to each bucket, None if it isn't completed"""
+    if not session or not session.get('end_time'):
+        return None
+
+    focus = session.get('focus_score')
+    has_focus = bool(focus)  # unscored (0/None) sessions don't count towards focus averages
+    return {
+        'sessions': 1,
+        'minutes': session.get('duration_minutes') or 0,
+        'focus_count': 1 if has_focus else 0,
+        'focus_sum': focus if has_focus else 0,
+        'focus_sq_sum': focus * focus if has_focus else 0,
+        'goals': len(session.get('goals') or []),
+        'goals_completed': len(session.get('completed_goals') or []),
+        'distractions': session.get('distractions') or 0,
+        'breaks': session.get('breaks_taken') or 0
+    }
+
+# Rollup granularity -> aggregates section holding its buckets
+ROLLUP_SECTIONS = {
+    'hour': 'hours',
+    'day': 'days',
+    'week': 'weeks',
+    'month': 'months'
+}
+
+# Bumped whenever the persisted layout changes so stale files get rebuilt
+AGGREGATES_VERSION = 3
+
+# Part of the aggregates holding totals and subjects; each rollup section
+# is persisted in its own file next to it
+MAIN_PART = 'main'
+
+# Change in average focus between recent and earlier weeks that counts as a trend
+PRODUCTIVITY_TREND_THRESHOLD = 2.0
+
+def period_key(when: datetime, granularity: str) -> str:
+    """Rollup bucket key of a point in time; keys of one granularity sort chronologically"""
+    if granularity == 'hour':
+        return when.strftime('%Y-%m-%dT%H:00')
+    if granularity == 'day':
+        return when.strftime('%Y-%m-%d')
+    if granularity == 'week':
+        year, week, _ = when.isocalendar()
+        return f"{year}-W{week:02d}"
+    if granularity == 'month':
+        return when.strftime('%Y-%m')
+    raise ValueError(f"Unknown granularity: {granularity}")
+
+def describe_bucket(bucket: Optional[Dict[str, float]]) -> Dict[str, Any]:
+    """Derive display statistics from a raw aggregate bucket"""
+    bucket = bucket or empty_bucket()
+    sessions = bucket['sessions']
+    focus_count = bucket['focus_count']
+    avg_focus = bucket['focus_sum'] / focus_count if focus_count else 0
+    focus_variance = bucket['focus_sq_sum'] / focus_count - avg_focus ** 2 if focus_count else 0
+
+    return {
+        "total_sessions": sessions,
+        "total_hours": round(bucket['minutes'] / 60, 1),
+        "avg_focus": round(avg_focus, 1),
+        "focus_stddev": round(math.sqrt(max(0, focus_variance)), 1),
+        "avg_session_length": round(bucket['minutes'] / sessions, 1) if sessions else 0,
+        "total_goals_completed": bucket['goals_completed'],
+        "goal_completion_rate": round(bucket['goals_completed'] / bucket['goals'] * 100, 1) if bucket['goals'] else 0,
+        "total_distractions": bucket['distractions']
+    }
+
+class StudyAggregates:
+    """Running study totals updated in O(1) per session change.
+
+    Keeps overall and per-subject buckets of the completed session metrics
+    in AGGREGATE_METRICS, plus hour, day, ISO-week and month rollups; hour
+    buckets older than Config.ANALYTICS_HOUR_RETENTION_DAYS are dropped. A
+    change is applied by subtracting the old version of the session and
+    adding the new one, so ending (or re-ending) a session never rescans
+    the history.
+
+    Changes only mark the buckets dirty; a background flusher persists
+    them ``flush_delay`` seconds later, outside the session store's lock,
+    so a burst of changes costs one write. Totals and subjects live in
+    ``file_path`` and every rollup granularity in its own file
+    (analytics_aggregates.hours.json, ...), and a flush rewrites only the
+    parts that changed. ``flush`` writes synchronously
+    (also run at exit). Changes made just before a crash can be lost;
+    ``is_current(sessions)`` notices and ``rebuild`` recomputes the buckets.
+    ``clock`` (hour retention, current week) can be swapped for a fake.
+    """
+
+    def __init__(self, file_path: str = Config.ANALYTICS_AGGREGATES_FILE, backend=None,
+                 flush_delay: float = Config.ANALYTICS_FLUSH_DELAY_SECONDS,
+                 hour_retention_days: float = Config.ANALYTICS_HOUR_RETENTION_DAYS,
+                 clock: Callable[[], float] = time.time):
+        self.file_path = file_path
+        self.backend = backend or get_storage_backend()
+        self.flush_delay = flush_delay
+        self.hour_retention = timedelta(days=hour_retention_days)
+        self.clock = clock
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()  # one writer at a time
+        self._dirty: Set[str] = set()  # MAIN_PART and rollup sections with unsaved changes
+        self._dirty_event = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        self._sorted_keys: Dict[str, List[str]] = {}
+        self.saves = 0
+        self.data = self._load()
+
+    def _empty(self) -> Dict[str, Any]:
+        return {
+            "version": AGGREGATES_VERSION,
+            "totals": empty_bucket(),
+            "subjects": {},
+            "hours": {},
+            "days": {},
+            "weeks": {},
+            "months": {},
+            "updated_at": None
+        }
+
+    def _part_path(self, part: str) -> str:
+        """File of one persisted part (data/analytics_aggregates.hours.json, ...)"""
+        if part == MAIN_PART:
+            return self.file_path
+        base, ext = os.path.splitext(self.file_path)
+        return f"{base}.{part}{ext}"
+
+    def _load_part(self, part: str) -> Any:
+        try:
+            return self.backend.load(self._part_path(part))
+        except Exception as e:
+            print(f"Error loading analytics aggregates ({part}): {e}")
+            return None
+
+    def _load(self) -> Dict[str, Any]:
+        data = self._load_part(MAIN_PART)
+        if not isinstance(data, dict):
+            return self._empty()
+        data = thaw_json(data)
+        data.setdefault('version', 1)
+        if data['version'] == AGGREGATES_VERSION:
+            for section in ROLLUP_SECTIONS.values():
+                buckets = self._load_part(section)
+                data[section] = thaw_json(buckets) if isinstance(buckets, dict) else {}
+        for key, value in self._empty().items():
+            data.setdefault(key, value)
+        return data
+
+    def exists(self) -> bool:
+        return self.backend.exists(self.file_path)
+
+    def is_current(self, sessions: Optional[List[Dict[str, Any]]] = None) -> bool:
+        """True if the persisted buckets exist, use the current layout and
+        (given the session history) agree with its completed-session totals"""
+        if not (self.exists() and self.data.get('version') == AGGREGATES_VERSION):
+            return False
+        if sessions is None:
+            return True
+        expected = empty_bucket()
+        for session in sessions:
+            contribution = session_contribution(session)
+            if contribution:
+                expected['sessions'] += 1
+                expected['minutes'] += contribution['minutes']
+        totals = self.data['totals']
+        return totals['sessions'] == expected['sessions'] and totals['minutes'] == expected['minutes']
+
+    def _mark_dirty(self, parts):
+        """Schedule a flush of ``parts`` (lock held)"""
+        self._dirty.update(parts)
+        self._dirty_event.set()
+        if self._flusher is None or not self._flusher.is_alive():
+            self._flusher = threading.Thread(target=self._run_flusher, name='analytics-flusher', daemon=True)
+            self._flusher.start()
+            atexit.register(self.flush)
+
+    def _run_flusher(self):
+        while True:
+            self._dirty_event.wait()
+            time.sleep(self.flush_delay)  # let a burst of changes pile up
+            self.flush()
+
+    def _now(self) -> datetime:
+        return datetime.fromtimestamp(self.clock())
+
+    def _hour_cutoff(self) -> str:
+        """Oldest hour bucket key still kept"""
+        return period_key(self._now() - self.hour_retention, 'hour')
+
+    def _expire_hours(self):
+        cutoff = self._hour_cutoff()
+        keys = self._keys('hours')
+        stale = keys[:bisect.bisect_left(keys, cutoff)]
+        if stale:
+            for key in stale:
+                del self.data['hours'][key]
+            del keys[:len(stale)]
+            self._dirty.add('hours')
+
+    def flush(self):
+        """Persist unsaved changes now, rewriting only the parts that changed"""
+        with self._flush_lock:
+            with self._lock:
+                self._dirty_event.clear()
+                self._expire_hours()
+                dirty, self._dirty = self._dirty, set()
+                if not dirty:
+                    return
+                self.data['updated_at'] = self._now().isoformat()
+                snapshot = {}
+                for section in ROLLUP_SECTIONS.values():
+                    if section in dirty:
+                        snapshot[section] = {key: dict(bucket) for key, bucket in self.data[section].items()}
+                # Main part last: it carries the version that marks the files current
+                snapshot[MAIN_PART] = {
+                    "version": self.data['version'],
+                    "totals": dict(self.data['totals']),
+                    "subjects": {key: dict(bucket) for key, bucket in self.data['subjects'].items()},
+                    "updated_at": self.data['updated_at']
+                }
+            for part, data in snapshot.items():
+                try:
+                    self.backend.save(self._part_path(part), data)
+                    self.saves += 1
+                except Exception as e:
+                    print(f"Error saving analytics aggregates ({part}): {e}")
+                    with self._lock:
+                        self._mark_dirty([part])
+
+    def _bucket_keys(self, session: Dict[str, Any]) -> List[tuple]:
+        """(section, key) pairs of every bucket a session belongs to.
+
+        Hour buckets past the retention window are left out, both when a
+        session is added and when it is removed again.
+        """
+        keys = [('subjects', session.get('subject') or 'Unknown')]
+        when = parse_session_time(session)
+        if when:
+            for granularity, section in ROLLUP_SECTIONS.items():
+                key = period_key(when, granularity)
+                if granularity == 'hour' and key < self._hour_cutoff():
+                    continue
+                keys.append((section, key))
+        return keys
+
+    def _add(self, session: Dict[str, Any], sign: int):
+        contribution = session_contribution(session)
+        if contribution is None:
+            return
+        bucket_keys = self._bucket_keys(session)
+        buckets = [self.data['totals']]
+        for section, key in bucket_keys:
+            if key not in self.data[section]:
+                self.data[section][key] = empty_bucket()
+                self._sorted_keys.pop(section, None)
+            buckets.append(self.data[section][key])
+        for bucket in buckets:
+            for metric, value in contribution.items():
+                bucket[metric] += sign * value
+
+        if sign < 0:
+            # Drop buckets that became empty so removed history doesn't linger
+            for section, key in bucket_keys:
+                if self.data[section].get(key, {}).get('sessions', 0) <= 0:
+                    self.data[section].pop(key, None)
+                    self._sorted_keys.pop(section, None)
+        self._mark_dirty([MAIN_PART] + [section for section, _ in bucket_keys if section != 'subjects'])
+
+    # Session store listener interface
+
+    def session_changed(self, old: Optional[Dict[str, Any]], new: Dict[str, Any]):
+        """Apply one session change: remove the old version, add the new one"""
+        if session_contribution(old) is None and session_contribution(new) is None:
+            return
+        with self._lock:
+            if old:
+                self._add(old, -1)
+            self._add(new, 1)
+
+    def sessions_reset(self, sessions: List[Dict[str, Any]]):
+        self.rebuild(sessions)
+
+    def rebuild(self, sessions: List[Dict[str, Any]]):
+        """Recompute all buckets from the full session history"""
+        with self._lock:
+            self.data = self._empty()
+            self._sorted_keys.clear()
+            for session in sessions:
+                self._add(session, 1)
+            self._mark_dirty([MAIN_PART] + list(ROLLUP_SECTIONS.values()))
+
+    # Read API
+
+    def summary(self) -> Dict[str, Any]:
+        """Overall statistics (the analytics endpoint's weekly_stats block)"""
+        with self._lock:
+            stats = describe_bucket(self.data['totals'])
+        return {
+            "total_sessions": stats["total_sessions"],
+            "total_hours": stats["total_hours"],
+            "avg_focus": stats["avg_focus"],
+            "avg_session_length": stats["avg_session_length"],
+            "total_goals_completed": stats["total_goals_completed"]
+        }
+
+    def current_week(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        now = now or self._now()
+        with self._lock:
+            return describe_bucket(self.data['weeks'].get(period_key(now, 'week')))
+
+    def subject_performance(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {subject: describe_bucket(bucket) for subject, bucket in self.data['subjects'].items()}
+
+    def _keys(self, section: str) -> List[str]:
+        """Sorted bucket keys of a rollup section, cached until a bucket is added or dropped"""
+        keys = self._sorted_keys.get(section)
+        if keys is None:
+            keys = self._sorted_keys[section] = sorted(self.data[section])
+        return keys
+
+    def timeseries(self, granularity: str, start: Optional[datetime] = None,
+                   end: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Rollup rows of one granularity between start and end (inclusive), oldest first.
+
+        Only the buckets in range are read: a year of weekly history is
+        about 52 rows however many sessions it holds. Hour rows only go back
+        Config.ANALYTICS_HOUR_RETENTION_DAYS.
+        """
+        section = ROLLUP_SECTIONS.get(granularity)
+        if section is None:
+            raise ValueError(f"granularity must be one of: {', '.join(ROLLUP_SECTIONS)}")
+
+        with self._lock:
+            keys = self._keys(section)
+            lo = bisect.bisect_left(keys, period_key(start, granularity)) if start else 0
+            hi = bisect.bisect_right(keys, period_key(end, granularity)) if end else len(keys)
+            rows = []
+            for key in keys[lo:hi]:
+                bucket = self.data[section][key]
+                row = {"period": key}
+                row.update(describe_bucket(bucket))
+                row["total_minutes"] = bucket['minutes']
+                rows.append(row)
+            return rows
+
+    def productivity_trend(self, weeks: int = 4, now: Optional[datetime] = None) -> str:
+        """Compare average focus of the last ``weeks`` weeks with the ``weeks`` before"""
+        now = now or self._now()
+        with self._lock:
+            keys = self._keys('weeks')
+            hi = bisect.bisect_right(keys, period_key(now, 'week'))
+            recent = keys[max(0, hi - weeks):hi]
+            earlier = keys[max(0, hi - 2 * weeks):max(0, hi - weeks)]
+
+            def avg_focus(period_keys: List[str]) -> Optional[float]:
+                count = sum(self.data['weeks'][key]['focus_count'] for key in period_keys)
+                total = sum(self.data['weeks'][key]['focus_sum'] for key in period_keys)
+                return total / count if count else None
+
+            recent_focus, earlier_focus = avg_focus(recent), avg_focus(earlier)
+
+        if recent_focus is None or earlier_focus is None:
+            return "stable"
+        if recent_focus - earlier_focus > PRODUCTIVITY_TREND_THRESHOLD:
+            return "improving"
+        if earlier_focus - recent_focus > PRODUCTIVITY_TREND_THRESHOLD:
+            return "declining"
+        return "stable"
+
+    def overview(self, now: Optional[datetime] = None) -> Analytics:
+        """Headline analytics (models.Analytics) read from the rollups"""
+        with self._lock:
+            totals = describe_bucket(self.data['totals'])
+            subjects = self.subject_performance()
+            this_week = self.current_week(now)
+            trend = self.productivity_trend(now=now)
+            total_minutes = self.data['totals']['minutes']
+
+        best_subject = max(subjects, key=lambda name: (subjects[name]['avg_focus'], subjects[name]['total_sessions'])) if subjects else ""
+        return Analytics(
+            total_sessions=totals['total_sessions'],
+            total_study_time=total_minutes,
+            average_focus_score=totals['avg_focus'],
+            best_subject=best_subject,
+            productivity_trend=trend,
+            weekly_goal_completion=this_week['goal_completion_rate']
+        )
+
+# =============================================================================
+# COLUMNAR ANALYTICS ENGINE
+# =============================================================================
+
+TIME_SLOTS = (
+    ('night', 0, 6),
+    ('morning', 6, 12),
+    ('afternoon', 12, 18),
+    ('evening', 18, 24)
+)
+
+# Focus-score change per week below which the trend counts as stable
+TREND_THRESHOLD = 0.5
+
+SECONDS_PER_WEEK = 7 * 24 * 3600
+
+class SessionColumns:
+    """Columnar in-memory copy of completed sessions for vectorized analytics.
+
+    One NumPy array per metric (duration, focus score, distractions, breaks,
+    start epoch, start hour, subject code) with one row per completed
+    session. Rows are written in place as sessions change and the arrays
+    grow by doubling, so keeping the columns current is O(1) per change.
+    Computed results are cached until the next change.
+    """
+
+    COLUMNS = {
+        'duration': 'float64',
+        'focus': 'float64',        # NaN for unscored sessions
+        'distractions': 'float64',
+        'breaks': 'float64',
+        'start_epoch': 'float64',  # NaN if the session has no usable time
+        'hour': 'int16',           # -1 if the session has no usable time
+        'subject': 'int32',
+        'valid': 'bool'            # False for rows whose session is no longer completed
+    }
+
+    def __init__(self, capacity: int = 1024):
+        self._lock = threading.RLock()
+        self.built = False
+        self._reset(capacity)
+
+    def _reset(self, capacity: int):
+        self.size = 0
+        self.columns = {name: np.zeros(capacity, dtype=dtype) for name, dtype in self.COLUMNS.items()}
+        self.rows: Dict[str, int] = {}
+        self.subject_codes: Dict[str, int] = {}
+        self.subject_names: List[str] = []
+        self._cache: Dict[str, Any] = {}
+
+    def _grow(self):
+        capacity = max(1024, len(self.columns['valid']) * 2)
+        for name, column in self.columns.items():
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            self.columns[name] = grown
+
+    def _subject_code(self, subject: str) -> int:
+        code = self.subject_codes.get(subject)
+        if code is None:
+            code = self.subject_codes[subject] = len(self.subject_names)
+            self.subject_names.append(subject)
+        return code
+
+    def _set_row(self, session: Dict[str, Any]):
+        row = self.rows.get(session.get('id'))
+        if session_contribution(session) is None:
+            if row is not None:
+                self.columns['valid'][row] = False
+            return
+
+        if row is None:
+            if self.size == len(self.columns['valid']):
+                self._grow()
+            row = self.rows[session['id']] = self.size
+            self.size += 1
+
+        when = parse_session_time(session)
+        focus = session.get('focus_score')
+        columns = self.columns
+        columns['duration'][row] = session.get('duration_minutes') or 0
+        columns['focus'][row] = focus if focus else np.nan
+        columns['distractions'][row] = session.get('distractions') or 0
+        columns['breaks'][row] = session.get('breaks_taken') or 0
+        columns['start_epoch'][row] = when.timestamp() if when else np.nan
+        columns['hour'][row] = when.hour if when else -1
+        columns['subject'][row] = self._subject_code(session.get('subject') or 'Unknown')
+        columns['valid'][row] = True
+
+    # Session store listener interface
+
+    def session_changed(self, old: Optional[Dict[str, Any]], new: Dict[str, Any]):
+        if session_contribution(old) is None and session_contribution(new) is None:
+            return
+        with self._lock:
+            self._set_row(new)
+            self._cache.clear()
+
+    def sessions_reset(self, sessions: List[Dict[str, Any]]):
+        self.rebuild(sessions)
+
+    def rebuild(self, sessions: List[Dict[str, Any]]):
+        """Reload the columns from the full session history"""
+        with self._lock:
+            self._reset(max(1024, len(sessions)))
+            for session in sessions:
+                self._set_row(session)
+            self.built = True
+
+    # Vectorized analytics
+
+    def _view(self) -> Dict[str, Any]:
+        """Live rows of every column"""
+        valid = self.columns['valid'][:self.size]
+        return {name: column[:self.size][valid] for name, column in self.columns.items()}
+
+    def _cached(self, name: str, compute):
+        with self._lock:
+            if name not in self._cache:
+                self._cache[name] = compute(self._view())
+            return self._cache[name]
+
+    def subject_performance(self) -> Dict[str, Dict[str, Any]]:
+        """Per-subject sessions, hours, focus, distractions and share of study time"""
+        return self._cached('subject_performance', self._subject_performance)
+
+    def _subject_performance(self, view: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        codes = view['subject']
+        if not len(codes):
+            return {}
+        n = len(self.subject_names)
+        counts = np.bincount(codes, minlength=n)
+        minutes = np.bincount(codes, weights=view['duration'], minlength=n)
+        distractions = np.bincount(codes, weights=view['distractions'], minlength=n)
+        scored = ~np.isnan(view['focus'])
+        focus_counts = np.bincount(codes[scored], minlength=n)
+        focus_sums = np.bincount(codes[scored], weights=view['focus'][scored], minlength=n)
+        total_minutes = minutes.sum()
+
+        performance = {}
+        for code in np.nonzero(counts)[0]:
+            performance[self.subject_names[code]] = {
+                "total_sessions": int(counts[code]),
+                "total_hours": round(float(minutes[code]) / 60, 1),
+                "avg_focus": round(float(focus_sums[code] / focus_counts[code]), 1) if focus_counts[code] else 0,
+                "avg_distractions": round(float(distractions[code] / counts[code]), 2),
+                "share_of_time": round(float(minutes[code] / total_minutes) * 100, 1) if total_minutes else 0
+            }
+        return performance
+
+    def time_distribution(self) -> Dict[str, Any]:
+        """Study sessions and minutes by hour of day and time slot"""
+        return self._cached('time_distribution', self._time_distribution)
+
+    def _time_distribution(self, view: Dict[str, Any]) -> Dict[str, Any]:
+        known = view['hour'] >= 0
+        hours = view['hour'][known]
+        sessions_by_hour = np.bincount(hours, minlength=24)
+        minutes_by_hour = np.bincount(hours, weights=view['duration'][known], minlength=24)
+        scored = ~np.isnan(view['focus'][known])
+        focus_counts = np.bincount(hours[scored], minlength=24)
+        focus_sums = np.bincount(hours[scored], weights=view['focus'][known][scored], minlength=24)
+
+        slots = {}
+        for name, start, end in TIME_SLOTS:
+            slot_focus_count = focus_counts[start:end].sum()
+            slots[name] = {
+                "sessions": int(sessions_by_hour[start:end].sum()),
+                "minutes": float(minutes_by_hour[start:end].sum()),
+                "avg_focus": round(float(focus_sums[start:end].sum() / slot_focus_count), 1) if slot_focus_count else 0
+            }
+
+        return {
+            "by_time_slot": slots,
+            "sessions_by_hour": sessions_by_hour.tolist(),
+            "minutes_by_hour": np.round(minutes_by_hour, 1).tolist()
+        }
+
+    def productivity_patterns(self, window: int = 5) -> Dict[str, Any]:
+        """Best time slot, rolling focus average and weekly trend slopes"""
+        return self._cached(f'productivity_patterns:{window}',
+                            lambda view: self._productivity_patterns(view, window))
+
+    @staticmethod
+    def _slope_per_week(epochs, values) -> float:
+        if len(values) < 2 or np.ptp(epochs) == 0:
+            return 0.0
+        return float(np.polyfit(epochs / SECONDS_PER_WEEK, values, 1)[0])
+
+    def _productivity_patterns(self, view: Dict[str, Any], window: int) -> Dict[str, Any]:
+        slots = self._time_distribution(view)['by_time_slot']
+        scored_slots = {name: slot for name, slot in slots.items() if slot['avg_focus']}
+        best_time_slot = max(scored_slots, key=lambda name: scored_slots[name]['avg_focus']) if scored_slots else "morning"
+
+        timed = ~np.isnan(view['start_epoch'])
+        order = np.argsort(view['start_epoch'][timed], kind='stable')
+        epochs = view['start_epoch'][timed][order]
+        durations = view['duration'][timed][order]
+        focus = view['focus'][timed][order]
+        scored = ~np.isnan(focus)
+
+        focus_series = focus[scored]
+        rolling = []
+        if len(focus_series):
+            width = min(window, len(focus_series))
+            rolling = np.convolve(focus_series, np.ones(width) / width, mode='valid')[-10:]
+
+        focus_slope = self._slope_per_week(epochs[scored], focus_series)
+        duration_slope = self._slope_per_week(epochs, durations)
+        if focus_slope > TREND_THRESHOLD:
+            trend = "improving"
+        elif focus_slope < -TREND_THRESHOLD:
+            trend = "declining"
+        else:
+            trend = "stable"
+
+        return {
+            "best_time_slot": best_time_slot,
+            "focus_rolling_average": [round(float(v), 1) for v in rolling],
+            "focus_trend_per_week": round(focus_slope, 2),
+            "duration_trend_per_week": round(duration_slope, 2),
+            "productivity_trend": trend
+        }
+
+_session_columns: Optional[SessionColumns] = None
+_session_columns_lock = threading.Lock()
+
+def get_session_columns() -> Optional[SessionColumns]:
+    """Return the process-wide columnar engine, or None without NumPy"""
+    global _session_columns
+    if not NUMPY_AVAILABLE:
+        return None
+    with _session_columns_lock:
+        if _session_columns is None:
+            _session_columns = SessionColumns()
+        return _session_columns
+
+_study_aggregates: Optional[StudyAggregates] = None
+_study_aggregates_lock = threading.Lock()
+
+def get_study_aggregates() -> StudyAggregates:
+    """Return the process-wide analytics aggregates"""
+    global _study_aggregates
+    with _study_aggregates_lock:
+        if _study_aggregates is None:
+            _study_aggregates = StudyAggregates()
+        return _study_aggregates
+
+if __name__ == '__main__':
+    import argparse
+    from storage import get_session_store
+
+    parser = argparse.ArgumentParser(description="Smart Study Orchestrator analytics tools")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('rebuild', help="Recompute the analytics aggregates from all sessions")
+    args = parser.parse_args()
+
+    if args.command == 'rebuild':
+        aggregates = get_study_aggregates()
+        aggregates.rebuild(get_session_store().all())
+        aggregates.flush()
+        print(f"✅ Rebuilt analytics aggregates: {aggregates.summary()}")
@@ -1,14 +1,19 @@
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, request, jsonify, render_template, Response, stream_with_context
 from flask_cors import CORS
 from datetime import datetime, timedelta
-import asyncio
 import json
 import uuid
 import os
 
 from config import Config
 from models import StudySession, StudyPlan
-from utils import load_json_data, save_json_data, initialize_data_files
+from utils import load_json_document, save_json_data, initialize_data_files, iter_ndjson, iter_csv, gzip_chunks, format_sse
+from storage import get_session_store, encode_cursor, decode_cursor
+from analytics import get_study_aggregates, get_session_columns
+from insights import InsightsPrecomputer
+from async_bridge import get_async_bridge
+from calendar_index import event_timestamp
+from block_leases import DEFAULT_HOLDER
 from flask_cors import CORS
 # Add this after the imports and before create_app()
 import sys
@@ -44,7 +49,87 @@ def warn_about_permissions():
         return True
 
 
-def create_app():
+SESSION_EXPORT_COLUMNS = [
+    'id', 'subject', 'duration_minutes', 'start_time', 'end_time', 'goals',
+    'completed_goals', 'focus_score', 'notes', 'distractions', 'breaks_taken'
+]
+
+EVENT_EXPORT_COLUMNS = [
+    'id', 'title', 'description', 'start_time', 'end_time', 'duration_minutes',
+    'event_type', 'status', 'created_at', 'google_calendar_id', 'google_calendar_link'
+]
+
+def export_response(records, columns, basename):
+    """Stream records as NDJSON or CSV (?format=), gzip-compressed if the client accepts it"""
+    export_format = request.args.get('format', 'ndjson')
+    if export_format == 'ndjson':
+        chunks = iter_ndjson(records)
+        mimetype = 'application/x-ndjson'
+    elif export_format == 'csv':
+        chunks = iter_csv(records, columns)
+        mimetype = 'text/csv'
+    else:
+        return jsonify({"error": "format must be 'ndjson' or 'csv'"}), 400
+    
+    headers = {
+        'Content-Disposition': f'attachment; filename={basename}.{export_format}',
+        'Vary': 'Accept-Encoding'
+    }
+    if request.accept_encodings['gzip']:
+        chunks = gzip_chunks(chunks)
+        headers['Content-Encoding'] = 'gzip'
+    
+    return Response(stream_with_context(chunks), mimetype=mimetype, headers=headers)
+
+def parse_event_range(args):
+    """(start, end) timestamps from ?from=&to= (ISO dates or datetimes), None where absent.
+
+    Both ends are inclusive: a date-only ``to`` runs to the end of that day,
+    as in /api/study/analytics/timeseries.
+    """
+    bounds = []
+    for name in ('from', 'to'):
+        value = args.get(name)
+        if not value:
+            bounds.append(None)
+            continue
+        timestamp = event_timestamp(value)
+        if timestamp is None:
+            raise ValueError(f"{name} must be an ISO date or datetime")
+        if name == 'to' and len(value) == 10:
+            timestamp = (datetime.fromisoformat(value) + timedelta(days=1)).timestamp() - 1e-6
+        bounds.append(timestamp)
+    return tuple(bounds)
+
+def build_study_analytics(study_analyzer, insights_precomputer):
+    """Analytics payload of GET /api/study/analytics (shared with the ASGI app)"""
+    # Generate analytics from the running aggregates
+    analytics = study_analyzer.generate_analytics()
+    
+    # Latest precomputed AI insights (never waits on the LLM)
+    latest_insights = insights_precomputer.latest()
+    ai_insights = latest_insights["insights"]
+    
+    # Combine analytics
+    return {
+        "weekly_stats": analytics.get("weekly_stats", {}),
+        "this_week": analytics.get("this_week", {}),
+        "subject_performance": analytics.get("subject_performance", {}),
+        "productivity_patterns": analytics.get("productivity_patterns", {}),
+        "time_distribution": analytics.get("time_distribution", {}),
+        "overview": analytics.get("overview", {}),
+        "productivity_trends": ai_insights.get("productivity_trends", {}),
+        "recommendations": ai_insights.get("recommendations", {}),
+        "focus_insights": ai_insights.get("focus_insights", {}),
+        "ai_mode": ai_insights.get("ai_mode"),
+        "insights_version": latest_insights["version"],
+        "computed_at": latest_insights["computed_at"],
+        "stale": latest_insights["stale"]
+    }
+
+def create_app(start_workers: bool = True):
+    """Flask app with its services; ``start_workers=False`` skips the
+    background threads (for a process that will not serve requests)"""
     app = Flask(__name__)
     CORS(app)
     app.config.from_object(Config)
@@ -59,12 +144,45 @@ def create_app():
     initialize_data_files()
     
     # Import and initialize services AFTER app creation
-    from services import GroqService, StudyAnalyzer, CalendarService, mcp_service
+    from services import GroqService, AsyncGroqService, StudyAnalyzer, CalendarService, mcp_service
     
     # Create service instances
+    session_store = get_session_store()
+    async_bridge = get_async_bridge()
+    study_aggregates = get_study_aggregates()
+    if not study_aggregates.is_current(session_store.all()):
+        study_aggregates.rebuild(session_store.all())
+    session_store.add_listener(study_aggregates)
+    session_columns = get_session_columns()
+    if session_columns is not None:
+        if not session_columns.built:
+            session_columns.rebuild(session_store.all())
+        session_store.add_listener(session_columns)
+    
     groq_service = GroqService()
-    study_analyzer = StudyAnalyzer()
+    # Coalesces identical in-flight LLM requests; runs on the shared event loop
+    async_groq_service = AsyncGroqService(groq_service)
+    study_analyzer = StudyAnalyzer(aggregates=study_aggregates, columns=session_columns)
     calendar_service = CalendarService()
+    # Keeps the local Google Calendar mirror current in the background
+    if start_workers:
+        calendar_service.google_mirror.start()
+    
+    # AI insights are computed in the background whenever a session ends
+    insights_precomputer = InsightsPrecomputer(groq_service, session_store)
+    session_store.add_listener(insights_precomputer)
+    if start_workers:
+        insights_precomputer.start()
+    
+    # Service instances, for entry points that serve routes outside Flask (asgi.py)
+    app.extensions['study_orchestrator'] = {
+        "session_store": session_store,
+        "groq_service": groq_service,
+        "study_analyzer": study_analyzer,
+        "calendar_service": calendar_service,
+        "insights_precomputer": insights_precomputer,
+        "mcp_service": mcp_service
+    }
     
     # Root route for testing
     @app.route('/')
@@ -94,6 +212,11 @@ def create_app():
             "mcp_connected": mcp_service.connected,
             "mock_mode": getattr(mcp_service, 'mock_mode', False),
             "groq_available": groq_service.groq_available,
+            "llm_cache": groq_service.cache.stats(),
+            "groq_requests": async_groq_service.stats(),
+            "groq_circuit": groq_service.breaker.stats(),
+            "google_calendar_sync": calendar_service.google_mirror.stats(),
+            "website_blocks": mcp_service.website_blocker.stats(),
             "timestamp": datetime.now().isoformat()
         })
     
@@ -122,13 +245,17 @@ def create_app():
         return jsonify({
             "message": "Study routes are working!",
             "available_endpoints": [
-                "GET /api/study/sessions",
+                "GET /api/study/sessions?limit=&cursor=&fields=&subject=&since=&until=",
+                "GET /api/study/sessions/export?format=ndjson|csv",
                 "POST /api/study/session", 
                 "POST /api/study/session/<id>/start",
                 "POST /api/study/session/<id>/end",
                 "POST /api/study/plan",
+                "GET /api/study/plan/stream?subject=&duration=&goals=",
                 "GET /api/study/analytics",
+                "GET /api/study/analytics/timeseries?granularity=hour|day|week|month&from=&to=",
                 "POST /api/study/block-websites",
+                "GET /api/study/blocked?host=",
                 "GET /api/study/session/<id>",
                 "GET|POST /api/study/preferences"
             ]
@@ -136,10 +263,73 @@ def create_app():
     
     @app.route('/api/study/sessions', methods=['GET'])
     def get_study_sessions():
-        """Get all study sessions"""
+        """Get study sessions, optionally filtered, projected and paginated.
+
+        Query parameters: limit, cursor, order (asc|desc), fields (comma
+        separated), subject, since and until (ISO start_time bounds). Without
+        limit/cursor the full (filtered) list is returned as before; with
+        them the response is a page with a next_cursor.
+        """
         try:
-            sessions_data = load_json_data(Config.STUDY_SESSIONS_FILE)
-            return jsonify(sessions_data), 200
+            args = request.args
+            if not any(key in args for key in ('limit', 'cursor', 'order', 'fields', 'subject', 'since', 'until')):
+                return jsonify(session_store.all()), 200
+            
+            paginated = 'limit' in args or 'cursor' in args
+            limit = None
+            if paginated:
+                try:
+                    limit = int(args.get('limit', Config.SESSIONS_PAGE_MAX_LIMIT))
+                except ValueError:
+                    return jsonify({"error": "limit must be an integer"}), 400
+                if not 1 <= limit <= Config.SESSIONS_PAGE_MAX_LIMIT:
+                    return jsonify({"error": f"limit must be between 1 and {Config.SESSIONS_PAGE_MAX_LIMIT}"}), 400
+            
+            cursor = None
+            if args.get('cursor'):
+                try:
+                    cursor = decode_cursor(args['cursor'])
+                except ValueError as e:
+                    return jsonify({"error": str(e)}), 400
+            
+            order = args.get('order', 'asc')
+            if order not in ('asc', 'desc'):
+                return jsonify({"error": "order must be 'asc' or 'desc'"}), 400
+            
+            sessions, next_key = session_store.page(
+                limit=limit,
+                cursor=cursor,
+                subject=args.get('subject'),
+                since=args.get('since'),
+                until=args.get('until'),
+                descending=order == 'desc'
+            )
+            
+            fields = [f.strip() for f in args.get('fields', '').split(',') if f.strip()]
+            if fields:
+                sessions = [{f: s[f] for f in fields if f in s} for s in sessions]
+            
+            if not paginated:
+                return jsonify(sessions), 200
+            
+            return jsonify({
+                "sessions": sessions,
+                "count": len(sessions),
+                "next_cursor": encode_cursor(next_key) if next_key else None
+            }), 200
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+    @app.route('/api/study/sessions/export', methods=['GET'])
+    def export_study_sessions():
+        """Stream study sessions as NDJSON or CSV (subject/since/until filters supported)"""
+        try:
+            sessions, _ = session_store.page(
+                subject=request.args.get('subject'),
+                since=request.args.get('since'),
+                until=request.args.get('until')
+            )
+            return export_response(sessions, SESSION_EXPORT_COLUMNS, 'study_sessions')
         except Exception as e:
             return jsonify({"error": str(e)}), 500
 
@@ -165,12 +355,8 @@ def create_app():
                 breaks_taken=0
             )
             
-            # Load existing sessions
-            sessions_data = load_json_data(Config.STUDY_SESSIONS_FILE)
-            sessions_data.append(session.to_dict())
-            
-            # Save updated sessions
-            save_json_data(Config.STUDY_SESSIONS_FILE, sessions_data)
+            # Save new session
+            session_store.create(session.to_dict())
             
             return jsonify(session.to_dict()), 201
             
@@ -181,22 +367,11 @@ def create_app():
     def start_study_session(session_id):
         """Start a study session"""
         try:
-            # Load sessions
-            sessions_data = load_json_data(Config.STUDY_SESSIONS_FILE)
-            
             # Find and update session
-            session_found = False
-            for session_dict in sessions_data:
-                if session_dict['id'] == session_id:
-                    session_dict['start_time'] = datetime.now().isoformat()
-                    session_found = True
-                    break
-            
-            if not session_found:
-                return jsonify({"error": "Session not found"}), 404
+            session = session_store.update(session_id, start_time=datetime.now().isoformat())
             
-            # Save updated sessions
-            save_json_data(Config.STUDY_SESSIONS_FILE, sessions_data)
+            if session is None:
+                return jsonify({"error": "Session not found"}), 404
             
             return jsonify({"message": "Session started successfully", "session_id": session_id}), 200
             
@@ -209,27 +384,19 @@ def create_app():
         try:
             data = request.get_json()
             
-            # Load sessions
-            sessions_data = load_json_data(Config.STUDY_SESSIONS_FILE)
-            
             # Find and update session
-            session_found = False
-            for session_dict in sessions_data:
-                if session_dict['id'] == session_id:
-                    session_dict['end_time'] = datetime.now().isoformat()
-                    session_dict['completed_goals'] = data.get('completed_goals', [])
-                    session_dict['focus_score'] = data.get('focus_score', 0)
-                    session_dict['notes'] = data.get('notes', '')
-                    session_dict['distractions'] = data.get('distractions', 0)
-                    session_dict['breaks_taken'] = data.get('breaks_taken', 0)
-                    session_found = True
-                    break
-            
-            if not session_found:
-                return jsonify({"error": "Session not found"}), 404
+            session = session_store.update(
+                session_id,
+                end_time=datetime.now().isoformat(),
+                completed_goals=data.get('completed_goals', []),
+                focus_score=data.get('focus_score', 0),
+                notes=data.get('notes', ''),
+                distractions=data.get('distractions', 0),
+                breaks_taken=data.get('breaks_taken', 0)
+            )
             
-            # Save updated sessions
-            save_json_data(Config.STUDY_SESSIONS_FILE, sessions_data)
+            if session is None:
+                return jsonify({"error": "Session not found"}), 404
             
             return jsonify({"message": "Session ended successfully", "session_id": session_id}), 200
             
@@ -249,40 +416,90 @@ def create_app():
             if not subject:
                 return jsonify({"error": "Subject is required"}), 400
             
-            # Generate plan using Groq AI
-            plan = groq_service.generate_study_plan(subject, duration, goals)
+            # Generate plan using Groq AI (identical concurrent requests share one call)
+            plan = async_bridge.run(
+                async_groq_service.generate_study_plan(subject, duration, goals),
+                timeout=Config.MCP_CALL_TIMEOUT
+            )
             
             return jsonify(plan), 200
             
         except Exception as e:
             return jsonify({"error": str(e)}), 500
 
+    @app.route('/api/study/plan/stream', methods=['GET'])
+    def stream_study_plan():
+        """Stream an AI study plan as Server-Sent Events.
+
+        Query parameters: subject, duration (minutes) and goals (comma
+        separated). Events: meta (ai_mode), block (one per study block, sent
+        as soon as it is parsed), plan (the complete plan) and error.
+        """
+        subject = request.args.get('subject', '')
+        if not subject:
+            return jsonify({"error": "Subject is required"}), 400
+        try:
+            duration = int(request.args.get('duration', Config.DEFAULT_STUDY_DURATION))
+        except ValueError:
+            return jsonify({"error": "duration must be an integer"}), 400
+        goals = [goal.strip() for goal in request.args.get('goals', '').split(',') if goal.strip()]
+        
+        def events():
+            try:
+                for event, data in groq_service.stream_study_plan(subject, duration, goals):
+                    yield format_sse(event, data)
+            except Exception as e:
+                yield format_sse("error", {"error": str(e)})
+        
+        headers = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        return Response(stream_with_context(events()), mimetype='text/event-stream', headers=headers)
+
     @app.route('/api/study/analytics', methods=['GET'])
     def get_study_analytics():
         """Get study analytics and insights"""
         try:
-            # Load sessions
-            sessions_data = load_json_data(Config.STUDY_SESSIONS_FILE)
-            
-            # Generate analytics
-            analytics = study_analyzer.generate_analytics(sessions_data)
-            
-            # Get AI insights
-            ai_insights = groq_service.analyze_study_pattern(sessions_data)
-            
-            # Combine analytics
-            result = {
-                "weekly_stats": analytics.get("weekly_stats", {}),
-                "productivity_trends": ai_insights.get("productivity_trends", {}),
-                "recommendations": ai_insights.get("recommendations", {}),
-                "focus_insights": ai_insights.get("focus_insights", {})
-            }
-            
+            result = build_study_analytics(study_analyzer, insights_precomputer)
             return jsonify(result), 200
             
         except Exception as e:
             return jsonify({"error": str(e)}), 500
 
+    @app.route('/api/study/analytics/timeseries', methods=['GET'])
+    def get_study_timeseries():
+        """Study minutes, focus and distractions per hour, day, week or month.
+
+        Query parameters: granularity (default week), from and to (ISO
+        dates or datetimes, inclusive). Rows come from the rollups kept by
+        the session store, oldest first.
+        """
+        try:
+            granularity = request.args.get('granularity', 'week')
+            bounds = {}
+            for name in ('from', 'to'):
+                value = request.args.get(name)
+                if not value:
+                    bounds[name] = None
+                    continue
+                try:
+                    bounds[name] = datetime.fromisoformat(value)
+                except ValueError:
+                    return jsonify({"error": f"{name} must be an ISO date or datetime"}), 400
+            
+            try:
+                rows = study_aggregates.timeseries(granularity, bounds['from'], bounds['to'])
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            
+            return jsonify({
+                "granularity": granularity,
+                "from": request.args.get('from'),
+                "to": request.args.get('to'),
+                "series": rows,
+                "count": len(rows)
+            }), 200
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
     @app.route('/api/study/block-websites', methods=['POST'])
     def block_websites():
         """Block distracting websites using MCP"""
@@ -290,6 +507,9 @@ def create_app():
             data = request.get_json()
             websites = data.get('websites', [])
             duration = data.get('duration', Config.DEFAULT_STUDY_DURATION)
+            # Whoever holds the block (a session or user id); overlapping
+            # blocks from different holders are counted separately
+            holder = data.get('holder') or DEFAULT_HOLDER
             
             if not websites:
                 return jsonify({"error": "No websites specified"}), 400
@@ -298,12 +518,10 @@ def create_app():
             if mcp_service.connected:
                 # Run async function in sync context
                 try:
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    result = loop.run_until_complete(
-                        mcp_service.block_distracting_websites(websites, duration)
+                    result = async_bridge.run(
+                        mcp_service.block_distracting_websites(websites, duration, holder),
+                        timeout=Config.MCP_CALL_TIMEOUT
                     )
-                    loop.close()
                     return jsonify(result), 200
                 except Exception as e:
                     # Fallback to mock response
@@ -323,22 +541,33 @@ def create_app():
             
         except Exception as e:
             return jsonify({"error": str(e)}), 500
+
+    @app.route('/api/study/blocked', methods=['GET'])
+    def is_website_blocked():
+        """Check whether a host is currently blocked (?host=m.youtube.com)"""
+        host = request.args.get('host', '')
+        if not host:
+            return jsonify({"error": "host is required"}), 400
+        try:
+            return jsonify({"host": host, "blocked": mcp_service.website_blocker.is_blocked(host)}), 200
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
     @app.route('/api/study/unblock-websites', methods=['POST'])
     def unblock_websites():
-        """Unblock all websites using MCP"""
+        """Unblock all websites using MCP (only one holder's blocks if "holder" is given)"""
         try:
             print("🔓 Unblocking all websites...")
+            holder = (request.get_json(silent=True) or {}).get('holder')
             
             # Use MCP service to unblock websites
             if mcp_service.connected:
                 # Run async function in sync context
                 try:
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    result = loop.run_until_complete(
-                        mcp_service.unblock_websites()
+                    result = async_bridge.run(
+                        mcp_service.unblock_websites(holder),
+                        timeout=Config.MCP_CALL_TIMEOUT
                     )
-                    loop.close()
                     return jsonify(result), 200
                 except Exception as e:
                     print(f"Error during unblocking: {e}")
@@ -361,11 +590,9 @@ def create_app():
     def get_study_session(session_id):
         """Get specific study session"""
         try:
-            sessions_data = load_json_data(Config.STUDY_SESSIONS_FILE)
-            
-            for session in sessions_data:
-                if session['id'] == session_id:
-                    return jsonify(session), 200
+            session = session_store.get(session_id)
+            if session:
+                return jsonify(session), 200
             
             return jsonify({"error": "Session not found"}), 404
             
@@ -377,7 +604,7 @@ def create_app():
         """Get or update user preferences"""
         try:
             if request.method == 'GET':
-                preferences = load_json_data(Config.USER_PREFERENCES_FILE)
+                preferences = load_json_document(Config.USER_PREFERENCES_FILE)
                 return jsonify(preferences), 200
             
             elif request.method == 'POST':
@@ -398,24 +625,40 @@ def create_app():
         return jsonify({
             "message": "Calendar routes are working!",
             "available_endpoints": [
-                "GET /api/calendar/events",
+                "GET /api/calendar/events?date=&from=&to=",
+                "GET /api/calendar/events/export?format=ndjson|csv",
                 "POST /api/calendar/event",
                 "GET|PUT|DELETE /api/calendar/event/<id>",
                 "POST /api/calendar/schedule-break",
+                "POST /api/calendar/schedule-series",
                 "POST /api/calendar/sync"
             ]
         })
     
     @app.route('/api/calendar/events', methods=['GET'])
     def get_calendar_events():
-        """Get calendar events"""
+        """Get calendar events, optionally only those overlapping a date (YYYY-MM-DD) or from/to range (inclusive)"""
         try:
             date = request.args.get('date')  # Optional date filter
-            events = calendar_service.get_events(date)
+            try:
+                start, end = parse_event_range(request.args)
+                if date:
+                    calendar_service.day_range(date)
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            events = calendar_service.get_events(date, start=start, end=end)
             return jsonify(events), 200
         except Exception as e:
             return jsonify({"error": str(e)}), 500
 
+    @app.route('/api/calendar/events/export', methods=['GET'])
+    def export_calendar_events():
+        """Stream local calendar events as NDJSON or CSV"""
+        try:
+            return export_response(list(calendar_service.events), EVENT_EXPORT_COLUMNS, 'calendar_events')
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
     @app.route('/api/calendar/event', methods=['POST'])
     def create_calendar_event():
         """Create a new calendar event"""
@@ -436,12 +679,10 @@ def create_app():
             # Create event using MCP service
             if mcp_service.connected:
                 try:
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    result = loop.run_until_complete(
-                        mcp_service.create_calendar_event(title, start_time, duration)
+                    result = async_bridge.run(
+                        mcp_service.create_calendar_event(title, start_time, duration),
+                        timeout=Config.MCP_CALL_TIMEOUT
                     )
-                    loop.close()
                     
                     if result.get('success'):
                         return jsonify({
@@ -515,11 +756,37 @@ def create_app():
         except Exception as e:
             return jsonify({"error": str(e)}), 500
 
+    @app.route('/api/calendar/schedule-series', methods=['POST'])
+    def schedule_study_series():
+        """Schedule a run of Pomodoro cycles (study blocks and breaks) in one go"""
+        try:
+            data = request.get_json() or {}
+            
+            cycles = data.get('cycles', Config.POMODOROS_BEFORE_LONG_BREAK)
+            if not isinstance(cycles, int) or not 1 <= cycles <= Config.MAX_SERIES_CYCLES:
+                return jsonify({"error": f"cycles must be between 1 and {Config.MAX_SERIES_CYCLES}"}), 400
+            
+            start_time = data.get('start_time', datetime.now().isoformat())
+            durations = {
+                "study_duration": data.get('study_duration', Config.DEFAULT_STUDY_DURATION),
+                "break_duration": data.get('break_duration', Config.DEFAULT_BREAK_DURATION),
+                "long_break_duration": data.get('long_break_duration', Config.LONG_BREAK_DURATION),
+                "long_break_every": data.get('long_break_every', Config.POMODOROS_BEFORE_LONG_BREAK)
+            }
+            
+            result = calendar_service.schedule_series(start_time, cycles, **durations)
+            
+            return jsonify(result), 201 if result.get("success") else 400
+            
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
     @app.route('/api/calendar/sync', methods=['POST'])
     def sync_calendar():
-        """Sync with external calendar services"""
+        """Sync with external calendar services (?full=true rebuilds the mirror)"""
         try:
-            result = calendar_service.sync_external_calendar()
+            full = request.args.get('full', 'false').lower() == 'true'
+            result = calendar_service.sync_external_calendar(full=full)
             return jsonify(result), 200
         except Exception as e:
             return jsonify({"error": str(e)}), 500
@@ -0,0 +1,200 @@
+"""
+ASGI entry point for Smart Study Orchestrator
+
+Run with an ASGI server instead of run.py's development server:
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+
+The I/O-bound routes are served by native async handlers on the server's
+event loop, so slow Groq, MCP and calendar calls wait concurrently instead
+of each holding a worker thread. Every other route falls through to the
+Flask app unchanged.
+"""
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Tuple
+from urllib.parse import parse_qs
+
+from app import create_app, build_study_analytics, parse_event_range
+from config import Config
+from block_leases import DEFAULT_HOLDER
+from services import AsyncGroqService
+
+try:
+    from asgiref.wsgi import WsgiToAsgi
+    ASGIREF_AVAILABLE = True
+except ImportError:
+    ASGIREF_AVAILABLE = False
+    print("Warning: asgiref not installed. Only the native async routes are served (pip install asgiref).")
+
+class StudyOrchestratorASGI:
+    """ASGI application: native async routes first, then the Flask app"""
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.services = flask_app.extensions['study_orchestrator']
+        self.wsgi_app = WsgiToAsgi(flask_app) if ASGIREF_AVAILABLE else None
+        # Services without an async API (calendar store) run here
+        self.executor = ThreadPoolExecutor(max_workers=Config.ASGI_BLOCKING_THREADS, thread_name_prefix='asgi-blocking')
+        # Own instance: its semaphore and in-flight map belong to the server's loop
+        self.async_groq_service = AsyncGroqService(self.services['groq_service'])
+        self.routes = {
+            ('GET', '/api/study/analytics'): self.study_analytics,
+            ('GET', '/api/calendar/events'): self.calendar_events,
+            ('POST', '/api/study/plan'): self.study_plan,
+            ('POST', '/api/study/block-websites'): self.block_websites,
+            ('POST', '/api/study/unblock-websites'): self.unblock_websites
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+            return
+
+        if scope['type'] == 'http':
+            handler = self.routes.get((scope['method'], scope['path']))
+            if handler is not None:
+                await self.dispatch(handler, scope, receive, send)
+                return
+
+        if self.wsgi_app is None:
+            await self.send_json(scope, send, 404, {"error": "Not found"})
+            return
+        await self.wsgi_app(scope, receive, send)
+
+    async def lifespan(self, receive, send):
+        mcp_service = self.services['mcp_service']
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                try:
+                    await mcp_service.initialize_connections()
+                except Exception as e:
+                    print(f"Warning: MCP services failed to initialize: {e}")
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await mcp_service.close_connections()
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    # Request/response plumbing
+
+    async def run_blocking(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    @staticmethod
+    async def read_body(receive) -> bytes:
+        body = b''
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get('body', b'')
+            more_body = message.get('more_body', False)
+        return body
+
+    async def dispatch(self, handler, scope, receive, send):
+        query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+        args = {key: values[0] for key, values in query.items()}
+        body = await self.read_body(receive)
+        try:
+            data = json.loads(body) if body else {}
+        except ValueError:
+            await self.send_json(scope, send, 400, {"error": "Request body must be JSON"})
+            return
+
+        try:
+            status, payload = await handler(args, data)
+        except Exception as e:
+            status, payload = 500, {"error": str(e)}
+        await self.send_json(scope, send, status, payload)
+
+    async def send_json(self, scope, send, status: int, payload: Any):
+        body = self.flask_app.json.dumps(payload).encode('utf-8')
+        headers = [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode())
+        ]
+        origin = dict(scope.get('headers', [])).get(b'origin', b'').decode('latin-1')
+        if origin in Config.CORS_ORIGINS:
+            headers.append((b'access-control-allow-origin', origin.encode('latin-1')))
+            headers.append((b'vary', b'Origin'))
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': body})
+
+    # Native async routes (same payloads as the Flask routes in app.py)
+
+    async def study_analytics(self, args: Dict[str, str], data: Dict[str, Any]) -> Tuple[int, Any]:
+        # No I/O, but it takes the aggregate/column locks and may recompute
+        # the NumPy columns: keep that off the event loop
+        analytics = await self.run_blocking(build_study_analytics, self.services['study_analyzer'],
+                                            self.services['insights_precomputer'])
+        return 200, analytics
+
+    async def calendar_events(self, args: Dict[str, str], data: Dict[str, Any]) -> Tuple[int, Any]:
+        calendar_service = self.services['calendar_service']
+        date = args.get('date')
+        try:
+            start, end = parse_event_range(args)
+            if date:
+                calendar_service.day_range(date)
+        except ValueError as e:
+            return 400, {"error": str(e)}
+        events = await self.run_blocking(calendar_service.get_events, date, start, end)
+        return 200, events
+
+    async def study_plan(self, args: Dict[str, str], data: Dict[str, Any]) -> Tuple[int, Any]:
+        subject = data.get('subject', '')
+        duration = data.get('duration', Config.DEFAULT_STUDY_DURATION)
+        goals = data.get('goals', [])
+        if not subject:
+            return 400, {"error": "Subject is required"}
+
+        plan = await self.async_groq_service.generate_study_plan(subject, duration, goals)
+        return 200, plan
+
+    async def block_websites(self, args: Dict[str, str], data: Dict[str, Any]) -> Tuple[int, Any]:
+        websites = data.get('websites', [])
+        duration = data.get('duration', Config.DEFAULT_STUDY_DURATION)
+        holder = data.get('holder') or DEFAULT_HOLDER
+        if not websites:
+            return 400, {"error": "No websites specified"}
+
+        mcp_service = self.services['mcp_service']
+        mock_result = {
+            "success": True,
+            "blocked_count": len(websites),
+            "message": f"Mock blocking {len(websites)} websites",
+            "mock_mode": True
+        }
+        if not mcp_service.connected:
+            return 200, mock_result
+        try:
+            result = await asyncio.wait_for(
+                mcp_service.block_distracting_websites(websites, duration, holder), Config.MCP_CALL_TIMEOUT)
+            return 200, result
+        except Exception:
+            return 200, mock_result
+
+    async def unblock_websites(self, args: Dict[str, str], data: Dict[str, Any]) -> Tuple[int, Any]:
+        print("🔓 Unblocking all websites...")
+        mcp_service = self.services['mcp_service']
+        if not mcp_service.connected:
+            return 500, {
+                "success": False,
+                "error": "MCP service not connected",
+                "message": "Cannot unblock websites"
+            }
+        try:
+            result = await asyncio.wait_for(mcp_service.unblock_websites(data.get('holder')), Config.MCP_CALL_TIMEOUT)
+            return 200, result
+        except Exception as e:
+            print(f"Error during unblocking: {e}")
+            return 500, {
+                "success": False,
+                "error": str(e),
+                "message": "Failed to unblock websites"
+            }
+
+app = StudyOrchestratorASGI(create_app())
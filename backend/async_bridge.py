@@ -0,0 +1,92 @@
+"""
+Long-lived asyncio event loop for running MCP coroutines from sync code
+"""
+import asyncio
+import atexit
+import concurrent.futures
+import threading
+from typing import Any, Awaitable, Optional
+
+from config import Config
+
+class AsyncLoopBridge:
+    """One event loop running forever on a dedicated daemon thread.
+
+    Flask routes (or any other thread) hand coroutines to ``run``, which
+    schedules them on the loop with ``run_coroutine_threadsafe`` and waits
+    for the result up to a per-call timeout. Coroutines from concurrent
+    requests share the loop and run concurrently instead of each request
+    building and tearing down its own loop.
+    """
+
+    def __init__(self, name: str = 'mcp-event-loop'):
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> asyncio.AbstractEventLoop:
+        """Start the loop thread if needed and return the loop"""
+        with self._lock:
+            if not self.running:
+                loop = asyncio.new_event_loop()
+                started = threading.Event()
+
+                def run_loop():
+                    asyncio.set_event_loop(loop)
+                    loop.call_soon(started.set)
+                    loop.run_forever()
+
+                self._thread = threading.Thread(target=run_loop, name=self.name, daemon=True)
+                self._thread.start()
+                started.wait()
+                self._loop = loop
+            return self._loop
+
+    def submit(self, coro: Awaitable[Any]) -> concurrent.futures.Future:
+        """Schedule a coroutine on the loop and return a thread-safe future"""
+        loop = self.start()
+        return asyncio.run_coroutine_threadsafe(coro, loop)
+
+    def run(self, coro: Awaitable[Any], timeout: Optional[float] = Config.MCP_CALL_TIMEOUT) -> Any:
+        """Run a coroutine on the loop and wait for its result.
+
+        Raises TimeoutError (and cancels the coroutine) if it takes longer
+        than ``timeout`` seconds; exceptions from the coroutine propagate.
+        """
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise TimeoutError(f"Async call timed out after {timeout} seconds")
+
+    def stop(self, timeout: float = 5):
+        """Stop the loop and join its thread"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            if loop is None or thread is None:
+                return
+            if thread.is_alive():
+                loop.call_soon_threadsafe(loop.stop)
+                thread.join(timeout)
+            if not thread.is_alive():
+                loop.close()
+            self._loop = None
+            self._thread = None
+
+_async_bridge: Optional[AsyncLoopBridge] = None
+_async_bridge_lock = threading.Lock()
+
+def get_async_bridge() -> AsyncLoopBridge:
+    """Return the process-wide event loop bridge"""
+    global _async_bridge
+    with _async_bridge_lock:
+        if _async_bridge is None:
+            _async_bridge = AsyncLoopBridge()
+            atexit.register(_async_bridge.stop)
+        return _async_bridge
@@ -0,0 +1,483 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for Smart Study Orchestrator
+
+    python benchmarks.py server [--concurrency 50] [--duration 10] [--latency 0.2]
+    python benchmarks.py calendar-merge [--local 10000] [--remote 2500] [--repeat 20]
+    python benchmarks.py hosts [--sites 50] [--base-lines 500] [--repeat 200]
+    python benchmarks.py blocklist [--entries 100000] [--file hosts.txt] [--lookups 200000]
+
+``server`` starts the API twice against a scratch copy of data/, once under
+the threaded WSGI development server and once under uvicorn (asgi.py), with
+a fixed delay added to the blocking call behind each endpoint (calendar
+reads, StudyAnalyzer.generate_analytics). It then drives each with
+concurrent clients and prints requests per second and p50/p99 latency per
+endpoint.
+
+``calendar-merge`` times CalendarService.get_events merging local events
+with the Google Calendar mirror (synced from google_fakes, no network) against the
+previous per-event ``any()`` scan over the local list.
+
+``hosts`` drives WebsiteBlockingService against a temp hosts file and
+reports time, file reads/writes and DNS flushes per block/unblock call.
+
+``blocklist`` loads a blocklist (``--file``, hosts format or one domain per
+line, e.g. a public ad/tracker list; otherwise a generated one) into the
+DomainTrie and into plain sets walked suffix by suffix, and reports build
+time, memory (tracemalloc) and lookups per second for each.
+"""
+import argparse
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+import requests
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+SERVER_ENDPOINTS = ['/api/study/analytics', '/api/calendar/events']
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def print_table(title: str, rows: List[Dict[str, object]]):
+    print(f"\n{title}")
+    print("-" * 78)
+    print(f"{'mode':<6} {'endpoint':<28} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for row in rows:
+        print(f"{row['mode']:<6} {row['endpoint']:<28} {row['requests']:>9} {row['errors']:>7} "
+              f"{row['rps']:>8.1f} {row['p50']:>8.1f} {row['p99']:>8.1f}")
+
+# =============================================================================
+# WSGI VS ASGI SERVER BENCHMARK
+# =============================================================================
+
+def add_upstream_latency(latency: float):
+    """Delay the blocking call each benchmarked endpoint makes by ``latency``
+    seconds (the analytics route no longer calls Groq: insights are
+    precomputed, so its blocking work is generate_analytics)"""
+    import services
+
+    get_events = services.CalendarService.get_events
+    generate_analytics = services.StudyAnalyzer.generate_analytics
+
+    def slow_get_events(self, *args, **kwargs):
+        time.sleep(latency)
+        return get_events(self, *args, **kwargs)
+
+    def slow_generate_analytics(self, *args, **kwargs):
+        time.sleep(latency)
+        return generate_analytics(self, *args, **kwargs)
+
+    services.CalendarService.get_events = slow_get_events
+    services.StudyAnalyzer.generate_analytics = slow_generate_analytics
+
+def serve(mode: str, port: int, latency: float):
+    """Run one server in this process (started by run_server_benchmark)"""
+    sys.path.insert(0, BACKEND_DIR)
+    add_upstream_latency(latency)
+
+    if mode == 'wsgi':
+        from werkzeug.serving import make_server
+        from app import create_app
+        make_server('127.0.0.1', port, create_app(), threaded=True).serve_forever()
+    else:
+        import uvicorn
+        from asgi import app
+        uvicorn.run(app, host='127.0.0.1', port=port, log_level='warning')
+
+def wait_for_server(base_url: str, timeout: float = 30) -> bool:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            requests.get(f"{base_url}/health", timeout=1)
+            return True
+        except requests.RequestException:
+            time.sleep(0.2)
+    return False
+
+def load_endpoint(base_url: str, endpoint: str, concurrency: int, duration: float) -> Dict[str, object]:
+    """Closed-loop load: ``concurrency`` clients issuing requests back to back"""
+    latencies: List[float] = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.time() + duration
+
+    def client():
+        with requests.Session() as http:
+            while time.time() < deadline:
+                start = time.perf_counter()
+                try:
+                    ok = http.get(base_url + endpoint, timeout=30).status_code == 200
+                except requests.RequestException:
+                    ok = False
+                elapsed = time.perf_counter() - start
+                with lock:
+                    if ok:
+                        latencies.append(elapsed)
+                    else:
+                        errors[0] += 1
+
+    started = time.time()
+    clients = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+    wall = time.time() - started
+
+    return {
+        "endpoint": endpoint,
+        "requests": len(latencies),
+        "errors": errors[0],
+        "rps": len(latencies) / wall if wall else 0,
+        "p50": percentile(latencies, 50) * 1000,
+        "p99": percentile(latencies, 99) * 1000
+    }
+
+def run_server_benchmark(args):
+    try:
+        import uvicorn  # noqa: F401
+    except ImportError:
+        print("uvicorn is required for the ASGI run (pip install uvicorn asgiref)")
+        return 1
+
+    workdir = tempfile.mkdtemp(prefix='study-bench-')
+    shutil.copytree(os.path.join(BACKEND_DIR, 'data'), os.path.join(workdir, 'data'))
+    env = dict(os.environ, LLM_CACHE_DISK='false')
+    rows = []
+    try:
+        for mode in ('wsgi', 'asgi'):
+            port = free_port()
+            base_url = f"http://127.0.0.1:{port}"
+            server = subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), 'serve', mode,
+                 '--port', str(port), '--latency', str(args.latency)],
+                cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            try:
+                if not wait_for_server(base_url):
+                    print(f"{mode} server did not start")
+                    return 1
+                for endpoint in SERVER_ENDPOINTS:
+                    load_endpoint(base_url, endpoint, min(args.concurrency, 4), 1)  # warm up
+                    row = load_endpoint(base_url, endpoint, args.concurrency, args.duration)
+                    row["mode"] = mode
+                    rows.append(row)
+            finally:
+                server.terminate()
+                server.wait(10)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print_table(f"WSGI vs ASGI ({args.concurrency} clients, {args.duration:g}s per endpoint, "
+                f"{args.latency * 1000:g}ms upstream latency)", rows)
+    return 0
+
+# =============================================================================
+# CALENDAR MERGE BENCHMARK
+# =============================================================================
+
+def make_calendar_events(local_count: int, remote_count: int, linked_fraction: float):
+    """Local events and Google events over 30 days; ``linked_fraction`` of
+    the Google events also exist locally (created through the app)"""
+    rng = random.Random(42)
+    base = datetime(2025, 1, 1, 8, 0)
+    remote = []
+    for i in range(remote_count):
+        start = base + timedelta(minutes=rng.randrange(30 * 24 * 60))
+        remote.append({'id': f'g{i}', 'title': f'Remote {i}', 'start_time': start.isoformat(),
+                       'description': '', 'link': ''})
+
+    linked = rng.sample(range(remote_count), int(remote_count * linked_fraction))
+    local = []
+    for i in range(local_count):
+        start = base + timedelta(minutes=rng.randrange(30 * 24 * 60))
+        google_id = f'g{linked[i]}' if i < len(linked) else None
+        local.append({'id': f'local-{i}', 'title': f'Local {i}', 'start_time': start.isoformat(),
+                      'end_time': (start + timedelta(minutes=45)).isoformat(),
+                      'google_calendar_id': google_id})
+    return local, remote
+
+def scan_merge(local_events: List[Dict[str, Any]], google_events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """The previous get_events merge: an any() scan per Google event"""
+    all_events = list(local_events)
+    for g_event in google_events:
+        exists = any(event.get('google_calendar_id') == g_event['id'] for event in local_events)
+        if not exists:
+            all_events.append({
+                "id": f"google_{g_event['id']}",
+                "title": g_event['title'],
+                "start_time": g_event['start_time'],
+                "description": g_event['description'],
+                "event_type": "google_calendar",
+                "google_calendar_id": g_event['id'],
+                "google_calendar_link": g_event.get('link', '')
+            })
+    return all_events
+
+def time_call(func, repeat: int) -> List[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+def run_calendar_merge_benchmark(args):
+    sys.path.insert(0, BACKEND_DIR)
+    local, remote = make_calendar_events(args.local, args.remote, args.linked)
+
+    workdir = tempfile.mkdtemp(prefix='study-bench-')
+    os.makedirs(os.path.join(workdir, 'data'))
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        from google_fakes import FakeCalendarAPI
+        from services import CalendarService, GoogleCalendarService
+        api = FakeCalendarAPI()
+        for g_event in remote:
+            api.insert_event({'id': g_event['id'], 'summary': g_event['title'],
+                              'start': {'dateTime': g_event['start_time']}, 'description': ''})
+        calendar_service = CalendarService(google_calendar=GoogleCalendarService(service=api))
+        calendar_service.index.rebuild(local)
+        calendar_service.google_mirror.sync()
+
+        merged = calendar_service.get_events()
+        baseline = scan_merge(local, remote)
+        assert sorted(e['id'] for e in merged) == sorted(e['id'] for e in baseline)
+
+        day = calendar_service.day_range('2025-01-15')
+        rows = [
+            ("any() scan, all events", time_call(lambda: scan_merge(local, remote), args.repeat)),
+            ("hash join, all events", time_call(calendar_service.get_events, args.repeat)),
+            ("hash join, one day", time_call(lambda: calendar_service.get_events(start=day[0], end=day[1]), args.repeat)),
+        ]
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"\nCalendar merge ({args.local} local x {args.remote} Google events, "
+          f"{args.linked:.0%} of Google events linked, {args.repeat} runs)")
+    print("-" * 58)
+    print(f"{'merge':<28} {'p50 ms':>9} {'p99 ms':>9} {'events':>8}")
+    sizes = [len(baseline), len(merged), len(calendar_service.get_events(start=day[0], end=day[1]))]
+    for (name, timings), size in zip(rows, sizes):
+        print(f"{name:<28} {percentile(timings, 50) * 1000:>9.2f} {percentile(timings, 99) * 1000:>9.2f} {size:>8}")
+    return 0
+
+# =============================================================================
+# HOSTS FILE BENCHMARK
+# =============================================================================
+
+def run_hosts_benchmark(args):
+    sys.path.insert(0, BACKEND_DIR)
+    from services import WebsiteBlockingService
+
+    workdir = tempfile.mkdtemp(prefix='study-bench-')
+    hosts_path = os.path.join(workdir, 'hosts')
+    with open(hosts_path, 'w') as f:
+        f.write("127.0.0.1 localhost\n::1 localhost\n")
+        f.writelines(f"10.0.{i // 250}.{i % 250} host{i}.lan\n" for i in range(args.base_lines))
+
+    # Leases go to the scratch directory too, never the user's data/
+    blocker = WebsiteBlockingService(hosts_file=hosts_path, leases_file=os.path.join(workdir, 'block_leases.json'),
+                                     engine='hosts')
+    flushes = [0]
+    blocker._flush_dns_cache = lambda: flushes.__setitem__(0, flushes[0] + 1)
+    sites = [f"site{i}.com" for i in range(args.sites)]
+
+    def block():
+        return blocker.block_websites(sites, 25)
+
+    def counters():
+        return blocker.hosts.reads, blocker.hosts.writes, flushes[0]
+
+    # (name, state before the scenario, untimed setup before each call, timed call).
+    # Leases add up per holder, so a "changed" call needs the setup to undo
+    # the previous one.
+    scenarios = [
+        ("block (changed)", blocker.unblock_websites, blocker.unblock_websites, block),
+        ("block (unchanged)", block, None, block),
+        ("unblock (changed)", blocker.unblock_websites, block, blocker.unblock_websites),
+        ("unblock (nothing blocked)", blocker.unblock_websites, None, blocker.unblock_websites),
+    ]
+    rows = []
+    try:
+        for name, initial, setup, call in scenarios:
+            initial()
+            timings = []
+            totals = [0, 0, 0]
+            for _ in range(args.repeat):
+                if setup is not None:
+                    setup()
+                before = counters()
+                start = time.perf_counter()
+                call()
+                timings.append(time.perf_counter() - start)
+                totals = [total + after - start_count
+                          for total, after, start_count in zip(totals, counters(), before)]
+            rows.append((name, timings, *(total / args.repeat for total in totals)))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"\nHosts file ({args.base_lines} other lines, {args.sites} sites, {args.repeat} runs)")
+    print("-" * 72)
+    print(f"{'scenario':<26} {'p50 ms':>8} {'p99 ms':>8} {'reads':>8} {'writes':>8} {'flushes':>8}")
+    for name, timings, reads, writes, flushed in rows:
+        print(f"{name:<26} {percentile(timings, 50) * 1000:>8.3f} {percentile(timings, 99) * 1000:>8.3f} "
+              f"{reads:>8.2f} {writes:>8.2f} {flushed:>8.2f}")
+    print("(reads, writes and flushes are per service call)")
+    return 0
+
+# =============================================================================
+# BLOCKLIST MATCHER BENCHMARK
+# =============================================================================
+
+def make_blocklist(count: int, wildcard_fraction: float) -> List[str]:
+    """Tracker-style host names, some of them as '*.' wildcards"""
+    rng = random.Random(42)
+    tlds = ['com', 'net', 'org', 'io', 'co.uk', 'de']
+    names = []
+    for i in range(count):
+        name = f"{rng.choice(['ads', 'track', 'pixel', 'cdn', 'stats', 'px'])}{i}.ad-network{i % 997}.{rng.choice(tlds)}"
+        names.append(f"*.{name}" if rng.random() < wildcard_fraction else name)
+    return names
+
+class SuffixSetMatcher:
+    """Baseline: exact names and wildcard apexes in two sets, checked for
+    every suffix of the queried name"""
+
+    def __init__(self, names: List[str]):
+        self.exact = {n for n in names if not n.startswith('*.')}
+        self.wildcards = {n[2:] for n in names if n.startswith('*.')}
+
+    def matches(self, host: str) -> bool:
+        if host in self.exact:
+            return True
+        while host:
+            if host in self.wildcards:
+                return True
+            _, _, host = host.partition('.')
+        return False
+
+def run_blocklist_benchmark(args):
+    sys.path.insert(0, BACKEND_DIR)
+    from domain_trie import DomainTrie, parse_blocklist
+
+    if args.file:
+        with open(args.file, encoding='utf-8', errors='replace') as f:
+            names = list(dict.fromkeys(parse_blocklist(f)))
+        source = os.path.basename(args.file)
+    else:
+        names = make_blocklist(args.entries, args.wildcards)
+        source = "generated"
+
+    rng = random.Random(7)
+    queries = []
+    for i in range(args.lookups):
+        name = rng.choice(names)
+        kind = i % 3
+        if kind == 0:    # listed name (or a wildcard's apex)
+            queries.append(name[2:] if name.startswith('*.') else name)
+        elif kind == 1:  # subdomain of a listed name
+            queries.append(f"img{i}.{name[2:] if name.startswith('*.') else name}")
+        else:            # unrelated name
+            queries.append(f"www.site{i}.example{i % 31}.com")
+
+    rows = []
+    for label, build in (("DomainTrie", DomainTrie), ("suffix sets", SuffixSetMatcher)):
+        start = time.perf_counter()
+        matcher = build(names)
+        build_seconds = time.perf_counter() - start
+        # Built again under tracemalloc, which would skew the timing
+        del matcher
+        tracemalloc.start()
+        matcher = build(names)
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        matches = matcher.matches
+        start = time.perf_counter()
+        hits = sum(1 for q in queries if matches(q))
+        lookup_seconds = time.perf_counter() - start
+        rows.append((label, build_seconds, memory, len(queries) / lookup_seconds, hits))
+
+    print(f"\nBlocklist matcher ({source}: {len(names)} entries, "
+          f"{sum(n.startswith('*.') for n in names)} wildcards, {len(queries)} lookups)")
+    print("-" * 72)
+    print(f"{'matcher':<14} {'build ms':>10} {'memory MB':>10} {'lookups/s':>12} {'hits':>8}")
+    for label, build_seconds, memory, rate, hits in rows:
+        print(f"{label:<14} {build_seconds * 1000:>10.1f} {memory / 1e6:>10.1f} {rate:>12,.0f} {hits:>8}")
+    return 0
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Smart Study Orchestrator benchmarks")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    server_parser = subparsers.add_parser('server', help="Compare WSGI and ASGI throughput and latency")
+    server_parser.add_argument('--concurrency', type=int, default=50)
+    server_parser.add_argument('--duration', type=float, default=10, help="seconds per endpoint")
+    server_parser.add_argument('--latency', type=float, default=0.2, help="mocked upstream latency in seconds")
+
+    merge_parser = subparsers.add_parser('calendar-merge', help="Time merging local and Google Calendar events")
+    merge_parser.add_argument('--local', type=int, default=10000, help="local events")
+    merge_parser.add_argument('--remote', type=int, default=2500, help="Google Calendar events")
+    merge_parser.add_argument('--linked', type=float, default=0.5, help="fraction of Google events stored locally")
+    merge_parser.add_argument('--repeat', type=int, default=20)
+
+    hosts_parser = subparsers.add_parser('hosts', help="Time hosts file block/unblock against a temp file")
+    hosts_parser.add_argument('--sites', type=int, default=50)
+    hosts_parser.add_argument('--base-lines', type=int, default=500, help="unrelated lines in the hosts file")
+    hosts_parser.add_argument('--repeat', type=int, default=200)
+
+    blocklist_parser = subparsers.add_parser('blocklist', help="Build and query the blocklist matcher")
+    blocklist_parser.add_argument('--entries', type=int, default=100000, help="generated entries (without --file)")
+    blocklist_parser.add_argument('--wildcards', type=float, default=0.1, help="fraction of generated '*.' entries")
+    blocklist_parser.add_argument('--file', help="blocklist to load (hosts format or one domain per line)")
+    blocklist_parser.add_argument('--lookups', type=int, default=200000)
+
+    serve_parser = subparsers.add_parser('serve', help=argparse.SUPPRESS)
+    serve_parser.add_argument('mode', choices=['wsgi', 'asgi'])
+    serve_parser.add_argument('--port', type=int, required=True)
+    serve_parser.add_argument('--latency', type=float, default=0.0)
+
+    args = parser.parse_args()
+    if args.command == 'serve':
+        serve(args.mode, args.port, args.latency)
+        return 0
+    if args.command == 'calendar-merge':
+        return run_calendar_merge_benchmark(args)
+    if args.command == 'hosts':
+        return run_hosts_benchmark(args)
+    if args.command == 'blocklist':
+        return run_blocklist_benchmark(args)
+    return run_server_benchmark(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
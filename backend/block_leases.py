@@ -0,0 +1,243 @@
+"""
+Timed website block leases with automatic release
+"""
+import heapq
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from config import Config
+from block_set import BlockedDomainSet
+from storage import get_storage_backend
+from utils import thaw_json
+
+DEFAULT_HOLDER = 'default'
+
+class BlockLeaseScheduler:
+    """Block leases, one per (holder, domain), released on time.
+
+    A holder (a study session, a user) blocking a domain it already holds
+    merges the two leases: the lease ends at whichever expiry is later.
+    Different holders hold separate leases on the same domain; the
+    domain is counted once per holder in ``blocked`` (a BlockedDomainSet)
+    and stays blocked until the last lease on it ends. ``on_change`` gets
+    the set only when a domain actually enters or leaves it.
+
+    Expiries are kept in a min-heap of (expires_at, holder, domain);
+    extending a lease pushes a new entry and the superseded one is skipped
+    when it reaches the top. A worker thread sleeps until the earliest
+    expiry and releases every lease that is due.
+
+    A change is kept only once ``on_change`` has accepted it: if it raises
+    (the hosts file is not writable, say) the leases and the set are rolled
+    back, nothing is saved and the error propagates. Leases are persisted
+    on every kept change, so the domain set is rebuilt on restart. ``start`` releases leases that expired while the app was down
+    and re-arms the rest. ``clock`` can be swapped for a fake and
+    ``expire_due`` called directly to drive the schedule without the worker.
+    """
+
+    RETRY_SECONDS = 30  # after on_change failed to release expired leases
+
+    def __init__(self, on_change: Callable[[BlockedDomainSet], Any], file_path: str = Config.BLOCK_LEASES_FILE,
+                 backend=None, clock: Callable[[], float] = time.time):
+        self.on_change = on_change
+        self.file_path = file_path
+        self.backend = backend or get_storage_backend()
+        self.clock = clock
+        self._cond = threading.Condition(threading.RLock())
+        self._worker: Optional[threading.Thread] = None
+        self._stopped = False
+        self.leases: Dict[Tuple[str, str], float] = {}
+        self._heap: List[Tuple[float, str, str]] = []
+        self.blocked = BlockedDomainSet()
+        self.released = 0
+        self._load()
+
+    def _load(self):
+        try:
+            data = self.backend.load(self.file_path)
+        except Exception as e:
+            print(f"Error loading block leases: {e}")
+            data = None
+        if isinstance(data, dict):
+            leases = thaw_json(data).get('leases', [])
+            if isinstance(leases, dict):  # {domain: expires_at} from before holders
+                leases = [{"holder": DEFAULT_HOLDER, "domain": d, "expires_at": e} for d, e in leases.items()]
+            self.leases = {(lease['holder'], lease['domain']): float(lease['expires_at']) for lease in leases}
+        self.blocked.acquire(domain for _, domain in self.leases)
+        self._rebuild_heap()
+
+    def _rebuild_heap(self):
+        self._heap = [(expires_at, holder, domain) for (holder, domain), expires_at in self.leases.items()]
+        heapq.heapify(self._heap)
+
+    def _save(self):
+        leases = [{"holder": holder, "domain": domain, "expires_at": expires_at}
+                  for (holder, domain), expires_at in self.leases.items()]
+        try:
+            self.backend.save(self.file_path, {"leases": leases})
+        except Exception as e:
+            print(f"Error saving block leases: {e}")
+
+    def _changed(self, membership_changed: bool, previous_leases: Dict[Tuple[str, str], float],
+                 acquired: Iterable[str] = (), released: Iterable[str] = ()) -> Any:
+        """Hand the set to on_change if a domain entered or left it, then save.
+
+        ``acquired``/``released`` are the domains just passed to
+        blocked.acquire/release; if on_change raises they are undone and the
+        leases go back to ``previous_leases``.
+        """
+        result = None
+        if membership_changed:
+            try:
+                result = self.on_change(self.blocked)
+            except Exception:
+                self.leases = previous_leases
+                self._rebuild_heap()
+                self.blocked.release(acquired)
+                self.blocked.acquire(released)
+                raise
+        self._save()
+        self._cond.notify()
+        return result
+
+    # Leases
+
+    def domains(self) -> List[str]:
+        with self._cond:
+            return self.blocked.domains()
+
+    def expires_at(self, domain: str, holder: Optional[str] = None) -> Optional[float]:
+        """When ``holder``'s lease on ``domain`` ends (any holder's, latest, if None)"""
+        with self._cond:
+            if holder is not None:
+                return self.leases.get((holder, domain))
+            expiries = [e for (h, d), e in self.leases.items() if d == domain]
+            return max(expiries) if expiries else None
+
+    def add(self, domains: Iterable[str], duration_seconds: float, holder: str = DEFAULT_HOLDER) -> Any:
+        """Lease ``domains`` to ``holder`` for ``duration_seconds`` from now.
+
+        Returns on_change's result, or None if no domain became blocked.
+        """
+        with self._cond:
+            previous_leases = dict(self.leases)
+            expires_at = self.clock() + duration_seconds
+            new_domains = []
+            for domain in dict.fromkeys(domains):
+                current = self.leases.get((holder, domain))
+                if current is None:
+                    new_domains.append(domain)
+                if current is None or current < expires_at:
+                    self.leases[(holder, domain)] = expires_at
+                    heapq.heappush(self._heap, (expires_at, holder, domain))
+            # Superseded entries pile up when leases keep being extended
+            if len(self._heap) > 4 * (len(self.leases) + 16):
+                self._rebuild_heap()
+            return self._changed(bool(self.blocked.acquire(new_domains)), previous_leases, acquired=new_domains)
+
+    def release(self, domains: Optional[Iterable[str]] = None, holder: Optional[str] = None) -> Any:
+        """End leases now: ``holder``'s (every holder's if None) on ``domains``
+        (all domains if None). Returns on_change's result, or None if no
+        domain became unblocked."""
+        with self._cond:
+            previous_leases = dict(self.leases)
+            wanted = None if domains is None else set(domains)
+            ended = [key for key in self.leases
+                     if (holder is None or key[0] == holder) and (wanted is None or key[1] in wanted)]
+            for key in ended:
+                del self.leases[key]
+            if not self.leases:
+                self._heap = []
+            released = [domain for _, domain in ended]
+            return self._changed(bool(self.blocked.release(released)), previous_leases, released=released)
+
+    def reapply(self) -> Any:
+        """Hand the current set to on_change even though it has not changed"""
+        with self._cond:
+            return self.on_change(self.blocked)
+
+    def next_expiry(self) -> Optional[float]:
+        with self._cond:
+            while self._heap and self.leases.get(self._heap[0][1:]) != self._heap[0][0]:
+                heapq.heappop(self._heap)  # superseded or released
+            return self._heap[0][0] if self._heap else None
+
+    def expire_due(self) -> List[str]:
+        """Release every lease whose expiry has passed; returns the domains
+        that are no longer blocked"""
+        with self._cond:
+            previous_leases = dict(self.leases)
+            now = self.clock()
+            ended = []
+            while self._heap and self._heap[0][0] <= now:
+                expires_at, holder, domain = heapq.heappop(self._heap)
+                if self.leases.get((holder, domain)) == expires_at:
+                    del self.leases[(holder, domain)]
+                    ended.append(domain)
+            if not ended:
+                return []
+            unblocked = self.blocked.release(ended)
+            self._changed(bool(unblocked), previous_leases, released=ended)
+            self.released += len(ended)
+            if unblocked:
+                print(f"🔓 Block lease expired for {len(unblocked)} sites: {', '.join(sorted(unblocked))}")
+            return unblocked
+
+    # Worker
+
+    def _run(self):
+        with self._cond:
+            while not self._stopped:
+                try:
+                    self.expire_due()
+                except Exception as e:
+                    # The due leases were kept; try again later rather than spin
+                    print(f"Error releasing expired block leases: {e}")
+                    self._cond.wait(self.RETRY_SECONDS)
+                    continue
+                next_expiry = self.next_expiry()
+                timeout = None if next_expiry is None else max(0.0, next_expiry - self.clock())
+                self._cond.wait(timeout)
+
+    def start(self):
+        """Release leases that expired while stopped, re-apply the rest and
+        start the worker"""
+        with self._cond:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            try:
+                if not self.expire_due() and self.leases:
+                    self.reapply()
+            except Exception as e:
+                print(f"Error re-applying block leases: {e}")
+            self._stopped = False
+            self._worker = threading.Thread(target=self._run, name='block-lease-scheduler', daemon=True)
+            self._worker.start()
+
+    def stop(self, timeout: float = 5):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+            worker, self._worker = self._worker, None
+        if worker is not None:
+            worker.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            now = self.clock()
+            leases: Dict[str, List[Dict[str, Any]]] = {}
+            for (holder, domain), expires_at in sorted(self.leases.items()):
+                leases.setdefault(domain, []).append({
+                    "holder": holder,
+                    "expires_at": datetime.fromtimestamp(expires_at).isoformat(),
+                    "remaining_seconds": round(max(0.0, expires_at - now), 1)
+                })
+            return {
+                "active": len(self.blocked),
+                "leases_held": len(self.leases),
+                "hosts_entries": len(self.blocked.hosts),
+                "released": self.released,
+                "leases": leases
+            }
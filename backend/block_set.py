@@ -0,0 +1,138 @@
+"""
+Reference-counted set of blocked domains and the hosts entries they expand to
+"""
+import bisect
+from typing import Dict, Iterable, List, Tuple
+from urllib.parse import urlsplit
+
+from config import Config
+from domain_trie import DomainTrie
+
+def normalize_domain(site: str) -> str:
+    """'https://WWW.Example.com:443/x' -> 'www.example.com'; keeps a leading '*.'"""
+    site = site.strip().lower()
+    wildcard = site.startswith('*.')
+    if wildcard:
+        site = site[2:]
+    if '://' not in site:
+        site = '//' + site
+    host = (urlsplit(site).hostname or '').rstrip('.')
+    return f"*.{host}" if wildcard and host else host
+
+def expand_domain(domain: str) -> Tuple[str, ...]:
+    """Host names the hosts file needs to block ``domain``.
+
+    The hosts file has no wildcards, so 'example.com' (or '*.example.com')
+    is listed as the apex plus the subdomains in
+    Config.BLOCK_WILDCARD_SUBDOMAINS; 'www.example.com' only as itself.
+    """
+    if domain.startswith('www.'):
+        return (domain,)
+    apex = suffix_of(domain)
+    return (apex,) + tuple(f"{sub}.{apex}" for sub in Config.BLOCK_WILDCARD_SUBDOMAINS)
+
+def suffix_of(domain: str) -> str:
+    """'*.example.com' / 'example.com' -> 'example.com', the name that
+    ``domain`` blocks along with every name under it"""
+    return domain[2:] if domain.startswith('*.') else domain
+
+class BlockedDomainSet:
+    """Blocked domains, each counted once per lease holding it.
+
+    A domain stays blocked until its last holder lets go. Host names are
+    expanded once when a domain first enters the set and are counted too,
+    since different domains can expand to the same name
+    ('example.com' and 'www.example.com'). The host names are kept in a
+    sorted list, so the hosts section is rendered in sorted, deduplicated
+    order without re-sorting or re-expanding.
+
+    ``matcher`` (a DomainTrie) holds each domain as a suffix entry, so
+    'youtube.com' blocks m.youtube.com, cdn.youtube.com and any other name
+    under it; '*.youtube.com' means the same. ``is_blocked`` and the DNS
+    engine look names up there, while the hosts file can only list a few
+    subdomains. Suffixes are counted like host names, since 'example.com'
+    and '*.example.com' share one.
+    """
+
+    def __init__(self, redirect_ip: str = Config.BLOCK_REDIRECT_IP):
+        self.redirect_ip = redirect_ip
+        self.refcounts: Dict[str, int] = {}
+        self.expansions: Dict[str, Tuple[str, ...]] = {}
+        self.host_refcounts: Dict[str, int] = {}
+        self.hosts: List[str] = []
+        self.suffix_refcounts: Dict[str, int] = {}
+        self.matcher = DomainTrie()
+
+    def __len__(self) -> int:
+        return len(self.refcounts)
+
+    def __contains__(self, domain: str) -> bool:
+        return domain in self.refcounts
+
+    def domains(self) -> List[str]:
+        return sorted(self.refcounts)
+    
+    def is_blocked(self, host: str) -> bool:
+        return self.matcher.matches(host)
+
+    def acquire(self, domains: Iterable[str]) -> List[str]:
+        """Count one more holder for each domain; returns the newly blocked ones"""
+        added = []
+        for domain in domains:
+            count = self.refcounts.get(domain, 0)
+            self.refcounts[domain] = count + 1
+            if count:
+                continue
+            added.append(domain)
+            suffix = suffix_of(domain)
+            suffix_count = self.suffix_refcounts.get(suffix, 0)
+            self.suffix_refcounts[suffix] = suffix_count + 1
+            if not suffix_count:
+                self.matcher.add(suffix, wildcard=True)
+            expansion = self.expansions[domain] = expand_domain(domain)
+            for host in expansion:
+                host_count = self.host_refcounts.get(host, 0)
+                self.host_refcounts[host] = host_count + 1
+                if not host_count:
+                    bisect.insort(self.hosts, host)
+        return added
+
+    def release(self, domains: Iterable[str]) -> List[str]:
+        """Drop one holder for each domain; returns the ones no longer blocked"""
+        removed = []
+        for domain in domains:
+            count = self.refcounts.get(domain, 0)
+            if count > 1:
+                self.refcounts[domain] = count - 1
+                continue
+            if not count:
+                continue
+            del self.refcounts[domain]
+            removed.append(domain)
+            suffix = suffix_of(domain)
+            suffix_count = self.suffix_refcounts[suffix] - 1
+            if suffix_count:
+                self.suffix_refcounts[suffix] = suffix_count
+            else:
+                del self.suffix_refcounts[suffix]
+                self.matcher.discard(suffix, wildcard=True)
+            for host in self.expansions.pop(domain):
+                host_count = self.host_refcounts[host] - 1
+                if host_count:
+                    self.host_refcounts[host] = host_count
+                else:
+                    del self.host_refcounts[host]
+                    del self.hosts[bisect.bisect_left(self.hosts, host)]
+        return removed
+
+    def clear(self):
+        self.refcounts.clear()
+        self.expansions.clear()
+        self.host_refcounts.clear()
+        self.hosts = []
+        self.suffix_refcounts.clear()
+        self.matcher.clear()
+
+    def entries(self) -> List[str]:
+        """Hosts file lines, sorted by host name"""
+        return [f"{self.redirect_ip} {host}" for host in self.hosts]
@@ -0,0 +1,208 @@
+"""
+In-memory interval index for calendar events
+"""
+import random
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+def event_timestamp(value: Any) -> Optional[float]:
+    """POSIX timestamp of an event time (ISO string or datetime), None if unusable.
+
+    Naive times are taken as local time, so naive and UTC-offset values
+    stored side by side still compare correctly.
+    """
+    if not value:
+        return None
+    try:
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        return value.timestamp()
+    except (TypeError, ValueError, OverflowError, OSError):
+        return None
+
+def event_interval(event: Dict[str, Any]) -> Optional[Tuple[float, float]]:
+    """(start, end) timestamps of an event; events without an end are instants"""
+    start = event_timestamp(event.get('start_time'))
+    if start is None:
+        return None
+    end = event_timestamp(event.get('end_time'))
+    return start, end if end is not None and end >= start else start
+
+class _Node:
+    __slots__ = ('key', 'end', 'max_end', 'priority', 'left', 'right')
+
+    def __init__(self, key: Tuple[float, str], end: float):
+        self.key = key  # (start, event id): unique and ordered by start time
+        self.end = end
+        self.max_end = end
+        self.priority = random.random()
+        self.left: Optional['_Node'] = None
+        self.right: Optional['_Node'] = None
+
+    def update(self):
+        max_end = self.end
+        if self.left is not None and self.left.max_end > max_end:
+            max_end = self.left.max_end
+        if self.right is not None and self.right.max_end > max_end:
+            max_end = self.right.max_end
+        self.max_end = max_end
+
+class IntervalTree:
+    """Interval tree as a treap ordered by (start, id), augmented with the
+    largest end time in each subtree.
+
+    Insert and delete are O(log n) expected; ``overlapping`` visits only
+    subtrees that can contain a match, so it is O(log n + k) and yields the
+    matches in start-time order.
+    """
+
+    def __init__(self):
+        self.root: Optional[_Node] = None
+        self.size = 0
+
+    @staticmethod
+    def _rotate_right(node: _Node) -> _Node:
+        left = node.left
+        node.left = left.right
+        left.right = node
+        node.update()
+        left.update()
+        return left
+
+    @staticmethod
+    def _rotate_left(node: _Node) -> _Node:
+        right = node.right
+        node.right = right.left
+        right.left = node
+        node.update()
+        right.update()
+        return right
+
+    def _insert(self, node: Optional[_Node], new: _Node) -> _Node:
+        if node is None:
+            return new
+        if new.key < node.key:
+            node.left = self._insert(node.left, new)
+            if node.left.priority > node.priority:
+                return self._rotate_right(node)
+        else:
+            node.right = self._insert(node.right, new)
+            if node.right.priority > node.priority:
+                return self._rotate_left(node)
+        node.update()
+        return node
+
+    def _delete(self, node: Optional[_Node], key: Tuple[float, str]) -> Optional[_Node]:
+        if node is None:
+            return None
+        if key < node.key:
+            node.left = self._delete(node.left, key)
+        elif key > node.key:
+            node.right = self._delete(node.right, key)
+        else:
+            if node.left is None or node.right is None:
+                self.size -= 1
+                return node.left if node.left is not None else node.right
+            # Rotate the higher-priority child up and keep sinking the node
+            if node.left.priority > node.right.priority:
+                node = self._rotate_right(node)
+                node.right = self._delete(node.right, key)
+            else:
+                node = self._rotate_left(node)
+                node.left = self._delete(node.left, key)
+        node.update()
+        return node
+
+    def insert(self, start: float, end: float, event_id: str):
+        self.root = self._insert(self.root, _Node((start, event_id), end))
+        self.size += 1
+
+    def delete(self, start: float, event_id: str):
+        self.root = self._delete(self.root, (start, event_id))
+
+    def overlapping(self, start: float, end: float) -> Iterator[str]:
+        """Ids of intervals intersecting [start, end], by start time"""
+        stack: List[_Node] = []
+        node = self.root
+        while stack or node is not None:
+            # Descend left while the subtree can still reach ``start``
+            while node is not None and node.max_end >= start:
+                stack.append(node)
+                node = node.left
+            if not stack:
+                return
+            node = stack.pop()
+            if node.key[0] > end:
+                return  # this and every later node starts after the range
+            if node.end >= start:
+                yield node.key[1]
+            node = node.right
+
+class EventIndex:
+    """Id map, Google id map and interval tree over a list of calendar event dicts.
+
+    The index holds the event dicts themselves and has to be told when one
+    is added, changed in place or removed.
+    """
+
+    def __init__(self, events: Optional[List[Dict[str, Any]]] = None):
+        self.rebuild(events or [])
+
+    def rebuild(self, events: List[Dict[str, Any]]):
+        self.by_id: Dict[str, Dict[str, Any]] = {}
+        self.intervals: Dict[str, Tuple[float, float]] = {}
+        # google_calendar_id -> event id, and the reverse for clean removal
+        self.by_google_id: Dict[str, str] = {}
+        self.google_ids: Dict[str, str] = {}
+        self.tree = IntervalTree()
+        for event in events:
+            self.add(event)
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+    def __contains__(self, event_id: str) -> bool:
+        return event_id in self.by_id
+
+    def get(self, event_id: str) -> Optional[Dict[str, Any]]:
+        return self.by_id.get(event_id)
+
+    def add(self, event: Dict[str, Any]):
+        event_id = event.get('id')
+        if event_id in self.by_id:
+            self.remove(event_id)
+        self.by_id[event_id] = event
+        google_id = event.get('google_calendar_id')
+        if google_id:
+            self.by_google_id[google_id] = event_id
+            self.google_ids[event_id] = google_id
+        interval = event_interval(event)
+        if interval is not None:
+            self.intervals[event_id] = interval
+            self.tree.insert(interval[0], interval[1], event_id)
+
+    def remove(self, event_id: str) -> Optional[Dict[str, Any]]:
+        event = self.by_id.pop(event_id, None)
+        google_id = self.google_ids.pop(event_id, None)
+        if google_id is not None and self.by_google_id.get(google_id) == event_id:
+            del self.by_google_id[google_id]
+        interval = self.intervals.pop(event_id, None)
+        if interval is not None:
+            self.tree.delete(interval[0], event_id)
+        return event
+
+    def reindex(self, event: Dict[str, Any]):
+        """Refresh an event whose times may have changed in place"""
+        self.add(event)
+
+    def has_google_id(self, google_id: str) -> bool:
+        return google_id in self.by_google_id
+
+    def events(self) -> List[Dict[str, Any]]:
+        return list(self.by_id.values())
+
+    def overlapping(self, start: Optional[float] = None, end: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Events overlapping [start, end] (open-ended if omitted), by start time"""
+        start = float('-inf') if start is None else start
+        end = float('inf') if end is None else end
+        return [self.by_id[event_id] for event_id in self.tree.overlapping(start, end)]
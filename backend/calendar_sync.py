@@ -0,0 +1,163 @@
+"""
+Local mirror of Google Calendar, kept current by incremental sync
+"""
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from config import Config
+from calendar_index import EventIndex
+from storage import get_storage_backend
+from utils import thaw_json
+
+class SyncTokenExpiredError(Exception):
+    """Google answered 410 Gone: the sync token is no longer valid"""
+
+def mirror_event(g_event: Dict[str, Any]) -> Dict[str, Any]:
+    """A Google Calendar event in the shape CalendarService.get_events returns it"""
+    event = {
+        "id": f"google_{g_event['id']}",
+        "title": g_event['title'],
+        "start_time": g_event['start_time'],
+        "description": g_event['description'],
+        "event_type": "google_calendar",
+        "google_calendar_id": g_event['id'],
+        "google_calendar_link": g_event.get('link', '')
+    }
+    if g_event.get('end_time'):
+        event["end_time"] = g_event['end_time']
+    return event
+
+class GoogleCalendarMirror:
+    """Google Calendar events mirrored locally and indexed by time.
+
+    The first sync lists the whole calendar page by page and keeps the
+    ``nextSyncToken`` Google returns; later syncs send that token and apply
+    only what changed (new, updated and cancelled events). If Google
+    rejects the token with 410 Gone the mirror is rebuilt from a full sync.
+    Mirror and token are persisted, so a restart resumes incrementally.
+
+    Requests read the mirror only; ``start`` runs the sync on a background
+    thread every ``interval`` seconds.
+    """
+
+    def __init__(self, google_calendar, file_path: str = Config.GOOGLE_CALENDAR_SNAPSHOT_FILE,
+                 backend=None, interval: float = Config.GOOGLE_SYNC_INTERVAL_SECONDS):
+        self.google_calendar = google_calendar
+        self.file_path = file_path
+        self.backend = backend or get_storage_backend()
+        self.interval = interval
+        self._lock = threading.Lock()       # guards the index while reading or applying changes
+        self._sync_lock = threading.Lock()  # one sync at a time
+        self._stop = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+        self.index = EventIndex()
+        self.sync_token: Optional[str] = None
+        self.synced_at: Optional[float] = None
+        self.full_syncs = 0
+        self.incremental_syncs = 0
+        self.last_error: Optional[str] = None
+        self._load()
+
+    @property
+    def available(self) -> bool:
+        return bool(getattr(self.google_calendar, 'service', None))
+
+    def _load(self):
+        try:
+            data = self.backend.load(self.file_path)
+        except Exception as e:
+            print(f"Error loading Google Calendar mirror: {e}")
+            data = None
+        if isinstance(data, dict):
+            data = thaw_json(data)
+            self.index = EventIndex(data.get('events', []))
+            self.sync_token = data.get('sync_token')
+            self.synced_at = data.get('synced_at')
+
+    def _save(self):
+        with self._lock:
+            data = {"synced_at": self.synced_at, "sync_token": self.sync_token, "events": self.index.events()}
+        try:
+            self.backend.save(self.file_path, data)
+        except Exception as e:
+            print(f"Error saving Google Calendar mirror: {e}")
+
+    # Reads
+
+    def events(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return self.index.events()
+
+    def overlapping(self, start: Optional[float] = None, end: Optional[float] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            return self.index.overlapping(start, end)
+
+    # Sync
+
+    def sync(self, full: bool = False) -> Dict[str, Any]:
+        """Bring the mirror up to date; returns what was applied"""
+        with self._sync_lock:
+            token = None if full else self.sync_token
+            try:
+                changes, next_token = self.google_calendar.list_event_changes(token)
+            except SyncTokenExpiredError:
+                print("🔄 Google Calendar sync token expired, running a full sync")
+                token = None
+                changes, next_token = self.google_calendar.list_event_changes(None)
+
+            live = [mirror_event(e) for e in changes if e.get('status') != 'cancelled']
+            if token is None:
+                index = EventIndex(live)
+                with self._lock:
+                    self.index = index
+                self.full_syncs += 1
+            else:
+                with self._lock:
+                    for g_event in changes:
+                        if g_event.get('status') == 'cancelled':
+                            self.index.remove(f"google_{g_event['id']}")
+                    for event in live:
+                        self.index.add(event)
+                self.incremental_syncs += 1
+
+            self.sync_token = next_token
+            self.synced_at = time.time()
+            self.last_error = None
+            self._save()
+            return {"full_sync": token is None, "changes": len(changes), "events": len(self.index)}
+
+    def _run(self):
+        while not self._stop.is_set():
+            if self.available:
+                try:
+                    self.sync()
+                except Exception as e:
+                    self.last_error = str(e)
+                    print(f"Error syncing Google Calendar: {e}")
+            self._stop.wait(self.interval)
+
+    def start(self):
+        """Start the background sync worker (no-op without Google Calendar)"""
+        if not self.available or (self._worker is not None and self._worker.is_alive()):
+            return
+        self._stop.clear()
+        self._worker = threading.Thread(target=self._run, name='google-calendar-sync', daemon=True)
+        self._worker.start()
+
+    def stop(self, timeout: float = 5):
+        self._stop.set()
+        if self._worker is not None:
+            self._worker.join(timeout)
+            self._worker = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "available": self.available,
+            "events": len(self.index),
+            "synced_at": self.synced_at,
+            "incremental": self.sync_token is not None,
+            "full_syncs": self.full_syncs,
+            "incremental_syncs": self.incremental_syncs,
+            "last_error": self.last_error
+        }
@@ -0,0 +1,145 @@
+"""
+Circuit breaker for calls to external providers (Groq)
+"""
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+from config import Config
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the provider while the circuit is open"""
+
+class CircuitBreaker:
+    """Failure-rate and slow-call-rate circuit breaker.
+
+    closed: calls go through and their outcome (failed, slow) is recorded
+    in a sliding window of the last ``window_size`` calls. Once the window
+    holds ``minimum_calls`` outcomes and the failure rate or the slow-call
+    rate reaches its threshold, the circuit opens.
+
+    open: ``allow_request`` refuses calls so callers fall back immediately.
+    After ``open_seconds`` the circuit goes half-open.
+
+    half_open: exactly one probe call is let through; a fast success closes
+    the circuit, a failure or slow call opens it again.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name: str,
+                 failure_rate_threshold: float = Config.GROQ_BREAKER_FAILURE_RATE,
+                 slow_call_seconds: float = Config.GROQ_BREAKER_SLOW_CALL_SECONDS,
+                 slow_call_rate_threshold: float = Config.GROQ_BREAKER_SLOW_CALL_RATE,
+                 window_size: int = Config.GROQ_BREAKER_WINDOW,
+                 minimum_calls: int = Config.GROQ_BREAKER_MIN_CALLS,
+                 open_seconds: float = Config.GROQ_BREAKER_OPEN_SECONDS,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.minimum_calls = minimum_calls
+        self.open_seconds = open_seconds
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._window: deque = deque(maxlen=window_size)  # (failed, slow) per call
+        self.state = self.CLOSED
+        self.opened_at: Optional[float] = None
+        self._probe_in_flight = False
+        self.successes = 0
+        self.failures = 0
+        self.slow_calls = 0
+        self.rejected = 0
+        self.times_opened = 0
+
+    def _open(self):
+        self.state = self.OPEN
+        self.opened_at = self.clock()
+        self._probe_in_flight = False
+        self.times_opened += 1
+        print(f"⚠️  Circuit '{self.name}' opened: using fallbacks for {self.open_seconds:g}s")
+
+    def _close(self):
+        self.state = self.CLOSED
+        self.opened_at = None
+        self._probe_in_flight = False
+        self._window.clear()
+        print(f"✅ Circuit '{self.name}' closed")
+
+    def allow_request(self) -> bool:
+        """True if a call may go to the provider now"""
+        with self._lock:
+            if self.state == self.OPEN and self.clock() - self.opened_at >= self.open_seconds:
+                self.state = self.HALF_OPEN
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def _record(self, failed: bool, duration: float):
+        slow = duration >= self.slow_call_seconds
+        with self._lock:
+            if failed:
+                self.failures += 1
+            else:
+                self.successes += 1
+            if slow:
+                self.slow_calls += 1
+
+            if self.state == self.HALF_OPEN:
+                if failed or slow:
+                    self._open()
+                else:
+                    self._close()
+                return
+            if self.state == self.OPEN:
+                return
+
+            self._window.append((failed, slow))
+            calls = len(self._window)
+            if calls < self.minimum_calls:
+                return
+            failure_rate = sum(1 for f, _ in self._window if f) / calls
+            slow_rate = sum(1 for _, s in self._window if s) / calls
+            if failure_rate >= self.failure_rate_threshold or slow_rate >= self.slow_call_rate_threshold:
+                self._open()
+
+    def record_success(self, duration: float):
+        self._record(False, duration)
+
+    def record_failure(self, duration: float):
+        self._record(True, duration)
+
+    def release_probe(self):
+        """Give back a half-open probe whose call ended without an outcome
+        (cancelled), so the next request can probe instead"""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._probe_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            calls = len(self._window)
+            retry_in = None
+            if self.state == self.OPEN:
+                retry_in = round(max(0.0, self.open_seconds - (self.clock() - self.opened_at)), 1)
+            return {
+                "name": self.name,
+                "state": self.state,
+                "window_calls": calls,
+                "failure_rate": round(sum(1 for f, _ in self._window if f) / calls, 3) if calls else 0,
+                "slow_call_rate": round(sum(1 for _, s in self._window if s) / calls, 3) if calls else 0,
+                "successes": self.successes,
+                "failures": self.failures,
+                "slow_calls": self.slow_calls,
+                "rejected": self.rejected,
+                "times_opened": self.times_opened,
+                "retry_in_seconds": retry_in
+            }
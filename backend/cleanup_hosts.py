@@ -2,55 +2,39 @@
 """
 Emergency cleanup script to unblock websites
 Run this if the main program crashes and leaves websites blocked
+
+Clears the block lease file as well as the hosts file section, so the next
+server start does not block the sites again. Stop the server first: a
+running one still holds its leases in memory.
 """
 
 import os
 import platform
 import sys
 
-def get_hosts_file_path():
-    """Get the hosts file path for the current OS"""
-    if platform.system() == "Windows":
-        return r"C:\Windows\System32\drivers\etc\hosts"
-    else:  # Linux/macOS
-        return "/etc/hosts"
+from config import Config
+from hosts_file import HostsFile
+from storage import get_storage_backend
 
-def unblock_all_websites():
+def unblock_all_websites(hosts_file=None, leases_file=Config.BLOCK_LEASES_FILE, backend=None):
     """Emergency unblock all websites"""
-    hosts_file = get_hosts_file_path()
-    block_marker = "# Smart Study Orchestrator - START"
-    block_end_marker = "# Smart Study Orchestrator - END"
-    
+    hosts = HostsFile(hosts_file)
+
     try:
-        # Read hosts file
-        with open(hosts_file, 'r') as f:
-            lines = f.readlines()
-        
-        # Remove blocked entries
-        new_lines = []
-        skip_lines = False
-        removed_count = 0
-        
-        for line in lines:
-            if block_marker in line:
-                skip_lines = True
-                continue
-            elif block_end_marker in line:
-                skip_lines = False
-                continue
-            
-            if skip_lines:
-                removed_count += 1
-            else:
-                new_lines.append(line)
-        
-        # Write back to hosts file
-        with open(hosts_file, 'w') as f:
-            f.writelines(new_lines)
-        
+        # Drop the managed section (one atomic write, only if it exists)
+        content = hosts.read()
+        outside, inside, found = hosts.split(content)
+        if found:
+            hosts.write(hosts.render(outside, []))
+        removed_count = len(inside)
+
+        # Forget the leases, or the next start re-applies them
+        (backend or get_storage_backend()).save(leases_file, {"leases": []})
+
         print(f"✅ Successfully removed {removed_count} blocked website entries")
+        print("✅ Cleared block leases")
         print("🌐 All websites should now be accessible")
-        
+
         # Flush DNS cache
         if platform.system() == "Windows":
             os.system("ipconfig /flushdns")
@@ -58,9 +42,10 @@ def unblock_all_websites():
             os.system("sudo dscacheutil -flushcache")
         elif platform.system() == "Linux":
             os.system("sudo systemctl restart systemd-resolved")
-        
+
         print("✅ DNS cache flushed")
-        
+        return True
+
     except PermissionError:
         print("❌ Permission denied!")
         if platform.system() == "Windows":
@@ -69,9 +54,13 @@ def unblock_all_websites():
             print("Run this script with sudo: sudo python cleanup_hosts.py")
     except Exception as e:
         print(f"❌ Error: {e}")
+    return False
 
 if __name__ == "__main__":
+    # Data paths in Config are relative to the backend directory
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
     print("🔓 Emergency Website Unblock Tool")
     print("=" * 40)
-    unblock_all_websites()
+    ok = unblock_all_websites()
     input("\nPress Enter to exit...")
+    sys.exit(0 if ok else 1)
@@ -275,9 +275,12 @@ class StudyOrchestratorCLI:
             print(f"{Fore.YELLOW}⚠️  Website blocking error: {e}")
     
     def generate_study_plan(self, subject: str, duration: int, goals: List[str]):
-        """Generate AI-powered study plan"""
+        """Generate AI-powered study plan, showing study blocks as they stream in"""
         print(f"{Fore.BLUE}🤖 AI is generating your personalized study plan...")
         try:
+            if self.stream_study_plan(subject, duration, goals):
+                return
+            
             plan_data = {
                 "subject": subject,
                 "duration": duration,
@@ -293,25 +296,69 @@ class StudyOrchestratorCLI:
         except Exception as e:
             print(f"{Fore.YELLOW}⚠️  AI study plan generation failed: {e}")
     
-    def display_study_plan(self, plan: Dict):
-        """Display the AI-generated study plan"""
+    def stream_study_plan(self, subject: str, duration: int, goals: List[str]) -> bool:
+        """Display a plan from /api/study/plan/stream; False if streaming is unavailable"""
+        params = {"subject": subject, "duration": duration, "goals": ",".join(goals)}
+        with requests.get(f"{self.backend_url}/api/study/plan/stream", params=params,
+                          stream=True, timeout=30) as response:
+            if response.status_code != 200:
+                return False
+            
+            block_count = 0
+            event, data_lines = None, []
+            for line in response.iter_lines(decode_unicode=True):
+                if line.startswith('event:'):
+                    event = line[len('event:'):].strip()
+                elif line.startswith('data:'):
+                    data_lines.append(line[len('data:'):].strip())
+                elif not line and event:
+                    data = json.loads('\n'.join(data_lines)) if data_lines else {}
+                    if event == 'meta':
+                        self.display_plan_header(data.get("ai_mode"))
+                    elif event == 'block':
+                        if block_count == 0:
+                            print(f"\n{Fore.CYAN}📅 Study Schedule:")
+                        block_count += 1
+                        self.display_study_block(block_count, data)
+                    elif event == 'plan':
+                        if block_count == 0 and data.get("study_blocks"):
+                            self.display_study_plan(data)
+                        else:
+                            self.display_plan_details(data)
+                    elif event == 'error':
+                        print(f"{Fore.YELLOW}⚠️  Could not generate AI study plan: {data.get('error')}")
+                    event, data_lines = None, []
+            return True
+    
+    def display_plan_header(self, ai_mode: Optional[str]):
         print(f"\n{Fore.BLUE}🤖 AI-Generated Study Plan")
         print("="*40)
         
         # Check if using real AI or mock
-        if plan.get("ai_mode") == "real":
+        if ai_mode == "real":
             print(f"{Fore.GREEN}✅ Generated using real AI (Groq)")
         else:
             print(f"{Fore.YELLOW}🤖 Generated using intelligent mock AI")
+    
+    def display_study_block(self, number: int, block: Dict):
+        activity_icon = "📚" if block.get("type") == "study" else "☕"
+        print(f"  {number}. {activity_icon} {block.get('activity')} ({block.get('duration')} min)")
+        print(f"     {Fore.WHITE}{block.get('description', '')}")
+    
+    def display_study_plan(self, plan: Dict):
+        """Display the AI-generated study plan"""
+        self.display_plan_header(plan.get("ai_mode"))
         
         # Study blocks
         if "study_blocks" in plan and plan["study_blocks"]:
             print(f"\n{Fore.CYAN}📅 Study Schedule:")
             for i, block in enumerate(plan["study_blocks"], 1):
-                activity_icon = "📚" if block["type"] == "study" else "☕"
-                print(f"  {i}. {activity_icon} {block['activity']} ({block['duration']} min)")
-                print(f"     {Fore.WHITE}{block['description']}")
+                self.display_study_block(i, block)
         
+        self.display_plan_details(plan)
+    
+    def display_plan_details(self, plan: Dict):
+        """Focus techniques and resources of a study plan"""
         # Focus techniques
         if "focus_techniques" in plan and plan["focus_techniques"]:
             print(f"\n{Fore.GREEN}🧠 Recommended Focus Techniques:")
@@ -1045,19 +1092,26 @@ class StudyOrchestratorCLI:
             print(f"{Fore.RED}❌ Error saving preferences: {e}")
     
     def export_study_data(self):
-        """Export study data"""
+        """Export study data (streamed to disk as NDJSON, one session per line)"""
         try:
-            response = requests.get(f"{self.backend_url}/api/study/sessions")
-            if response.status_code == 200:
-                sessions = response.json()
-                filename = f"study_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-                
-                with open(filename, 'w') as f:
-                    json.dump(sessions, f, indent=2)
-                
-                print(f"{Fore.GREEN}✅ Study data exported to {filename}")
-            else:
-                print(f"{Fore.RED}❌ Failed to export data: {response.text}")
+            with requests.get(
+                f"{self.backend_url}/api/study/sessions/export",
+                params={"format": "ndjson"},
+                stream=True,
+                timeout=30
+            ) as response:
+                if response.status_code == 200:
+                    filename = f"study_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.ndjson"
+                    
+                    bytes_written = 0
+                    with open(filename, 'wb') as f:
+                        for chunk in response.iter_content(chunk_size=64 * 1024):
+                            f.write(chunk)
+                            bytes_written += len(chunk)
+                    
+                    print(f"{Fore.GREEN}✅ Study data exported to {filename} ({bytes_written} bytes)")
+                else:
+                    print(f"{Fore.RED}❌ Failed to export data: {response.text}")
         except Exception as e:
             print(f"{Fore.RED}❌ Error exporting data: {e}")
         
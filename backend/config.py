@@ -13,16 +13,95 @@ class Config:
     MCP_BROWSER_URL = "stdio://python mcp_servers.py"
     MCP_FILESYSTEM_URL = "stdio://python mcp_servers.py"
     
+    # Seconds a route waits on an MCP call running on the shared event loop
+    MCP_CALL_TIMEOUT = 30
+    
+    # Worker threads asgi.py uses for services that only have a blocking API
+    ASGI_BLOCKING_THREADS = 64
+    
+    # Website blocking: hosts file to manage (default: the system one for this OS)
+    HOSTS_FILE_PATH = os.environ.get('HOSTS_FILE_PATH')
+    BLOCK_REDIRECT_IP = "127.0.0.1"
+    # Subdomains a blocked domain adds to the hosts file, which has no
+    # wildcards (the DNS engine and is_blocked cover every subdomain)
+    BLOCK_WILDCARD_SUBDOMAINS = ["www", "m", "mobile", "app", "web", "api"]
+    # Blocking engine: "hosts" rewrites the hosts file, "dns" answers blocked
+    # names from an in-process DNS sinkhole (point the resolver at it) and
+    # forwards the rest upstream
+    BLOCKING_ENGINE = os.environ.get('BLOCKING_ENGINE', 'hosts')
+    DNS_SINKHOLE_HOST = os.environ.get('DNS_SINKHOLE_HOST', '127.0.0.1')
+    # Not 5353: that is mDNS, which avahi/Bonjour already listen on
+    DNS_SINKHOLE_PORT = int(os.environ.get('DNS_SINKHOLE_PORT', 5354))
+    DNS_SINKHOLE_TTL = 1  # seconds resolvers may cache a blocked answer
+    # host:port, [IPv6]:port, or a bare address for port 53
+    DNS_UPSTREAM = os.environ.get('DNS_UPSTREAM', '1.1.1.1:53')
+    DNS_UPSTREAM_TIMEOUT = 2  # seconds
+    
+    # Concurrent upstream Groq calls allowed by AsyncGroqService
+    GROQ_MAX_CONCURRENT_REQUESTS = 4
+    
+    # Deadline (seconds) for one Groq call, per endpoint
+    GROQ_DEADLINES = {
+        "analysis": 8,
+        "study_plan": 10
+    }
+    
+    # Groq circuit breaker: open when half of the last 20 calls (at least 5)
+    # failed or took 5s+, then probe again after 30s
+    GROQ_BREAKER_FAILURE_RATE = 0.5
+    GROQ_BREAKER_SLOW_CALL_SECONDS = 5
+    GROQ_BREAKER_SLOW_CALL_RATE = 0.5
+    GROQ_BREAKER_WINDOW = 20
+    GROQ_BREAKER_MIN_CALLS = 5
+    GROQ_BREAKER_OPEN_SECONDS = 30
+    
     # Study session defaults
     DEFAULT_STUDY_DURATION = 25  # minutes (Pomodoro)
     DEFAULT_BREAK_DURATION = 5   # minutes
     LONG_BREAK_DURATION = 15     # minutes
+    POMODOROS_BEFORE_LONG_BREAK = 4
+    MAX_SERIES_CYCLES = 16       # per /api/calendar/schedule-series call
     
     # Data storage
     DATA_DIR = "data"
     STUDY_SESSIONS_FILE = os.path.join(DATA_DIR, "study_sessions.json")
     USER_PREFERENCES_FILE = os.path.join(DATA_DIR, "user_preferences.json")
     CALENDAR_EVENTS_FILE = os.path.join(DATA_DIR, "calendar_events.json")
+    GOOGLE_CALENDAR_SNAPSHOT_FILE = os.path.join(DATA_DIR, "google_calendar_snapshot.json")
+    
+    # Google events are served from a local mirror that a background worker
+    # keeps current with incremental (syncToken) syncs
+    GOOGLE_SYNC_INTERVAL_SECONDS = int(os.environ.get('GOOGLE_SYNC_INTERVAL_SECONDS', 60))
+    GOOGLE_SYNC_PAGE_SIZE = 250
+    GOOGLE_BATCH_MAX_REQUESTS = 50  # Calendar API limit per batch request
+    
+    # Storage backend: "json" (flat files under DATA_DIR) or "sqlite"
+    STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'json')
+    SQLITE_DB_FILE = os.path.join(DATA_DIR, "study_orchestrator.db")
+    ANALYTICS_AGGREGATES_FILE = os.path.join(DATA_DIR, "analytics_aggregates.json")
+    # Aggregates are written by a background flusher this many seconds after
+    # the first unsaved change, so bursts of session changes share one write
+    ANALYTICS_FLUSH_DELAY_SECONDS = 1.0
+    # Hour rollups older than this are dropped (day/week/month ones are kept)
+    ANALYTICS_HOUR_RETENTION_DAYS = 90
+    AI_INSIGHTS_FILE = os.path.join(DATA_DIR, "ai_insights.json")
+    BLOCK_LEASES_FILE = os.path.join(DATA_DIR, "block_leases.json")
+    
+    # Session storage mode: "log" appends JSON-lines records next to the
+    # sessions file and compacts them in the background, "snapshot" rewrites
+    # the whole file on every change
+    SESSION_STORAGE_MODE = os.environ.get('SESSION_STORAGE_MODE', 'log')
+    SESSION_LOG_MAX_BYTES = 4 * 1024 * 1024  # compact after 4MB of log
+    SESSION_LOG_MAX_RECORDS = 5000           # or after this many records
+    SESSION_LOG_FSYNC = True                 # fsync each appended record
+    
+    # LLM response cache (memory LRU + optional files under DATA_DIR)
+    LLM_CACHE_MAX_ENTRIES = 256
+    LLM_CACHE_TTL_SECONDS = int(os.environ.get('LLM_CACHE_TTL_SECONDS', 3600))
+    LLM_CACHE_DISK = os.environ.get('LLM_CACHE_DISK', 'true').lower() == 'true'
+    LLM_CACHE_DIR = os.path.join(DATA_DIR, "llm_cache")
+    LLM_CACHE_DISK_MAX_ENTRIES = 4096     # files kept in LLM_CACHE_DIR
+    LLM_CACHE_SWEEP_INTERVAL_SECONDS = 600  # how often set() sweeps the disk tier
     
     # API Configuration
     CORS_ORIGINS = [
@@ -36,6 +115,9 @@ class Config:
     DEBUG = os.environ.get('FLASK_DEBUG', 'False').lower() == 'true'
     TESTING = False
     
+    # Pagination for GET /api/study/sessions
+    SESSIONS_PAGE_MAX_LIMIT = 500
+    
     # Rate limiting (requests per minute)
     RATE_LIMIT = 100
     
@@ -0,0 +1,289 @@
+"""
+In-process DNS sinkhole: an alternative to rewriting the hosts file
+
+Point the system (or just a browser) resolver at Config.DNS_SINKHOLE_HOST
+and Config.DNS_SINKHOLE_PORT (127.0.0.1:5354 by default; 5353 is taken by
+mDNS, and port 53 needs root). Blocked names are answered with
+Config.BLOCK_REDIRECT_IP, everything else is forwarded to
+Config.DNS_UPSTREAM. Blocking and unblocking only swap an in-memory
+lookup table, so they take effect on the next query without file I/O,
+subprocesses or root.
+"""
+import asyncio
+import ipaddress
+import socket
+import struct
+from typing import Any, Dict, Optional, Tuple
+
+from config import Config
+from async_bridge import get_async_bridge
+from domain_trie import DomainTrie
+
+QTYPE_A = 1
+QTYPE_AAAA = 28
+RCODE_FORMERR = 1
+RCODE_SERVFAIL = 2
+
+def parse_address(value: str, default_port: int = 53) -> Tuple[str, int]:
+    """'1.1.1.1:53' / '1.1.1.1' -> ('1.1.1.1', 53); IPv6 as '[::1]:53' or bare '::1'.
+
+    Raises ValueError for a malformed address or port.
+    """
+    value = value.strip()
+    if value.startswith('['):
+        host, bracket, rest = value[1:].partition(']')
+        if not bracket or (rest and not rest.startswith(':')):
+            raise ValueError(f"Invalid address: {value!r}")
+        return host, int(rest[1:]) if rest else default_port
+    if value.count(':') > 1:
+        # Unbracketed IPv6 address, which can't carry a port
+        return value, default_port
+    host, colon, port = value.partition(':')
+    if not colon:
+        return value, default_port
+    return host, int(port)
+
+def format_address(address: Tuple[str, int]) -> str:
+    """Inverse of parse_address: ('::1', 53) -> '[::1]:53'"""
+    host, port = address[:2]
+    return f"[{host}]:{port}" if ':' in host else f"{host}:{port}"
+
+def parse_question(packet: bytes) -> Tuple[int, int, str, int, int]:
+    """(query id, flags, lower-cased name, qtype, offset after the question).
+
+    Raises ValueError for anything that is not a single-question query.
+    """
+    if len(packet) < 12:
+        raise ValueError("short packet")
+    query_id, flags, qdcount = struct.unpack('!HHH', packet[:6])
+    if flags & 0x8000 or qdcount != 1:
+        raise ValueError("not a single-question query")
+    labels = []
+    offset = 12
+    while True:
+        if offset >= len(packet):
+            raise ValueError("truncated name")
+        length = packet[offset]
+        offset += 1
+        if length == 0:
+            break
+        if length & 0xC0:
+            raise ValueError("compressed name in question")
+        labels.append(packet[offset:offset + length].decode('ascii', 'replace'))
+        offset += length
+    if offset + 4 > len(packet):
+        raise ValueError("truncated question")
+    qtype, _qclass = struct.unpack('!HH', packet[offset:offset + 4])
+    return query_id, flags, '.'.join(labels).lower(), qtype, offset + 4
+
+def build_response(packet: bytes, question_end: int, rcode: int = 0,
+                   answer: Optional[Tuple[int, bytes]] = None, ttl: int = 0) -> bytes:
+    """Response echoing the query's question, with one (qtype, rdata) answer"""
+    query_id, flags = struct.unpack('!HH', packet[:4])
+    # QR, opcode and RD from the query, AA and RA set
+    flags = 0x8000 | (flags & 0x7900) | 0x0400 | 0x0080 | rcode
+    header = struct.pack('!HHHHHH', query_id, flags, 1, 1 if answer else 0, 0, 0)
+    response = header + packet[12:question_end]
+    if answer:
+        qtype, rdata = answer
+        # Name is a pointer to the question name at offset 12
+        response += struct.pack('!HHHIH', 0xC00C, qtype, 1, ttl, len(rdata)) + rdata
+    return response
+
+def error_response(packet: bytes, rcode: int) -> Optional[bytes]:
+    """Header-only error response, if the packet has at least an id"""
+    if len(packet) < 4:
+        return None
+    query_id, flags = struct.unpack('!HH', packet[:4])
+    return struct.pack('!HHHHHH', query_id, 0x8000 | (flags & 0x7900) | 0x0080 | rcode, 0, 0, 0, 0)
+
+class _ForwardProtocol(asyncio.DatagramProtocol):
+    def __init__(self, future: asyncio.Future):
+        self.future = future
+
+    def datagram_received(self, data, addr):
+        if not self.future.done():
+            self.future.set_result(data)
+
+    def error_received(self, exc):
+        if not self.future.done():
+            self.future.set_exception(exc)
+
+class _ServerProtocol(asyncio.DatagramProtocol):
+    def __init__(self, handler):
+        self.handler = handler
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        asyncio.ensure_future(self._reply(data, addr))
+
+    async def _reply(self, data, addr):
+        response = await self.handler(data)
+        if response is not None and not self.transport.is_closing():
+            self.transport.sendto(response, addr)
+
+class DnsSinkhole:
+    """UDP DNS responder running on the shared event loop (async_bridge).
+
+    ``update`` points the sinkhole at a BlockedDomainSet's matcher (a
+    DomainTrie), the one WebsiteBlockingService.is_blocked answers from:
+    a blocked domain blocks itself and every name under it. A lookup costs
+    one trie step per label of the queried name.
+    """
+
+    def __init__(self, host: str = Config.DNS_SINKHOLE_HOST, port: int = Config.DNS_SINKHOLE_PORT,
+                 upstream: str = Config.DNS_UPSTREAM, upstream_timeout: float = Config.DNS_UPSTREAM_TIMEOUT,
+                 redirect_ip: str = Config.BLOCK_REDIRECT_IP, bridge=None):
+        self.host = host
+        self.port = port
+        self.upstream = parse_address(upstream)
+        self.upstream_timeout = upstream_timeout
+        self.bridge = bridge or get_async_bridge()
+        redirect = ipaddress.ip_address(redirect_ip)
+        self.a_rdata = redirect.packed if redirect.version == 4 else socket.inet_aton('0.0.0.0')
+        self.aaaa_rdata = (ipaddress.ip_address('::1') if redirect.is_loopback else ipaddress.ip_address('::')).packed
+        self.transport = None
+        self.address: Optional[Tuple[str, int]] = None
+        self.matcher = DomainTrie()
+        self._version = self.matcher.version
+        self._names = 0  # hosts-file equivalent names at the last update
+        self.queries = 0
+        self.blocked_answers = 0
+        self.forwarded = 0
+        self.upstream_errors = 0
+
+    # Block list
+
+    def update(self, blocked) -> Tuple[bool, int]:
+        """Block what ``blocked`` (a BlockedDomainSet) blocks; later changes
+        to the set apply to the next query without another update.
+
+        Returns (changed since the last update, names blocked before), like
+        the hosts writer.
+        """
+        previous = (self.matcher, self._version, self._names)
+        self.matcher = blocked.matcher
+        self._version = self.matcher.version
+        self._names = len(blocked.hosts)
+        return previous[:2] != (self.matcher, self._version), previous[2]
+
+    def is_blocked(self, name: str) -> bool:
+        return self.matcher.matches(name.rstrip('.').lower())
+
+    # Query handling
+
+    async def handle(self, packet: bytes) -> Optional[bytes]:
+        self.queries += 1
+        try:
+            _, _, name, qtype, question_end = parse_question(packet)
+        except ValueError:
+            return error_response(packet, RCODE_FORMERR)
+
+        if self.matcher.matches(name):
+            self.blocked_answers += 1
+            answer = None
+            if qtype == QTYPE_A:
+                answer = (QTYPE_A, self.a_rdata)
+            elif qtype == QTYPE_AAAA:
+                answer = (QTYPE_AAAA, self.aaaa_rdata)
+            return build_response(packet, question_end, answer=answer, ttl=Config.DNS_SINKHOLE_TTL)
+
+        try:
+            self.forwarded += 1
+            return await self.forward(packet)
+        except (OSError, asyncio.TimeoutError, ValueError) as e:
+            self.upstream_errors += 1
+            print(f"Warning: DNS upstream {format_address(self.upstream)} failed: {e!r}")
+            return build_response(packet, question_end, rcode=RCODE_SERVFAIL)
+
+    async def forward(self, packet: bytes) -> bytes:
+        """Relay a query to the upstream resolver and return its answer"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        transport, _ = await loop.create_datagram_endpoint(
+            lambda: _ForwardProtocol(future), remote_addr=self.upstream)
+        try:
+            transport.sendto(packet)
+            response = await asyncio.wait_for(future, self.upstream_timeout)
+        finally:
+            transport.close()
+        if response[:2] != packet[:2]:
+            raise ValueError("upstream answered with a different query id")
+        return response
+
+    # Lifecycle
+
+    async def _start(self):
+        loop = asyncio.get_running_loop()
+        self.transport, _ = await loop.create_datagram_endpoint(
+            lambda: _ServerProtocol(self.handle), local_addr=(self.host, self.port))
+        self.address = self.transport.get_extra_info('sockname')[:2]
+
+    def start(self):
+        """Bind the UDP socket on the shared loop (port 0 picks a free port)"""
+        if self.transport is not None:
+            return
+        self.bridge.run(self._start(), timeout=5)
+        print(f"✅ DNS sinkhole listening on {format_address(self.address)}, "
+              f"forwarding to {format_address(self.upstream)}")
+
+    def stop(self):
+        transport, self.transport = self.transport, None
+        if transport is not None:
+            self.bridge.submit(self._close(transport)).result(5)
+
+    @staticmethod
+    async def _close(transport):
+        transport.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "listening": None if self.address is None else format_address(self.address),
+            "upstream": format_address(self.upstream),
+            "blocked_domains": len(self.matcher),
+            "queries": self.queries,
+            "blocked_answers": self.blocked_answers,
+            "forwarded": self.forwarded,
+            "upstream_errors": self.upstream_errors
+        }
+
+class StubDnsUpstream:
+    """Tiny upstream for local testing: answers every A query with one address"""
+
+    def __init__(self, answer_ip: str = '192.0.2.1', host: str = '127.0.0.1', port: int = 0, bridge=None):
+        self.answer = socket.inet_aton(answer_ip)
+        self.host = host
+        self.port = port
+        self.bridge = bridge or get_async_bridge()
+        self.transport = None
+        self.address: Optional[Tuple[str, int]] = None
+        self.queries = 0
+
+    async def handle(self, packet: bytes) -> Optional[bytes]:
+        self.queries += 1
+        try:
+            _, _, _, qtype, question_end = parse_question(packet)
+        except ValueError:
+            return error_response(packet, RCODE_FORMERR)
+        answer = (QTYPE_A, self.answer) if qtype == QTYPE_A else None
+        return build_response(packet, question_end, answer=answer, ttl=60)
+
+    async def _start(self):
+        loop = asyncio.get_running_loop()
+        self.transport, _ = await loop.create_datagram_endpoint(
+            lambda: _ServerProtocol(self.handle), local_addr=(self.host, self.port))
+        self.address = self.transport.get_extra_info('sockname')[:2]
+
+    def start(self) -> str:
+        """Start and return the 'host:port' to use as DNS_UPSTREAM"""
+        if self.transport is None:
+            self.bridge.run(self._start(), timeout=5)
+        return format_address(self.address)
+
+    def stop(self):
+        transport, self.transport = self.transport, None
+        if transport is not None:
+            self.bridge.submit(DnsSinkhole._close(transport)).result(5)
@@ -0,0 +1,117 @@
+"""
+Domain matcher: a trie over reversed labels, with wildcard entries
+"""
+from typing import Iterable, Iterator, List, Tuple
+
+EXACT = 1
+WILDCARD = 2
+_FLAGS = None  # node key holding the flags (labels are strings)
+
+def parse_blocklist(lines: Iterable[str]) -> Iterator[str]:
+    """Domains from a hosts-format ('0.0.0.0 ads.example.com') or
+    one-domain-per-line blocklist; comments and localhost entries skipped"""
+    for line in lines:
+        line = line.split('#', 1)[0].strip().lower()
+        if not line:
+            continue
+        fields = line.split()
+        for name in fields[1:] if len(fields) > 1 else fields:
+            name = name.rstrip('.')
+            if name and name not in ('localhost', 'localhost.localdomain', 'broadcasthost', '0.0.0.0'):
+                yield name
+
+class DomainTrie:
+    """Blocked names keyed label by label from the right ('com' -> 'example' -> 'www').
+
+    An exact entry matches one name; a wildcard entry for 'example.com'
+    matches the apex and every name under it. ``matches`` walks at most one
+    node per label of the queried name, whatever the number of entries.
+    ``version`` changes with every add/discard that changes the trie.
+    """
+
+    def __init__(self, names: Iterable[str] = ()):
+        self.root: dict = {}
+        self.exact_count = 0
+        self.wildcard_count = 0
+        self.version = 0
+        for name in names:
+            self.add(name)
+
+    def __len__(self) -> int:
+        return self.exact_count + self.wildcard_count
+
+    @staticmethod
+    def _labels(name: str) -> List[str]:
+        return name.rstrip('.').lower().split('.')[::-1]
+
+    def add(self, name: str, wildcard: bool = False) -> bool:
+        """Add an entry ('*.example.com' is a wildcard too); False if present"""
+        if name.startswith('*.'):
+            name, wildcard = name[2:], True
+        node = self.root
+        for label in self._labels(name):
+            child = node.get(label)
+            if child is None:
+                child = node[label] = {}
+            node = child
+        flag = WILDCARD if wildcard else EXACT
+        flags = node.get(_FLAGS, 0)
+        if flags & flag:
+            return False
+        node[_FLAGS] = flags | flag
+        if wildcard:
+            self.wildcard_count += 1
+        else:
+            self.exact_count += 1
+        self.version += 1
+        return True
+
+    def discard(self, name: str, wildcard: bool = False) -> bool:
+        """Remove an entry and prune emptied nodes; False if absent"""
+        if name.startswith('*.'):
+            name, wildcard = name[2:], True
+        path: List[Tuple[dict, str]] = []
+        node = self.root
+        for label in self._labels(name):
+            child = node.get(label)
+            if child is None:
+                return False
+            path.append((node, label))
+            node = child
+        flag = WILDCARD if wildcard else EXACT
+        flags = node.get(_FLAGS, 0)
+        if not flags & flag:
+            return False
+        if flags & ~flag:
+            node[_FLAGS] = flags & ~flag
+        else:
+            del node[_FLAGS]
+        for parent, label in reversed(path):
+            if parent[label]:
+                break
+            del parent[label]
+        if wildcard:
+            self.wildcard_count -= 1
+        else:
+            self.exact_count -= 1
+        self.version += 1
+        return True
+
+    def matches(self, host: str) -> bool:
+        """Whether an exact entry or a wildcard at or above ``host`` covers it.
+
+        ``host`` must already be lower-case, without a trailing dot.
+        """
+        node = self.root
+        for label in reversed(host.split('.')):
+            node = node.get(label)
+            if node is None:
+                return False
+            if node.get(_FLAGS, 0) & WILDCARD:
+                return True
+        return bool(node.get(_FLAGS, 0) & EXACT)
+
+    def clear(self):
+        self.root = {}
+        self.exact_count = self.wildcard_count = 0
+        self.version += 1
@@ -0,0 +1,205 @@
+"""
+In-memory stand-in for the Google Calendar v3 API, for offline testing
+"""
+import copy
+import itertools
+import threading
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+class FakeHttpError(Exception):
+    """Shaped like googleapiclient.errors.HttpError: the status is on ``resp``"""
+
+    class _Response:
+        def __init__(self, status: int, reason: str):
+            self.status = status
+            self.reason = reason
+
+    def __init__(self, status: int, reason: str):
+        super().__init__(f"<HttpError {status}: {reason}>")
+        self.resp = self._Response(status, reason)
+
+class FakeRequest:
+    """A prepared API call; nothing happens until ``execute``"""
+
+    def __init__(self, api: 'FakeCalendarAPI', method: str, func: Callable[[], Any]):
+        self.api = api
+        self.method = method
+        self.func = func
+
+    def execute(self) -> Any:
+        with self.api.lock:
+            self.api.http_requests += 1
+            self.api.calls.append(self.method)
+            return self.func()
+
+class FakeBatchRequest:
+    """Shaped like googleapiclient.http.BatchHttpRequest: the added calls go
+    out in one HTTP request and each answer is handed to its callback"""
+
+    def __init__(self, api: 'FakeCalendarAPI', callback: Optional[Callable] = None):
+        self.api = api
+        self.callback = callback
+        self.requests: List[Any] = []
+
+    def add(self, request: FakeRequest, callback: Optional[Callable] = None, request_id: Optional[str] = None):
+        if len(self.requests) >= self.api.MAX_BATCH_REQUESTS:
+            raise FakeHttpError(400, f'batch limited to {self.api.MAX_BATCH_REQUESTS} requests')
+        request_id = request_id if request_id is not None else str(len(self.requests) + 1)
+        self.requests.append((request_id, request, callback or self.callback))
+
+    def execute(self):
+        with self.api.lock:
+            self.api.http_requests += 1
+            self.api.calls.append('batch')
+            for request_id, request, callback in self.requests:
+                self.api.calls.append(request.method)
+                response, exception = None, None
+                try:
+                    response = request.func()
+                except FakeHttpError as e:
+                    exception = e
+                if callback is not None:
+                    callback(request_id, response, exception)
+
+class FakeEventsResource:
+    def __init__(self, api: 'FakeCalendarAPI'):
+        self.api = api
+
+    def list(self, calendarId: str = 'primary', syncToken: Optional[str] = None,
+             pageToken: Optional[str] = None, maxResults: int = 250, **params) -> FakeRequest:
+        return FakeRequest(self.api, 'events.list',
+                           lambda: self.api.list_events(syncToken, pageToken, maxResults, params))
+
+    def insert(self, calendarId: str = 'primary', body: Optional[Dict[str, Any]] = None) -> FakeRequest:
+        return FakeRequest(self.api, 'events.insert', lambda: self.api.insert_event(body or {}))
+
+    def patch(self, calendarId: str = 'primary', eventId: str = '', body: Optional[Dict[str, Any]] = None) -> FakeRequest:
+        return FakeRequest(self.api, 'events.patch', lambda: self.api.patch_event(eventId, body or {}))
+
+    def delete(self, calendarId: str = 'primary', eventId: str = '') -> FakeRequest:
+        return FakeRequest(self.api, 'events.delete', lambda: self.api.delete_event(eventId))
+
+class FakeCalendarAPI:
+    """Events API of one calendar, with the discovery client's call shape
+    (``service.events().list(...).execute()``), so GoogleCalendarService runs
+    against it unchanged.
+
+    Implements the incremental sync protocol: a full listing pages through
+    ``nextPageToken`` and ends with a ``nextSyncToken``; listing with that
+    token returns only events changed since, deletions included as
+    ``status: cancelled``. ``expire_sync_tokens`` makes every outstanding
+    token fail with 410 Gone, as Google does when a token is too old.
+
+    ``new_batch_http_request`` batches calls the way the real client does;
+    ``http_requests`` counts round-trips, a batch counting once.
+    """
+
+    MAX_BATCH_REQUESTS = 50
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.events_by_id: Dict[str, Dict[str, Any]] = {}
+        self.changed_at: Dict[str, int] = {}  # event id -> change sequence number
+        self.sequence = 0
+        self.token_epoch = 1  # bumped to invalidate every outstanding sync token
+        self._cursors: Dict[str, Any] = {}
+        self._cursor_ids = itertools.count(1)
+        self.http_requests = 0
+        self.calls: List[str] = []
+
+    def events(self) -> FakeEventsResource:
+        return FakeEventsResource(self)
+
+    def new_batch_http_request(self, callback: Optional[Callable] = None) -> FakeBatchRequest:
+        return FakeBatchRequest(self, callback)
+
+    # Test helpers
+
+    def expire_sync_tokens(self):
+        with self.lock:
+            self.token_epoch += 1
+
+    def stored_events(self) -> List[Dict[str, Any]]:
+        with self.lock:
+            return [copy.deepcopy(e) for e in self.events_by_id.values() if e['status'] != 'cancelled']
+
+    # API behaviour
+
+    def _touch(self, event_id: str):
+        self.sequence += 1
+        self.changed_at[event_id] = self.sequence
+
+    def _parse_sync_token(self, sync_token: str) -> int:
+        try:
+            _, epoch, since = sync_token.split('-')
+            epoch, since = int(epoch), int(since)
+        except ValueError:
+            raise FakeHttpError(400, 'invalid sync token')
+        if epoch != self.token_epoch or since > self.sequence:
+            raise FakeHttpError(410, 'fullSyncRequired')
+        return since
+
+    def list_events(self, sync_token: Optional[str], page_token: Optional[str], max_results: int,
+                    params: Dict[str, Any]) -> Dict[str, Any]:
+        if sync_token and ({'timeMin', 'timeMax', 'orderBy', 'q', 'updatedMin'} & set(params)):
+            raise FakeHttpError(400, 'syncToken cannot be combined with filters')
+
+        if page_token:
+            cursor_id, _, offset = page_token.partition(':')
+            if cursor_id not in self._cursors:
+                raise FakeHttpError(400, 'invalid page token')
+            ids, synced_to = self._cursors[cursor_id]
+            offset = int(offset)
+        else:
+            # Each listing pages over the ids matching when it started
+            if sync_token:
+                since = self._parse_sync_token(sync_token)
+                ids = [i for i in self.events_by_id if self.changed_at[i] > since]
+            else:
+                ids = [i for i, e in self.events_by_id.items() if e['status'] != 'cancelled']
+            synced_to = self.sequence
+            cursor_id = str(next(self._cursor_ids))
+            self._cursors[cursor_id] = (ids, synced_to)
+            offset = 0
+
+        page = ids[offset:offset + max_results]
+        result = {
+            'kind': 'calendar#events',
+            'items': [copy.deepcopy(self.events_by_id[i]) for i in page]
+        }
+        if offset + max_results < len(ids):
+            result['nextPageToken'] = f"{cursor_id}:{offset + max_results}"
+        else:
+            del self._cursors[cursor_id]
+            result['nextSyncToken'] = f"sync-{self.token_epoch}-{synced_to}"
+        return result
+
+    def insert_event(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        event = copy.deepcopy(body)
+        event_id = event.get('id') or uuid.uuid4().hex
+        if event_id in self.events_by_id:
+            raise FakeHttpError(409, 'duplicate')
+        event['id'] = event_id
+        event['status'] = 'confirmed'
+        event.setdefault('htmlLink', f"https://calendar.google.com/calendar/event?eid={event_id}")
+        self.events_by_id[event_id] = event
+        self._touch(event_id)
+        return copy.deepcopy(event)
+
+    def patch_event(self, event_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        event = self.events_by_id.get(event_id)
+        if event is None or event['status'] == 'cancelled':
+            raise FakeHttpError(404, 'notFound')
+        event.update(copy.deepcopy(body))
+        event['id'] = event_id
+        self._touch(event_id)
+        return copy.deepcopy(event)
+
+    def delete_event(self, event_id: str) -> str:
+        event = self.events_by_id.get(event_id)
+        if event is None or event['status'] == 'cancelled':
+            raise FakeHttpError(410 if event else 404, 'deleted' if event else 'notFound')
+        event['status'] = 'cancelled'
+        self._touch(event_id)
+        return ''
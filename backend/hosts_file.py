@@ -0,0 +1,116 @@
+"""
+Managed section of the system hosts file, rewritten atomically
+"""
+import os
+import platform
+import tempfile
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import Config
+
+BLOCK_MARKER = "# Smart Study Orchestrator - START"
+BLOCK_END_MARKER = "# Smart Study Orchestrator - END"
+
+def default_hosts_path() -> str:
+    """Hosts file path: Config.HOSTS_FILE_PATH, else the one for this OS"""
+    if Config.HOSTS_FILE_PATH:
+        return Config.HOSTS_FILE_PATH
+    if platform.system() == "Windows":
+        return r"C:\Windows\System32\drivers\etc\hosts"
+    return "/etc/hosts"  # Linux/macOS
+
+class HostsFile:
+    """The hosts file with one section of lines owned by this app.
+
+    Callers read the file once, ``split`` off the section, ``render`` the
+    new content in memory and ``write`` only if it differs. Writes go to a
+    temp file in the same directory, are fsynced and renamed over the
+    original, so readers (the resolver) see either the old or the new file,
+    never a partial one.
+    """
+
+    def __init__(self, path: Optional[str] = None,
+                 start_marker: str = BLOCK_MARKER, end_marker: str = BLOCK_END_MARKER):
+        self.path = path or default_hosts_path()
+        self.start_marker = start_marker
+        self.end_marker = end_marker
+        self.reads = 0
+        self.writes = 0
+        self.skipped_writes = 0
+
+    def read(self) -> str:
+        """Current content; raises PermissionError/OSError"""
+        self.reads += 1
+        with open(self.path, 'r', newline='') as f:
+            return f.read()
+
+    def split(self, content: str) -> Tuple[List[str], List[str], bool]:
+        """(lines outside the section, lines inside it, whether it exists)"""
+        outside: List[str] = []
+        inside: List[str] = []
+        found = False
+        in_section = False
+        for line in content.splitlines(keepends=True):
+            if self.start_marker in line:
+                found = in_section = True
+                # Drop the blank line written in front of the section
+                if outside and not outside[-1].strip():
+                    outside.pop()
+                continue
+            if self.end_marker in line:
+                in_section = False
+                continue
+            (inside if in_section else outside).append(line)
+        return outside, inside, found
+
+    def render(self, outside: List[str], section: List[str]) -> str:
+        """File content with ``section`` lines as the managed section (none if empty)"""
+        content = ''.join(outside)
+        if not section:
+            return content
+        if content and not content.endswith('\n'):
+            content += '\n'
+        return content + '\n' + self.start_marker + '\n' + ''.join(line + '\n' for line in section) + self.end_marker + '\n'
+
+    def write(self, content: str):
+        """Atomically replace the file (temp file + fsync + rename)"""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, temp_path = tempfile.mkstemp(prefix='.hosts-', dir=directory)
+        try:
+            with os.fdopen(fd, 'w', newline='') as f:
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+            try:
+                os.chmod(temp_path, os.stat(self.path).st_mode & 0o7777)
+            except OSError:
+                pass
+            try:
+                os.replace(temp_path, self.path)
+            except OSError:
+                # Bind-mounted hosts files (containers) cannot be renamed
+                # over; fall back to rewriting in place
+                os.unlink(temp_path)
+                temp_path = None
+                with open(self.path, 'r+', newline='') as f:
+                    f.write(content)
+                    f.truncate()
+                    f.flush()
+                    os.fsync(f.fileno())
+        except BaseException:
+            if temp_path is not None and os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+        self.writes += 1
+        if hasattr(os, 'O_DIRECTORY'):
+            try:
+                dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+                try:
+                    os.fsync(dir_fd)
+                finally:
+                    os.close(dir_fd)
+            except OSError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {"path": self.path, "reads": self.reads, "writes": self.writes, "skipped_writes": self.skipped_writes}
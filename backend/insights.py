@@ -0,0 +1,159 @@
+"""
+Background precomputation of AI study insights for Smart Study Orchestrator
+"""
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from analytics import session_contribution
+from config import Config
+from storage import get_storage_backend
+from utils import thaw_json
+
+def sessions_fingerprint(sessions: List[Dict[str, Any]]) -> str:
+    """Digest of what the insights are computed from: each completed session's metrics.
+
+    Stored with the insights so a restart can tell whether the sessions
+    changed since (the in-memory version counter starts over).
+    """
+    digest = hashlib.sha1()
+    count = 0
+    for session in sorted(sessions, key=lambda s: str(s.get('id'))):
+        contribution = session_contribution(session)
+        if contribution is None:
+            continue
+        count += 1
+        digest.update(json.dumps([session.get('id'), session.get('start_time'), contribution],
+                                 sort_keys=True, default=str).encode('utf-8'))
+    return f"{count}:{digest.hexdigest()}"
+
+class InsightsPrecomputer:
+    """Computes AI insights off the request path and keeps the latest result.
+
+    Registered as a session store listener: every change to a completed
+    session bumps ``version`` and wakes a background worker, which snapshots
+    the sessions, asks the Groq service for an analysis and stores it with
+    the version it was computed from. Changes that arrive while a computation
+    is running coalesce into one follow-up run. Readers get the stored result
+    immediately, marked stale when newer sessions exist. The result is saved
+    with a fingerprint of the sessions, so after a restart it is only
+    current if the sessions still match. ``clock`` can be swapped for a fake.
+    """
+
+    def __init__(self, groq_service, session_store, file_path: str = Config.AI_INSIGHTS_FILE, backend=None,
+                 clock: Callable[[], float] = time.time):
+        self.groq_service = groq_service
+        self.session_store = session_store
+        self.file_path = file_path
+        self.backend = backend or get_storage_backend()
+        self.clock = clock
+        self._cond = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+        self.data = self._load()
+        # Version the sessions are at; the stored result is current when its
+        # source_version matches. A missing result, or one computed from
+        # other sessions than the store holds now, starts out stale.
+        source_version = self.data.get('source_version', 0)
+        current = (self.data.get('insights') and
+                   self.data.get('source_fingerprint') == sessions_fingerprint(session_store.all()))
+        self.version = source_version if current else source_version + 1
+        self._attempted_version = source_version
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            data = self.backend.load(self.file_path)
+        except Exception as e:
+            print(f"Error loading AI insights: {e}")
+            data = None
+        return thaw_json(data) if isinstance(data, dict) else {}
+
+    def _save(self):
+        try:
+            self.backend.save(self.file_path, self.data)
+        except Exception as e:
+            print(f"Error saving AI insights: {e}")
+
+    # Session store listener interface (called under the store lock, so cheap)
+
+    def session_changed(self, old: Optional[Dict[str, Any]], new: Dict[str, Any]):
+        if session_contribution(old) is None and session_contribution(new) is None:
+            return
+        self.invalidate()
+
+    def sessions_reset(self, sessions: List[Dict[str, Any]]):
+        self.invalidate()
+
+    # Scheduling
+
+    def invalidate(self):
+        """Mark the stored insights stale and schedule a recomputation"""
+        with self._cond:
+            self.version += 1
+            self._cond.notify_all()
+        self.start()
+
+    def start(self):
+        """Start the background worker (idempotent)"""
+        with self._cond:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='ai-insights-worker', daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._attempted_version >= self.version:
+                    self._cond.wait()
+                target = self.version
+            self.refresh(target)
+
+    def refresh(self, target: Optional[int] = None):
+        """Compute insights for the current sessions and store them"""
+        if target is None:
+            with self._cond:
+                target = self.version
+        sessions = self.session_store.all()
+        fingerprint = sessions_fingerprint(sessions)
+        try:
+            insights = self.groq_service.analyze_study_pattern(sessions)
+        except Exception as e:
+            print(f"⚠️  AI insights precomputation failed: {e}")
+            insights = None
+
+        with self._cond:
+            self._attempted_version = max(self._attempted_version, target)
+            if insights is not None and target >= self.data.get('source_version', 0):
+                self.data = {
+                    "insights": insights,
+                    "source_version": target,
+                    "source_fingerprint": fingerprint,
+                    "computed_at": datetime.fromtimestamp(self.clock()).isoformat()
+                }
+                self._save()
+            self._cond.notify_all()
+
+    def wait_until_current(self, timeout: Optional[float] = None) -> bool:
+        """Block until the latest version has been attempted (for CLI/tests)"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._attempted_version >= self.version, timeout)
+
+    # Read API
+
+    def latest(self) -> Dict[str, Any]:
+        """Latest precomputed insights without waiting on the LLM"""
+        with self._cond:
+            data = self.data
+            stale = data.get('source_version', 0) < self.version
+        if stale:
+            self.start()
+
+        insights = data.get('insights') or self.groq_service._get_default_analysis()
+        return {
+            "insights": insights,
+            "version": data.get('source_version', 0),
+            "computed_at": data.get('computed_at'),
+            "stale": stale
+        }
@@ -0,0 +1,215 @@
+"""
+Content-addressed response cache for LLM calls (Groq)
+"""
+import copy
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from config import Config
+
+def normalize_prompt(text: str) -> str:
+    """Collapse whitespace so indentation changes don't produce new cache keys"""
+    return ' '.join(text.split())
+
+def make_cache_key(model: str, temperature: float, messages: List[Dict[str, str]]) -> str:
+    """SHA-256 of the model, temperature and normalized prompt messages"""
+    payload = {
+        "model": model,
+        "temperature": temperature,
+        "messages": [
+            {"role": message.get("role"), "content": normalize_prompt(message.get("content", ""))}
+            for message in messages
+        ]
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+class LLMResponseCache:
+    """Two-tier (memory LRU + optional disk) cache of parsed LLM responses.
+
+    Entries are keyed by ``make_cache_key`` and expire ``ttl_seconds`` after
+    they were stored. The memory tier holds at most ``max_entries`` entries
+    and evicts the least recently used one; the disk tier keeps one JSON file
+    per key under ``disk_dir`` so answers survive restarts. Values are
+    copied on the way in and out, so callers may mutate what they get.
+
+    ``sweep`` deletes expired disk entries and the oldest ones beyond
+    ``disk_max_entries``; it runs at startup and from ``set`` every
+    ``sweep_interval`` seconds, so keys that are never read again don't
+    pile up on disk.
+    """
+
+    def __init__(self, max_entries: int = Config.LLM_CACHE_MAX_ENTRIES,
+                 ttl_seconds: float = Config.LLM_CACHE_TTL_SECONDS,
+                 disk_dir: Optional[str] = None,
+                 clock: Callable[[], float] = time.time,
+                 disk_max_entries: int = Config.LLM_CACHE_DISK_MAX_ENTRIES,
+                 sweep_interval: float = Config.LLM_CACHE_SWEEP_INTERVAL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir = disk_dir
+        self.clock = clock
+        self.disk_max_entries = disk_max_entries
+        self.sweep_interval = sweep_interval
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (stored_at, value)
+        self._lock = threading.Lock()
+        self._sweep_lock = threading.Lock()
+        self._last_sweep = self.clock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.swept = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            self.sweep()
+
+    def _expired(self, stored_at: float) -> bool:
+        return self.clock() - stored_at > self.ttl_seconds
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _read_disk(self, key: str) -> Optional[tuple]:
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, 'r') as f:
+                entry = json.load(f)
+            stored_at, value = entry['stored_at'], entry['value']
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Error reading LLM cache entry {key}: {e}")
+            return None
+        if self._expired(stored_at):
+            self._remove_disk(key)
+            return None
+        return stored_at, value
+
+    def _write_disk(self, key: str, stored_at: float, value: Any):
+        if not self.disk_dir:
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, prefix='.entry-', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump({"stored_at": stored_at, "value": value}, f, default=str)
+            os.replace(tmp_path, self._disk_path(key))
+        except Exception as e:
+            print(f"Error writing LLM cache entry {key}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _remove_disk(self, key: str):
+        if self.disk_dir:
+            try:
+                os.remove(self._disk_path(key))
+            except OSError:
+                pass
+
+    def _remember(self, key: str, stored_at: float, value: Any):
+        self._entries[key] = (stored_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key: str) -> Optional[Any]:
+        """Cached value for key, or None on a miss or expired entry"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry[0]):
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(entry[1])
+
+            entry = self._read_disk(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._remember(key, *entry)
+            self.hits += 1
+            self.disk_hits += 1
+            return copy.deepcopy(entry[1])
+
+    def set(self, key: str, value: Any):
+        """Store a value under key in both tiers"""
+        stored_at = self.clock()
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._remember(key, stored_at, value)
+        self._write_disk(key, stored_at, value)
+        if self.disk_dir and stored_at - self._last_sweep >= self.sweep_interval:
+            self.sweep()
+    
+    def sweep(self) -> int:
+        """Delete expired and over-cap disk entries; returns how many"""
+        if not self.disk_dir or not self._sweep_lock.acquire(blocking=False):
+            return 0
+        try:
+            self._last_sweep = self.clock()
+            entries = []  # (stored_at, key) of live entries
+            removed = 0
+            for name in os.listdir(self.disk_dir):
+                if not name.endswith('.json'):
+                    continue
+                key = name[:-len('.json')]
+                try:
+                    with open(self._disk_path(key), 'r') as f:
+                        stored_at = float(json.load(f)['stored_at'])
+                except FileNotFoundError:
+                    continue
+                except Exception:
+                    stored_at = None  # unreadable: drop it
+                if stored_at is None or self._expired(stored_at):
+                    self._remove_disk(key)
+                    removed += 1
+                else:
+                    entries.append((stored_at, key))
+            if len(entries) > self.disk_max_entries:
+                entries.sort()
+                for _, key in entries[:len(entries) - self.disk_max_entries]:
+                    self._remove_disk(key)
+                    removed += 1
+            self.swept += removed
+            return removed
+        finally:
+            self._sweep_lock.release()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self.disk_dir and os.path.isdir(self.disk_dir):
+                for name in os.listdir(self.disk_dir):
+                    if name.endswith('.json'):
+                        self._remove_disk(name[:-len('.json')])
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "disk_tier": bool(self.disk_dir),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "swept": self.swept,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0
+            }
+
+def create_llm_cache() -> LLMResponseCache:
+    """Cache configured from Config (disk tier under DATA_DIR unless disabled)"""
+    return LLMResponseCache(disk_dir=Config.LLM_CACHE_DIR if Config.LLM_CACHE_DISK else None)
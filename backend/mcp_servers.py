@@ -6,9 +6,8 @@ import asyncio
 import json
 import os
 import shutil
-import platform
 import subprocess
-from datetime import datetime, timedelta
+from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List
 
@@ -183,71 +182,50 @@ class MockMCPServer:
 class BrowserManager:
     """Real browser management for website blocking"""
     
-    def __init__(self):
-        self.blocked_sites = set()
-        self.blocking_active = False
-        self.block_end_time = None
+    def __init__(self, blocker=None):
+        self._blocker = blocker
+    
+    @property
+    def blocker(self):
+        """Website blocker with timed leases: the one the app's MCP service
+        owns, unless one was passed in. A second WebsiteBlockingService
+        would run its own lease scheduler over the same lease and hosts
+        files and overwrite the other's changes."""
+        if self._blocker is None:
+            from services import mcp_service
+            self._blocker = mcp_service.website_blocker
+            self._blocker.start()  # no-op if the app already started it
+        return self._blocker
+    
+    @property
+    def blocked_sites(self) -> set:
+        return set(self.blocker.leases.domains())
+    
+    @property
+    def blocking_active(self) -> bool:
+        return bool(self.blocked_sites)
+    
+    @property
+    def block_end_time(self):
+        next_expiry = self.blocker.leases.next_expiry()
+        return datetime.fromtimestamp(next_expiry) if next_expiry else None
     
     def block_websites(self, websites: List[str], duration_minutes: int) -> Dict[str, Any]:
-        """Block websites for specified duration"""
+        """Block websites for specified duration (lifted automatically when it ends)"""
         try:
-            self.blocked_sites.update(websites)
-            self.blocking_active = True
-            self.block_end_time = datetime.now() + timedelta(minutes=duration_minutes)
-            
-            # Platform-specific blocking implementation
-            if platform.system() == "Windows":
-                self._block_windows(websites)
-            elif platform.system() == "Darwin":  # macOS
-                self._block_macos(websites)
-            else:  # Linux
-                self._block_linux(websites)
+            result = self.blocker.block_websites(websites, duration_minutes)
+            if not result.get("success"):
+                return result
             
             return {
                 "success": True,
                 "blocked_sites": list(websites),
                 "duration": duration_minutes,
-                "end_time": self.block_end_time.isoformat()
+                "end_time": result["blocked_until"]
             }
             
         except Exception as e:
             return {"success": False, "error": str(e)}
-    
-    def _block_windows(self, websites: List[str]):
-        """Block websites on Windows by modifying hosts file"""
-        hosts_path = r"C:\Windows\System32\drivers\etc\hosts"
-        try:
-            with open(hosts_path, 'a') as f:
-                f.write("\n# Study session blocking\n")
-                for site in websites:
-                    f.write(f"127.0.0.1 {site}\n")
-                    f.write(f"127.0.0.1 www.{site}\n")
-        except PermissionError:
-            print("Need administrator privileges to modify hosts file")
-    
-    def _block_macos(self, websites: List[str]):
-        """Block websites on macOS by modifying hosts file"""
-        hosts_path = "/etc/hosts"
-        try:
-            with open(hosts_path, 'a') as f:
-                f.write("\n# Study session blocking\n")
-                for site in websites:
-                    f.write(f"127.0.0.1 {site}\n")
-                    f.write(f"127.0.0.1 www.{site}\n")
-        except PermissionError:
-            print("Need sudo privileges to modify hosts file")
-    
-    def _block_linux(self, websites: List[str]):
-        """Block websites on Linux by modifying hosts file"""
-        hosts_path = "/etc/hosts"
-        try:
-            with open(hosts_path, 'a') as f:
-                f.write("\n# Study session blocking\n")
-                for site in websites:
-                    f.write(f"127.0.0.1 {site}\n")
-                    f.write(f"127.0.0.1 www.{site}\n")
-        except PermissionError:
-            print("Need sudo privileges to modify hosts file")
 
 class FilesystemManager:
     """Real filesystem management for study materials"""
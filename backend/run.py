@@ -1,10 +1,18 @@
+from flask import Flask
 from app import create_app
-import asyncio
-from services import mcp_service
+from async_bridge import get_async_bridge
+from config import Config
 from datetime import datetime
 import os
 
-app = create_app()
+# With debug=True the reloader runs this file twice: a parent that only
+# watches for changes and restarts, and the child that serves requests
+# (WERKZEUG_RUN_MAIN=true). The parent gets a bare app: building the real
+# one would open the session log, rebuild aggregates and start workers in
+# a second process writing data/.
+RELOADER_PARENT = __name__ == '__main__' and os.environ.get('WERKZEUG_RUN_MAIN') != 'true'
+
+app = Flask(__name__) if RELOADER_PARENT else create_app()
 
 # Set startup time for health checks
 app.config['STARTUP_TIME'] = datetime.now().isoformat()
@@ -48,24 +56,10 @@ def initialize_services():
     print("Initializing Smart Study Orchestrator...")
     has_admin = warn_about_permissions()
 
-    # Initialize MCP connections (non-blocking)
+    # Initialize MCP connections on the shared event loop the routes use
+    from services import mcp_service
     try:
-        # Create new event loop to avoid conflicts
-        if hasattr(asyncio, 'get_event_loop'):
-            try:
-                loop = asyncio.get_event_loop()
-                if loop.is_closed():
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-            except RuntimeError:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-        else:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            
-        # Run the initialization
-        loop.run_until_complete(mcp_service.initialize_connections())
+        get_async_bridge().run(mcp_service.initialize_connections(), timeout=Config.MCP_CALL_TIMEOUT)
         print("MCP services initialized successfully")
         
     except Exception as e:
@@ -83,7 +77,8 @@ if __name__ == '__main__':
     print("Health check: http://localhost:5000/health")
     print("=" * 50)
     
-    # Call initialize_services before running the app
-    initialize_services()
+    # Call initialize_services before running the app (in the serving process)
+    if not RELOADER_PARENT:
+        initialize_services()
     
     app.run(debug=True, host='0.0.0.0', port=5000)
@@ -1,13 +1,28 @@
 import os
 import asyncio
+import copy
 import json
 import platform
 import subprocess
+import threading
+import time
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterator, Tuple
 import statistics
 import uuid
 
+from config import Config
+from utils import load_json_data, save_json_data
+from llm_cache import LLMResponseCache, create_llm_cache, make_cache_key
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+from calendar_index import EventIndex
+from calendar_sync import GoogleCalendarMirror, SyncTokenExpiredError
+from storage import SQLiteBackend, get_storage_backend
+from hosts_file import HostsFile, BLOCK_MARKER, BLOCK_END_MARKER
+from block_leases import BlockLeaseScheduler, DEFAULT_HOLDER
+from block_set import BlockedDomainSet, normalize_domain
+from dns_sinkhole import DnsSinkhole
+
 # Google Calendar API imports
 try:
     from google.oauth2.credentials import Credentials
@@ -21,7 +36,7 @@ except ImportError:
 
 # Try to import Groq
 try:
-    from groq import Groq
+    from groq import Groq, AsyncGroq
     GROQ_AVAILABLE = True
 except ImportError:
     GROQ_AVAILABLE = False
@@ -32,13 +47,15 @@ except ImportError:
 # =============================================================================
 
 class GoogleCalendarService:
-    def __init__(self):
+    def __init__(self, service=None):
         self.SCOPES = ['https://www.googleapis.com/auth/calendar']
-        self.service = None
+        self.service = service
         self.credentials_file = 'creds.json'
         self.token_file = 'token.json'
         
-        if GOOGLE_CALENDAR_AVAILABLE:
+        if service is not None:
+            pass  # injected API client (e.g. google_fakes.FakeCalendarAPI)
+        elif GOOGLE_CALENDAR_AVAILABLE:
             self.authenticate()
         else:
             print("Google Calendar API not available - using mock mode")
@@ -87,28 +104,7 @@ class GoogleCalendarService:
             return {"success": False, "error": "Calendar service not authenticated"}
         
         try:
-            # Parse start time
-            start_dt = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
-            end_dt = start_dt + timedelta(minutes=duration_minutes)
-            
-            event = {
-                'summary': title,
-                'description': description,
-                'start': {
-                    'dateTime': start_dt.isoformat(),
-                    'timeZone': 'UTC',
-                },
-                'end': {
-                    'dateTime': end_dt.isoformat(),
-                    'timeZone': 'UTC',
-                },
-                'reminders': {
-                    'useDefault': False,
-                    'overrides': [
-                        {'method': 'popup', 'minutes': 10},
-                    ],
-                },
-            }
+            event = self._event_body(title, start_time, duration_minutes, description)
             
             # Create event in primary calendar
             created_event = self.service.events().insert(calendarId='primary', body=event).execute()
@@ -124,6 +120,75 @@ class GoogleCalendarService:
             print(f"Error creating Google Calendar event: {e}")
             return {"success": False, "error": str(e)}
     
+    @staticmethod
+    def _event_body(title: str, start_time: str, duration_minutes: int, description: str = "") -> Dict[str, Any]:
+        """Calendar API event resource for a new event"""
+        start_dt = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
+        end_dt = start_dt + timedelta(minutes=duration_minutes)
+        
+        return {
+            'summary': title,
+            'description': description,
+            'start': {
+                'dateTime': start_dt.isoformat(),
+                'timeZone': 'UTC',
+            },
+            'end': {
+                'dateTime': end_dt.isoformat(),
+                'timeZone': 'UTC',
+            },
+            'reminders': {
+                'useDefault': False,
+                'overrides': [
+                    {'method': 'popup', 'minutes': 10},
+                ],
+            },
+        }
+    
+    def create_events(self, events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create several events with batch requests: one HTTP round-trip per
+        Config.GOOGLE_BATCH_MAX_REQUESTS events instead of one per event.
+
+        ``events`` hold title, start_time, duration_minutes and description;
+        the results line up with them, each shaped like create_event's.
+        """
+        if not self.service:
+            return [{"success": False, "error": "Calendar service not authenticated"} for _ in events]
+        
+        results: List[Dict[str, Any]] = [{"success": False, "error": "Not sent"} for _ in events]
+        
+        def on_response(request_id, response, exception):
+            index = int(request_id)
+            if exception is not None:
+                print(f"Error creating Google Calendar event: {exception}")
+                results[index] = {"success": False, "error": str(exception)}
+            else:
+                results[index] = {
+                    "success": True,
+                    "event_id": response['id'],
+                    "event_link": response.get('htmlLink', ''),
+                    "message": "Real Google Calendar event created successfully"
+                }
+        
+        batch_size = Config.GOOGLE_BATCH_MAX_REQUESTS
+        for offset in range(0, len(events), batch_size):
+            try:
+                batch = self.service.new_batch_http_request(callback=on_response)
+                for index in range(offset, min(offset + batch_size, len(events))):
+                    spec = events[index]
+                    body = self._event_body(spec['title'], spec['start_time'],
+                                            spec['duration_minutes'], spec.get('description', ''))
+                    batch.add(self.service.events().insert(calendarId='primary', body=body),
+                              request_id=str(index))
+                batch.execute()
+            except Exception as e:
+                print(f"Error creating Google Calendar events: {e}")
+                for index in range(offset, min(offset + batch_size, len(events))):
+                    if not results[index].get("success"):
+                        results[index] = {"success": False, "error": str(e)}
+        
+        return results
+    
     def get_events(self, days_ahead: int = 7) -> List[Dict]:
         """Get events from Google Calendar"""
         if not self.service:
@@ -144,79 +209,131 @@ class GoogleCalendarService:
             
             events = events_result.get('items', [])
             
-            formatted_events = []
-            for event in events:
-                start = event['start'].get('dateTime', event['start'].get('date'))
-                formatted_events.append({
-                    'id': event['id'],
-                    'title': event.get('summary', 'No Title'),
-                    'start_time': start,
-                    'description': event.get('description', ''),
-                    'link': event.get('htmlLink', '')
-                })
-            
-            return formatted_events
+            return [self._format_event(event) for event in events]
             
         except Exception as e:
             print(f"Error getting Google Calendar events: {e}")
             return []
+    
+    @staticmethod
+    def _format_event(event: Dict[str, Any]) -> Dict[str, Any]:
+        start = event.get('start', {})
+        end = event.get('end', {})
+        return {
+            'id': event['id'],
+            'title': event.get('summary', 'No Title'),
+            'start_time': start.get('dateTime', start.get('date')),
+            'end_time': end.get('dateTime', end.get('date')),
+            'description': event.get('description', ''),
+            'link': event.get('htmlLink', ''),
+            'status': event.get('status', 'confirmed')
+        }
+    
+    def list_event_changes(self, sync_token: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+        """Page through the calendar's events and return them with the next sync token.
+
+        Without ``sync_token`` this is a full listing of live events; with it,
+        only events changed since that token, deletions included with
+        status "cancelled". Raises SyncTokenExpiredError on 410 Gone.
+        """
+        if not self.service:
+            return [], None
+        
+        params = {'calendarId': 'primary', 'singleEvents': True, 'maxResults': Config.GOOGLE_SYNC_PAGE_SIZE}
+        if sync_token:
+            params['syncToken'] = sync_token
+        
+        changes = []
+        while True:
+            try:
+                result = self.service.events().list(**params).execute()
+            except Exception as e:
+                if getattr(getattr(e, 'resp', None), 'status', None) == 410:
+                    raise SyncTokenExpiredError(str(e))
+                raise
+            changes.extend(self._format_event(event) for event in result.get('items', []))
+            page_token = result.get('nextPageToken')
+            if not page_token:
+                return changes, result.get('nextSyncToken')
+            params['pageToken'] = page_token
 
 # =============================================================================
 # REAL WEBSITE BLOCKING SERVICE
 # =============================================================================
 
 class WebsiteBlockingService:
-    def __init__(self):
-        self.hosts_file = self._get_hosts_file_path()
-        self.blocked_sites = set()
-        self.block_marker = "# Smart Study Orchestrator - START"
-        self.block_end_marker = "# Smart Study Orchestrator - END"
-        
-    def _get_hosts_file_path(self) -> str:
-        """Get the hosts file path for the current OS"""
-        if platform.system() == "Windows":
-            return r"C:\Windows\System32\drivers\etc\hosts"
-        else:  # Linux/macOS
-            return "/etc/hosts"
-    
-    def _backup_hosts_file(self):
-        """Create a backup of the hosts file"""
-        backup_path = f"{self.hosts_file}.backup"
-        try:
-            import shutil
-            shutil.copy2(self.hosts_file, backup_path)
-            return True
-        except Exception as e:
-            print(f"Error backing up hosts file: {e}")
-            return False
+    def __init__(self, hosts_file: Optional[str] = None, leases_file: str = Config.BLOCK_LEASES_FILE,
+                 clock=time.time, engine: str = Config.BLOCKING_ENGINE, sinkhole: Optional[DnsSinkhole] = None):
+        self.engine = engine
+        # The "dns" engine blocks in memory through the sinkhole and never
+        # touches the hosts file
+        self.sinkhole = (sinkhole or DnsSinkhole()) if engine == 'dns' else None
+        self.hosts = HostsFile(hosts_file)
+        self.hosts_file = self.hosts.path
+        self.block_marker = BLOCK_MARKER
+        self.block_end_marker = BLOCK_END_MARKER
+        # Every blocked site has a lease per holder; the hosts file holds
+        # exactly the leased sites and is rewritten only when a site starts
+        # or stops being blocked
+        self.leases = BlockLeaseScheduler(self._apply_blocks, file_path=leases_file, clock=clock)
+        self.blocked_sites = set(self.leases.domains())
+        
+    def _apply_blocks(self, blocked: BlockedDomainSet) -> Tuple[bool, int]:
+        """Make the hosts file section (or the sinkhole) match the blocked domain set"""
+        if self.sinkhole is not None:
+            result = self.sinkhole.update(blocked)
+        else:
+            result = self._replace_blocks(blocked.entries())
+        self.blocked_sites = set(blocked.domains())
+        return result
     
-    def _read_hosts_file(self) -> List[str]:
-        """Read the current hosts file"""
-        try:
-            with open(self.hosts_file, 'r') as f:
-                return f.readlines()
-        except PermissionError:
-            print("❌ Permission denied. Run as administrator/sudo to block websites.")
-            return []
-        except Exception as e:
-            print(f"Error reading hosts file: {e}")
-            return []
+    def start(self):
+        """Start the sinkhole (dns engine) and the lease scheduler"""
+        if self.sinkhole is not None:
+            try:
+                self.sinkhole.start()
+            except (OSError, TimeoutError) as e:
+                print(f"❌ Could not start DNS sinkhole on {self.sinkhole.host}:{self.sinkhole.port}: {e}")
+        self.leases.start()
+    
+    def stop(self):
+        self.leases.stop()
+        if self.sinkhole is not None:
+            self.sinkhole.stop()
     
-    def _write_hosts_file(self, lines: List[str]) -> bool:
-        """Write to the hosts file"""
+    def stats(self) -> Dict[str, Any]:
+        stats = self.leases.stats()
+        stats["engine"] = self.engine
+        if self.sinkhole is not None:
+            stats["sinkhole"] = self.sinkhole.stats()
+        return stats
+    
+    def _backup_hosts_file(self, content: str):
+        """Keep a copy of the hosts file as it was before any blocking"""
+        backup_path = f"{self.hosts_file}.backup"
         try:
-            with open(self.hosts_file, 'w') as f:
-                f.writelines(lines)
-            
-            # Flush DNS cache
-            self._flush_dns_cache()
-            return True
-        except PermissionError:
-            print("❌ Permission denied. Run as administrator/sudo to modify hosts file.")
-            return False
+            with open(backup_path, 'w', newline='') as f:
+                f.write(content)
         except Exception as e:
-            print(f"Error writing hosts file: {e}")
-            return False
+            print(f"Warning: Could not create hosts file backup: {e}")
+    
+    def _replace_blocks(self, entries: List[str]) -> Tuple[bool, int]:
+        """Single read, in-memory diff, at most one atomic write and one DNS flush.
+
+        Returns (changed, entries removed); raises PermissionError/OSError.
+        """
+        content = self.hosts.read()
+        outside, inside, found = self.hosts.split(content)
+        new_content = self.hosts.render(outside, entries)
+        if new_content == content:
+            self.hosts.skipped_writes += 1
+            return False, len(inside)
+        
+        if not found:
+            self._backup_hosts_file(content)
+        self.hosts.write(new_content)
+        self._flush_dns_cache()
+        return True, len(inside)
     
     def _flush_dns_cache(self):
         """Flush DNS cache to make changes take effect immediately"""
@@ -238,107 +355,183 @@ class WebsiteBlockingService:
         except Exception as e:
             print(f"Warning: Could not flush DNS cache: {e}")
     
-    def block_websites(self, websites: List[str], duration_minutes: int) -> Dict[str, Any]:
-        """Block websites by modifying hosts file"""
+    def block_websites(self, websites: List[str], duration_minutes: int,
+                       holder: str = DEFAULT_HOLDER) -> Dict[str, Any]:
+        """Block websites for ``duration_minutes`` by modifying hosts file.
+
+        Each holder (session, user) has its own lease per site; a site it
+        already blocks keeps whichever block ends later. A site blocks its
+        subdomains too ('*.example.com' means the same as 'example.com').
+        """
+        websites = [domain for domain in dict.fromkeys(normalize_domain(w) for w in websites) if domain]
         if not websites:
             return {"success": False, "error": "No websites specified"}
+        if not duration_minutes or duration_minutes <= 0:
+            duration_minutes = Config.DEFAULT_STUDY_DURATION
         
-        # Create backup first
-        if not self._backup_hosts_file():
-            print("Warning: Could not create hosts file backup")
-        
-        # Read current hosts file
-        lines = self._read_hosts_file()
-        if not lines:
-            return {"success": False, "error": "Could not read hosts file. Run as administrator/sudo."}
-        
-        # Remove any existing blocks first
-        self.unblock_websites()
-        
-        # Re-read after cleanup
-        lines = self._read_hosts_file()
-        
-        # Add new blocks
-        block_entries = [f"\n{self.block_marker}\n"]
-        for website in websites:
-            # Block both with and without www
-            block_entries.append(f"127.0.0.1 {website}\n")
-            block_entries.append(f"127.0.0.1 www.{website}\n")
-            self.blocked_sites.add(website)
-        
-        block_entries.append(f"{self.block_end_marker}\n")
+        try:
+            applied = self.leases.add(websites, duration_minutes * 60, holder=holder)
+        except PermissionError:
+            print("❌ Permission denied. Run as administrator/sudo to block websites.")
+            return {"success": False, "error": "Failed to modify hosts file. Check permissions."}
+        except Exception as e:
+            print(f"Error updating hosts file: {e}")
+            return {"success": False, "error": "Failed to modify hosts file. Check permissions."}
         
-        # Add blocks to hosts file
-        lines.extend(block_entries)
+        blocked_until = datetime.fromtimestamp(max(self.leases.expires_at(site, holder) or 0 for site in websites))
+        print(f"✅ Blocked {len(websites)} websites until {blocked_until:%H:%M}: {', '.join(websites)}")
         
-        if self._write_hosts_file(lines):
-            print(f"✅ Blocked {len(websites)} websites: {', '.join(websites)}")
-            
-            # Schedule unblocking (in a real app, you'd use a proper scheduler)
-            # For now, just return success
-            return {
-                "success": True,
-                "blocked_count": len(websites),
-                "blocked_sites": list(websites),
-                "duration_minutes": duration_minutes,
-                "message": f"Successfully blocked {len(websites)} websites",
-                "note": f"Websites will remain blocked until manually unblocked or system restart"
-            }
-        else:
-            return {"success": False, "error": "Failed to modify hosts file. Check permissions."}
+        return {
+            "success": True,
+            "blocked_count": len(websites),
+            "blocked_sites": list(websites),
+            "duration_minutes": duration_minutes,
+            "blocked_until": blocked_until.isoformat(),
+            "holder": holder,
+            "active_blocks": self.leases.domains(),
+            "hosts_changed": bool(applied and applied[0]),
+            "message": f"Successfully blocked {len(websites)} websites",
+            "note": f"Websites unblock automatically at {blocked_until:%H:%M} or when manually unblocked"
+        }
     
-    def unblock_websites(self) -> Dict[str, Any]:
-        """Remove website blocks from hosts file"""
+    def unblock_websites(self, holder: Optional[str] = None, websites: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Remove website blocks from hosts file.
+
+        Ends ``holder``'s leases (everyone's if None) on ``websites`` (all if
+        None); sites other holders still block stay blocked.
+        """
         print("🔓 Starting website unblock process...")
         
-        lines = self._read_hosts_file()
-        if not lines:
-            return {"success": False, "error": "Could not read hosts file"}
-        
-        # Remove lines between our markers
-        new_lines = []
-        skip_lines = False
-        removed_lines = 0
-        
-        for line in lines:
-            if self.block_marker in line:
-                skip_lines = True
-                continue
-            elif self.block_end_marker in line:
-                skip_lines = False
-                continue
-            
-            if skip_lines:
-                removed_lines += 1
-            else:
-                new_lines.append(line)
-        
-        if self._write_hosts_file(new_lines):
-            print(f"✅ Removed {removed_lines} blocked website entries")
-            self.blocked_sites.clear()
-            return {
-                "success": True, 
-                "message": f"Unblocked all websites ({removed_lines} entries removed)",
-                "removed_entries": removed_lines
-            }
-        else:
+        domains = None if websites is None else [normalize_domain(w) for w in websites]
+        try:
+            entries_before = len(self.leases.blocked.hosts)
+            applied = self.leases.release(domains, holder=holder)
+            if applied is None and holder is None and domains is None:
+                # Nothing was leased: still clear a section left behind
+                applied = self.leases.reapply()
+            changed = bool(applied and applied[0])
+            removed_lines = (applied[1] if applied else entries_before) - len(self.leases.blocked.hosts)
+        except PermissionError:
+            print("❌ Permission denied. Run as administrator/sudo to modify hosts file.")
+            return {"success": False, "error": "Failed to modify hosts file"}
+        except Exception as e:
+            print(f"Error updating hosts file: {e}")
             return {"success": False, "error": "Failed to modify hosts file"}
+        
+        print(f"✅ Removed {removed_lines} blocked website entries")
+        return {
+            "success": True, 
+            "message": (f"Unblocked all websites ({removed_lines} entries removed)" if holder is None
+                        else f"Released blocks held by {holder} ({removed_lines} entries removed)"),
+            "removed_entries": removed_lines,
+            "hosts_changed": changed
+        }
 
     
     def get_blocked_websites(self) -> List[str]:
         """Get currently blocked websites"""
         return list(self.blocked_sites)
+    
+    def is_blocked(self, host: str) -> bool:
+        """Whether a host name (or URL) is blocked, wildcards included"""
+        host = normalize_domain(host)
+        return bool(host) and self.leases.blocked.is_blocked(host)
+
+# =============================================================================
+# STREAMING STUDY PLAN PARSER
+# =============================================================================
+
+class StudyBlockStreamParser:
+    """Pulls complete objects out of a reply's "study_blocks" array while the
+    JSON is still streaming in.
+
+    ``feed`` takes the next piece of text and returns the blocks completed
+    by it; the scan tracks string/escape state and brace depth so it never
+    re-reads text. The full text is kept for parsing the finished reply.
+    """
+    
+    def __init__(self):
+        self.text = ''
+        self.pos = 0
+        self.state = 'seek'  # seek -> blocks -> done
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.block_start = 0
+    
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        self.text += chunk
+        blocks = []
+        
+        if self.state == 'seek':
+            key = self.text.find('"study_blocks"')
+            bracket = self.text.find('[', key) if key >= 0 else -1
+            if bracket < 0:
+                return blocks
+            self.state = 'blocks'
+            self.pos = bracket + 1
+        
+        if self.state == 'blocks':
+            text = self.text
+            i = self.pos
+            while i < len(text):
+                char = text[i]
+                i += 1
+                if self.in_string:
+                    if self.escaped:
+                        self.escaped = False
+                    elif char == '\\':
+                        self.escaped = True
+                    elif char == '"':
+                        self.in_string = False
+                elif char == '"':
+                    self.in_string = True
+                elif char == '{':
+                    if self.depth == 0:
+                        self.block_start = i - 1
+                    self.depth += 1
+                elif char == '}':
+                    self.depth -= 1
+                    if self.depth == 0:
+                        try:
+                            blocks.append(json.loads(text[self.block_start:i]))
+                        except ValueError:
+                            pass
+                elif char == ']' and self.depth == 0:
+                    self.state = 'done'
+                    break
+            self.pos = i
+        
+        return blocks
+
+def fake_completion_stream(text: str, chunk_size: int = 16) -> Iterator[str]:
+    """Deterministic stand-in for a streamed completion: text in fixed-size pieces"""
+    for start in range(0, len(text), chunk_size):
+        yield text[start:start + chunk_size]
 
 # =============================================================================
 # ENHANCED GROQ SERVICE (with better error handling)
 # =============================================================================
 
 class GroqService:
-    def __init__(self):
-        self.groq_available = GROQ_AVAILABLE and bool(os.getenv('GROQ_API_KEY'))
+    ANALYSIS_SYSTEM_PROMPT = "You are an AI study coach. Respond only with valid JSON."
+    STUDY_PLAN_SYSTEM_PROMPT = "You are a study planner. Respond only with valid JSON."
+    
+    def __init__(self, client=None, cache: Optional[LLMResponseCache] = None,
+                 breaker: Optional[CircuitBreaker] = None):
+        # Any object with the Groq client's chat.completions.create() can be
+        # passed in as client (e.g. a stub in tests)
+        self.groq_available = client is not None or (GROQ_AVAILABLE and bool(os.getenv('GROQ_API_KEY')))
+        self.cache = cache or create_llm_cache()
+        # While open, calls skip the provider and go straight to the mock fallbacks
+        self.breaker = breaker or CircuitBreaker('groq')
         
-        if self.groq_available:
-            self.client = Groq(api_key=os.getenv('GROQ_API_KEY'))
+        if client is not None:
+            self.client = client
+            self.model = "llama-3.1-8b-instant"
+        elif self.groq_available:
+            # No SDK retries: a failed call falls back at once and counts towards the breaker
+            self.client = Groq(api_key=os.getenv('GROQ_API_KEY'), max_retries=0)
             self.model = "llama-3.1-8b-instant"
             print("✅ Groq AI service initialized successfully")
         else:
@@ -346,18 +539,62 @@ class GroqService:
             self.model = None
             print("⚠️  Groq AI service initialized in mock mode (add GROQ_API_KEY for real AI)")
     
-    def analyze_study_pattern(self, study_sessions: List[Dict]) -> Dict[str, Any]:
-        """Analyze study patterns using real AI or intelligent mock"""
+    def _complete_json(self, system_prompt: str, prompt: str, temperature: float, max_tokens: int,
+                       deadline: float) -> Dict[str, Any]:
+        """Run a chat completion and parse its JSON reply.
+
+        Replies are cached by model, temperature and normalized prompt, so
+        repeated identical requests don't go back to the network. The call
+        is limited to ``deadline`` seconds and refused with
+        CircuitOpenError while the breaker is open.
+        """
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt}
+        ]
+        cache_key = make_cache_key(self.model, temperature, messages)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
         
-        if not self.groq_available:
-            print("🤖 Using intelligent mock analysis (set GROQ_API_KEY for real AI)")
-            return self._get_intelligent_mock_analysis(study_sessions)
+        if not self.breaker.allow_request():
+            raise CircuitOpenError("Groq circuit is open")
         
-        # Real AI analysis
-        print("🤖 Using real Groq AI for analysis")
+        started = time.monotonic()
+        try:
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                timeout=deadline
+            )
+            parsed_result = self._parse_json_reply(response.choices[0].message.content)
+        except Exception:
+            self.breaker.record_failure(time.monotonic() - started)
+            raise
+        self.breaker.record_success(time.monotonic() - started)
+        
+        self.cache.set(cache_key, parsed_result)
+        return parsed_result
+    
+    @staticmethod
+    def _parse_json_reply(content: str) -> Dict[str, Any]:
+        result = content.strip()
+        
+        # Clean up markdown if present
+        if result.startswith('```'):
+            lines = result.split('\n')
+            result = '\n'.join(lines[1:-1] if lines[-1].strip() == '```' else lines[1:])
+
+        parsed_result = json.loads(result)
+        parsed_result["ai_mode"] = "real"
+        return parsed_result
+    
+    def _analysis_prompt(self, study_sessions: List[Dict]) -> str:
         limited_sessions = study_sessions[-3:] if len(study_sessions) > 3 else study_sessions
         
-        prompt = f"""
+        return f"""
         Analyze these study sessions and provide insights in JSON format:
         
         Sessions: {json.dumps(limited_sessions, indent=2)}
@@ -380,47 +617,11 @@ class GroqService:
             }}
         }}
         """
-        
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are an AI study coach. Respond only with valid JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                max_tokens=600,
-                timeout=15
-            )
-            
-            result = response.choices[0].message.content.strip()
-            
-            # Clean up markdown if present
-            if result.startswith('```'):
-                lines = result.split('\n')
-                result = '\n'.join(lines[1:-1] if lines[-1].strip() == '```' else lines[1:])
-
-            parsed_result = json.loads(result)
-            parsed_result["ai_mode"] = "real"
-            return parsed_result
-            
-        except Exception as e:
-            print(f"⚠️  Real AI analysis failed: {e}")
-            print("🤖 Falling back to intelligent mock analysis")
-            return self._get_intelligent_mock_analysis(study_sessions)
     
-    def generate_study_plan(self, subject: str, duration: int, goals: List[str]) -> Dict[str, Any]:
-        """Generate study plan using real AI or intelligent mock"""
-        
-        if not self.groq_available:
-            print("🤖 Using intelligent mock study plan (set GROQ_API_KEY for real AI)")
-            return self._get_intelligent_mock_study_plan(subject, duration, goals)
-        
-        # Real AI study plan generation
-        print("🤖 Using real Groq AI for study plan generation")
+    def _study_plan_prompt(self, subject: str, duration: int, goals: List[str]) -> str:
         goals_text = ', '.join(goals[:3]) if goals else f"Study {subject}"
         
-        prompt = f"""
+        return f"""
         Create a study plan for:
         - Subject: {subject}
         - Duration: {duration} minutes  
@@ -437,35 +638,129 @@ class GroqService:
             "distraction_management": ["Phone away", "Clean workspace"]
         }}
         """
+    
+    def analyze_study_pattern(self, study_sessions: List[Dict]) -> Dict[str, Any]:
+        """Analyze study patterns using real AI or intelligent mock"""
+        
+        if not self.groq_available:
+            print("🤖 Using intelligent mock analysis (set GROQ_API_KEY for real AI)")
+            return self._get_intelligent_mock_analysis(study_sessions)
         
+        # Real AI analysis
+        print("🤖 Using real Groq AI for analysis")
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a study planner. Respond only with valid JSON."},
-                    {"role": "user", "content": prompt}
-                ],
+            return self._complete_json(
+                self.ANALYSIS_SYSTEM_PROMPT,
+                self._analysis_prompt(study_sessions),
+                temperature=0.3,
+                max_tokens=600,
+                deadline=Config.GROQ_DEADLINES["analysis"]
+            )
+            
+        except Exception as e:
+            print(f"⚠️  Real AI analysis failed: {e}")
+            print("🤖 Falling back to intelligent mock analysis")
+            return self._get_intelligent_mock_analysis(study_sessions)
+    
+    def generate_study_plan(self, subject: str, duration: int, goals: List[str]) -> Dict[str, Any]:
+        """Generate study plan using real AI or intelligent mock"""
+        
+        if not self.groq_available:
+            print("🤖 Using intelligent mock study plan (set GROQ_API_KEY for real AI)")
+            return self._get_intelligent_mock_study_plan(subject, duration, goals)
+        
+        # Real AI study plan generation
+        print("🤖 Using real Groq AI for study plan generation")
+        try:
+            return self._complete_json(
+                self.STUDY_PLAN_SYSTEM_PROMPT,
+                self._study_plan_prompt(subject, duration, goals),
                 temperature=0.4,
                 max_tokens=500,
-                timeout=15
+                deadline=Config.GROQ_DEADLINES["study_plan"]
             )
             
-            result = response.choices[0].message.content.strip()
-            
-            # Clean up markdown if present
-            if result.startswith('```'):
-                lines = result.split('\n')
-                result = '\n'.join(lines[1:-1] if lines[-1].strip() == '```' else lines[1:])
-
-            parsed_result = json.loads(result)
-            parsed_result["ai_mode"] = "real"
-            return parsed_result
-            
         except Exception as e:
             print(f"⚠️  Real AI study plan failed: {e}")
             print("🤖 Falling back to intelligent mock study plan")
             return self._get_intelligent_mock_study_plan(subject, duration, goals)
     
+    def _stream_plan_events(self, chunks: Iterator[str]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """("block", block) events for a streamed reply, then ("plan", plan)"""
+        parser = StudyBlockStreamParser()
+        for chunk in chunks:
+            for block in parser.feed(chunk):
+                yield "block", block
+        yield "plan", self._parse_json_reply(parser.text)
+    
+    def stream_study_plan(self, subject: str, duration: int, goals: List[str]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Generate a study plan as a stream of events.
+
+        Yields ("meta", {"ai_mode": ...}) first, then ("block", block) for
+        each study block as soon as it has been parsed, then ("plan", plan)
+        with the complete plan. The plan event is authoritative: if the
+        real stream fails part-way it carries the mock fallback plan.
+        """
+        if not self.groq_available:
+            # Stream the mock plan through the same parser, deterministically
+            mock_plan = self._get_intelligent_mock_study_plan(subject, duration, goals)
+            yield "meta", {"ai_mode": mock_plan["ai_mode"]}
+            for event, data in self._stream_plan_events(fake_completion_stream(json.dumps(mock_plan))):
+                yield event, (mock_plan if event == "plan" else data)
+            return
+        
+        messages = [
+            {"role": "system", "content": self.STUDY_PLAN_SYSTEM_PROMPT},
+            {"role": "user", "content": self._study_plan_prompt(subject, duration, goals)}
+        ]
+        cache_key = make_cache_key(self.model, 0.4, messages)
+        yield "meta", {"ai_mode": "real"}
+        
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            for block in cached.get("study_blocks", []):
+                yield "block", block
+            yield "plan", cached
+            return
+        
+        print("🤖 Streaming real Groq AI study plan")
+        deadline = Config.GROQ_DEADLINES["study_plan"]
+        started = time.monotonic()
+        outcome_recorded = False
+        try:
+            if not self.breaker.allow_request():
+                raise CircuitOpenError("Groq circuit is open")
+            try:
+                stream = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    temperature=0.4,
+                    max_tokens=500,
+                    timeout=deadline,
+                    stream=True
+                )
+                chunks = (chunk.choices[0].delta.content or '' for chunk in stream if chunk.choices)
+                for event, data in self._stream_plan_events(chunks):
+                    if event == "plan":
+                        self.breaker.record_success(time.monotonic() - started)
+                        outcome_recorded = True
+                        self.cache.set(cache_key, data)
+                    elif time.monotonic() - started > deadline:
+                        raise TimeoutError(f"Study plan stream exceeded its {deadline}s deadline")
+                    yield event, data
+            except Exception:
+                self.breaker.record_failure(time.monotonic() - started)
+                outcome_recorded = True
+                raise
+            finally:
+                if not outcome_recorded:
+                    # The client went away mid-stream; the provider was responding
+                    self.breaker.record_success(time.monotonic() - started)
+        except Exception as e:
+            print(f"⚠️  Real AI study plan stream failed: {e}")
+            print("🤖 Falling back to intelligent mock study plan")
+            yield "plan", self._get_intelligent_mock_study_plan(subject, duration, goals)
+    
     def _get_intelligent_mock_analysis(self, study_sessions: List[Dict]) -> Dict[str, Any]:
         """Generate intelligent mock analysis based on actual session data"""
         
@@ -578,6 +873,177 @@ class GroqService:
             "ai_mode": "intelligent_mock"
         }
 
+# =============================================================================
+# ASYNC GROQ SERVICE (single-flight request coalescing)
+# =============================================================================
+
+class AsyncGroqService:
+    """Async variant of GroqService for bursty traffic.
+
+    Identical requests (same cache key as GroqService's response cache) that
+    are in flight at the same time share one upstream call: the first caller
+    starts it and later callers await the same task. Upstream calls are
+    capped by a semaphore; ``stats()`` reports how many are queued behind it.
+    Prompts, parsing, caching and the mock fallbacks are those of the
+    wrapped GroqService.
+    """
+    
+    def __init__(self, groq_service: GroqService, async_client=None,
+                 max_concurrency: int = Config.GROQ_MAX_CONCURRENT_REQUESTS):
+        self.groq_service = groq_service
+        self.max_concurrency = max_concurrency
+        
+        if async_client is not None:
+            self.client = async_client
+        elif GROQ_AVAILABLE and os.getenv('GROQ_API_KEY'):
+            self.client = AsyncGroq(api_key=os.getenv('GROQ_API_KEY'), max_retries=0)
+        else:
+            # Mock mode, or an injected sync client run in worker threads
+            self.client = None
+        
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self.queued = 0
+        self.active = 0
+        self.upstream_calls = 0
+        self.coalesced = 0
+    
+    @property
+    def groq_available(self) -> bool:
+        return self.groq_service.groq_available
+    
+    async def _create_completion(self, **request):
+        if self.client is not None:
+            return await self.client.chat.completions.create(**request)
+        return await asyncio.to_thread(self.groq_service.client.chat.completions.create, **request)
+    
+    async def _limited_completion(self, started: float, deadline: float, **request):
+        """Completion once a semaphore slot is free; ``async with`` gives the
+        slot back however the wait or the call ends, cancellation included"""
+        self.queued += 1
+        waiting = True
+        try:
+            async with self._semaphore:
+                self.queued -= 1
+                waiting = False
+                self.active += 1
+                self.upstream_calls += 1
+                try:
+                    request["timeout"] = max(0.1, deadline - (time.monotonic() - started))
+                    return await self._create_completion(**request)
+                finally:
+                    self.active -= 1
+        finally:
+            if waiting:
+                self.queued -= 1
+    
+    async def _call_upstream(self, cache_key: str, messages: List[Dict[str, str]],
+                             temperature: float, max_tokens: int, deadline: float) -> Dict[str, Any]:
+        breaker = self.groq_service.breaker
+        if not breaker.allow_request():
+            raise CircuitOpenError("Groq circuit is open")
+        
+        # The deadline covers the wait for a semaphore slot as well
+        started = time.monotonic()
+        outcome_recorded = False
+        try:
+            try:
+                response = await asyncio.wait_for(self._limited_completion(
+                    started, deadline,
+                    model=self.groq_service.model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens
+                ), deadline)
+                parsed_result = self.groq_service._parse_json_reply(response.choices[0].message.content)
+            except Exception:
+                breaker.record_failure(time.monotonic() - started)
+                outcome_recorded = True
+                raise
+            breaker.record_success(time.monotonic() - started)
+            outcome_recorded = True
+        finally:
+            if not outcome_recorded:
+                # Cancelled: not the provider's fault, but a half-open probe must be given back
+                breaker.release_probe()
+        
+        self.groq_service.cache.set(cache_key, parsed_result)
+        return parsed_result
+    
+    def _forget_in_flight(self, cache_key: str, task: asyncio.Task):
+        # Only if still current: a newer call for the key may have replaced it
+        if self._in_flight.get(cache_key) is task:
+            del self._in_flight[cache_key]
+    
+    async def _complete_json(self, system_prompt: str, prompt: str, temperature: float, max_tokens: int,
+                             deadline: float) -> Dict[str, Any]:
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt}
+        ]
+        cache_key = make_cache_key(self.groq_service.model, temperature, messages)
+        cached = self.groq_service.cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        task = self._in_flight.get(cache_key)
+        if task is None:
+            task = asyncio.ensure_future(self._call_upstream(cache_key, messages, temperature, max_tokens, deadline))
+            self._in_flight[cache_key] = task
+            task.add_done_callback(lambda done: self._forget_in_flight(cache_key, done))
+        else:
+            self.coalesced += 1
+        
+        # shield: a caller that is cancelled must not cancel the shared call
+        result = await asyncio.shield(task)
+        return copy.deepcopy(result)
+    
+    async def analyze_study_pattern(self, study_sessions: List[Dict]) -> Dict[str, Any]:
+        """Analyze study patterns using real AI or intelligent mock"""
+        if not self.groq_available:
+            return self.groq_service._get_intelligent_mock_analysis(study_sessions)
+        
+        try:
+            return await self._complete_json(
+                GroqService.ANALYSIS_SYSTEM_PROMPT,
+                self.groq_service._analysis_prompt(study_sessions),
+                temperature=0.3,
+                max_tokens=600,
+                deadline=Config.GROQ_DEADLINES["analysis"]
+            )
+        except Exception as e:
+            print(f"⚠️  Real AI analysis failed: {e}")
+            print("🤖 Falling back to intelligent mock analysis")
+            return self.groq_service._get_intelligent_mock_analysis(study_sessions)
+    
+    async def generate_study_plan(self, subject: str, duration: int, goals: List[str]) -> Dict[str, Any]:
+        """Generate study plan using real AI or intelligent mock"""
+        if not self.groq_available:
+            return self.groq_service._get_intelligent_mock_study_plan(subject, duration, goals)
+        
+        try:
+            return await self._complete_json(
+                GroqService.STUDY_PLAN_SYSTEM_PROMPT,
+                self.groq_service._study_plan_prompt(subject, duration, goals),
+                temperature=0.4,
+                max_tokens=500,
+                deadline=Config.GROQ_DEADLINES["study_plan"]
+            )
+        except Exception as e:
+            print(f"⚠️  Real AI study plan failed: {e}")
+            print("🤖 Falling back to intelligent mock study plan")
+            return self.groq_service._get_intelligent_mock_study_plan(subject, duration, goals)
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "active": self.active,
+            "queue_depth": self.queued,
+            "in_flight": len(self._in_flight),
+            "upstream_calls": self.upstream_calls,
+            "coalesced": self.coalesced
+        }
+
 # =============================================================================
 # REAL MCP SERVICE (combining real implementations)
 # =============================================================================
@@ -586,6 +1052,11 @@ class RealMCPService:
     def __init__(self):
         self.calendar_service = GoogleCalendarService()
         self.website_blocker = WebsiteBlockingService()
+        # The integrations are blocking and not thread-safe, so their calls
+        # run in worker threads (keeping the event loop free) one at a time
+        # per integration
+        self._calendar_lock = threading.Lock()
+        self._blocker_lock = threading.Lock()
         self.connected = True
         self.mock_mode = not (GOOGLE_CALENDAR_AVAILABLE and self.calendar_service.service)
         
@@ -597,18 +1068,29 @@ class RealMCPService:
     async def initialize_connections(self):
         """Initialize all MCP connections"""
         try:
+            # Re-arm block leases left from the last run (expired ones are lifted)
+            await self._run_blocking(self._blocker_lock, self.website_blocker.start)
             self.connected = True
             print("✅ Real MCP services connected successfully")
         except Exception as e:
             print(f"Error in MCP initialization: {e}")
             self.connected = False
     
+    @staticmethod
+    async def _run_blocking(lock: threading.Lock, func, *args):
+        """Run a blocking integration call in a worker thread under its lock"""
+        def call():
+            with lock:
+                return func(*args)
+        return await asyncio.to_thread(call)
+    
     async def create_calendar_event(self, title: str, start_time: str, duration: int) -> Dict[str, Any]:
         """Create real calendar event"""
         print(f"🗓️  Creating real Google Calendar event: {title}")
         
         if self.calendar_service.service:
-            result = self.calendar_service.create_event(title, start_time, duration)
+            result = await self._run_blocking(
+                self._calendar_lock, self.calendar_service.create_event, title, start_time, duration)
             return result
         else:
             return {
@@ -617,25 +1099,28 @@ class RealMCPService:
                 "fallback": "Event not created - check Google Calendar setup"
             }
     
-    async def block_distracting_websites(self, websites: List[str], duration: int) -> Dict[str, Any]:
+    async def block_distracting_websites(self, websites: List[str], duration: int,
+                                         holder: str = DEFAULT_HOLDER) -> Dict[str, Any]:
         """Block websites using real system-level blocking"""
         print(f"🚫 Blocking {len(websites)} websites at system level")
         
-        result = self.website_blocker.block_websites(websites, duration)
+        result = await self._run_blocking(
+            self._blocker_lock, self.website_blocker.block_websites, websites, duration, holder)
         return result
     
-    async def unblock_websites(self) -> Dict[str, Any]:
-        """Unblock all websites"""
+    async def unblock_websites(self, holder: Optional[str] = None) -> Dict[str, Any]:
+        """Unblock all websites (only ``holder``'s blocks if given)"""
         print("🔓 Unblocking all websites")
-        return self.website_blocker.unblock_websites()
+        return await self._run_blocking(self._blocker_lock, self.website_blocker.unblock_websites, holder)
     
     async def get_blocked_websites(self) -> List[str]:
         """Get list of currently blocked websites"""
-        return self.website_blocker.get_blocked_websites()
+        return await self._run_blocking(self._blocker_lock, self.website_blocker.get_blocked_websites)
     
     async def close_connections(self):
         """Close MCP connections"""
         print("🔌 Closing MCP connections")
+        self.website_blocker.stop()
         self.connected = False
 
 # =============================================================================
@@ -643,9 +1128,18 @@ class RealMCPService:
 # =============================================================================
 
 class StudyAnalyzer:
-    def generate_analytics(self, sessions_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def __init__(self, aggregates=None, columns=None):
+        # Running totals (analytics.StudyAggregates) and the columnar engine
+        # (analytics.SessionColumns), both kept up to date by the session store
+        self.aggregates = aggregates
+        self.columns = columns
+    
+    def generate_analytics(self, sessions_data: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
         """Generate comprehensive analytics from study sessions"""
         
+        if self.aggregates is not None and sessions_data is None:
+            return self._generate_from_aggregates()
+        
         if not sessions_data:
             return self._get_empty_analytics()
         
@@ -664,6 +1158,30 @@ class StudyAnalyzer:
             "analysis_date": datetime.now().isoformat()
         }
     
+    def _generate_from_aggregates(self) -> Dict[str, Any]:
+        """Build analytics from the running aggregates in constant time"""
+        weekly_stats = self.aggregates.summary()
+        subject_performance = self.aggregates.subject_performance()
+        productivity_patterns = {"best_time_slot": "morning"}
+        time_distribution = {}
+        
+        if self.columns is not None:
+            for subject, performance in self.columns.subject_performance().items():
+                subject_performance.setdefault(subject, {}).update(performance)
+            productivity_patterns = self.columns.productivity_patterns()
+            time_distribution = self.columns.time_distribution()
+        
+        return {
+            "weekly_stats": weekly_stats,
+            "this_week": self.aggregates.current_week(),
+            "productivity_patterns": productivity_patterns,
+            "subject_performance": subject_performance,
+            "time_distribution": time_distribution,
+            "overview": self.aggregates.overview().to_dict(),
+            "total_sessions": weekly_stats["total_sessions"],
+            "analysis_date": datetime.now().isoformat()
+        }
+    
     def _calculate_weekly_stats(self, sessions: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Calculate weekly statistics (optimized)"""
         
@@ -713,30 +1231,54 @@ class StudyAnalyzer:
 # =============================================================================
 
 class CalendarService:
-    def __init__(self):
-        self.google_calendar = GoogleCalendarService()
-        self.events_file = "data/calendar_events.json"
-        self.events = self._load_events()
+    def __init__(self, google_calendar=None, backend=None):
+        self.google_calendar = google_calendar or GoogleCalendarService()
+        self.events_file = Config.CALENDAR_EVENTS_FILE
+        self.backend = backend or get_storage_backend()
+        # With SQLite every change is a single-row upsert/delete, so several
+        # processes can write events without overwriting each other, and
+        # events are reloaded when another process commits
+        self._db = self.backend if isinstance(self.backend, SQLiteBackend) else None
+        self._db_version = None
+        self._lock = threading.RLock()
+        # Id map + Google id map + interval tree: the only copy of the local
+        # events, so adding or deleting one never scans a list
+        self.index = EventIndex(self._load_events())
+        
+        # Google events as of the last sync, already in merged form. Requests
+        # read the mirror; only its sync worker and sync_external_calendar
+        # talk to Google.
+        self.google_mirror = GoogleCalendarMirror(self.google_calendar, backend=backend)
+    
+    @property
+    def events(self) -> List[Dict[str, Any]]:
+        """Local events in insertion order (a new list; change them through the service)"""
+        return self.index.events()
     
     def _load_events(self) -> List[Dict[str, Any]]:
-        """Load events from storage"""
-        try:
-            if os.path.exists(self.events_file):
-                with open(self.events_file, 'r') as f:
-                    return json.load(f)
-            return []
-        except Exception as e:
-            print(f"Error loading calendar events: {e}")
-            return []
+        """Load events from the configured storage backend"""
+        if self._db:
+            self._db_version = self._db.data_version()
+            return self._db.load(self.events_file)
+        return load_json_data(self.events_file, mutable=True)
     
-    def _save_events(self):
-        """Save events to storage"""
-        try:
-            os.makedirs(os.path.dirname(self.events_file), exist_ok=True)
-            with open(self.events_file, 'w') as f:
-                json.dump(self.events, f, indent=2)
-        except Exception as e:
-            print(f"Error saving calendar events: {e}")
+    def _refresh(self):
+        """Reload if another process committed to the database"""
+        if self._db and self._db.data_version() != self._db_version:
+            self.index.rebuild(self._load_events())
+    
+    def _save_events(self, *changed: Dict[str, Any]):
+        """Persist ``changed`` events (SQLite) or the whole event list (JSON)"""
+        if self._db:
+            self._db.upsert(self.events_file, *changed)
+        elif not save_json_data(self.events_file, self.events):
+            print("Error saving calendar events")
+    
+    def _delete_saved_event(self, event_id: str):
+        if self._db:
+            self._db.delete(self.events_file, event_id)
+        else:
+            self._save_events()
     
     def create_event(self, title: str, start_time: str, duration_minutes: int, description: str = "") -> str:
         """Create event in both Google Calendar and local storage"""
@@ -744,6 +1286,47 @@ class CalendarService:
         # Try to create in Google Calendar first
         google_result = self.google_calendar.create_event(title, start_time, duration_minutes, description)
         
+        event = self._new_event(title, start_time, duration_minutes, description, google_result)
+        
+        with self._lock:
+            self._refresh()
+            self.index.add(event)
+            self._save_events(event)
+        
+        if google_result.get("success"):
+            print(f"✅ Event created in Google Calendar: {google_result.get('event_link', '')}")
+        
+        return event["id"]
+    
+    def create_events(self, events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create several events: one Google batch request and one local write.
+
+        ``events`` hold title, start_time, duration_minutes and description.
+        """
+        google_results = self.google_calendar.create_events(events)
+        
+        created = [
+            self._new_event(spec['title'], spec['start_time'], spec['duration_minutes'],
+                            spec.get('description', ''), google_result)
+            for spec, google_result in zip(events, google_results)
+        ]
+        
+        with self._lock:
+            self._refresh()
+            for event in created:
+                self.index.add(event)
+            self._save_events(*created)
+        
+        synced = sum(1 for result in google_results if result.get("success"))
+        if synced:
+            print(f"✅ {synced} events created in Google Calendar")
+        
+        return created
+    
+    @staticmethod
+    def _new_event(title: str, start_time: str, duration_minutes: int, description: str,
+                   google_result: Dict[str, Any]) -> Dict[str, Any]:
+        """Local event record, linked to its Google event if that was created"""
         event_id = str(uuid.uuid4())
         
         # Parse start time
@@ -757,7 +1340,7 @@ class CalendarService:
         
         end_dt = start_dt + timedelta(minutes=duration_minutes)
         
-        event = {
+        return {
             "id": event_id,
             "title": title,
             "description": description,
@@ -770,98 +1353,93 @@ class CalendarService:
             "google_calendar_id": google_result.get("event_id") if google_result.get("success") else None,
             "google_calendar_link": google_result.get("event_link") if google_result.get("success") else None
         }
-        
-        self.events.append(event)
-        self._save_events()
-        
-        if google_result.get("success"):
-            print(f"✅ Event created in Google Calendar: {google_result.get('event_link', '')}")
-        
-        return event_id
     
-    def get_events(self, date: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Get events from both local storage and Google Calendar"""
-        local_events = self.events.copy()
-        
-        # Try to get Google Calendar events
-        google_events = self.google_calendar.get_events()
+    @staticmethod
+    def day_range(date: str) -> Tuple[float, float]:
+        """Timestamps bounding a local calendar day (YYYY-MM-DD)"""
+        day = datetime.fromisoformat(date[:10])
+        start = day.replace(hour=0, minute=0, second=0, microsecond=0)
+        return start.timestamp(), (start + timedelta(days=1)).timestamp() - 1e-6
+    
+    def get_events(self, date: Optional[str] = None, start: Optional[float] = None,
+                   end: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Get events from local storage and the last Google Calendar sync.
+
+        ``date`` (YYYY-MM-DD) or ``start``/``end`` (timestamps) limit the
+        result to events overlapping that range, answered from the
+        interval indexes; without them every event is returned. Google is
+        never called here; the mirror's sync worker keeps it current.
+        """
+        if date:
+            start, end = self.day_range(date)
+        ranged = start is not None or end is not None
         
-        # Merge events (avoiding duplicates)
-        all_events = local_events.copy()
+        with self._lock:
+            self._refresh()
+            if ranged:
+                all_events = self.index.overlapping(start, end)
+            else:
+                all_events = self.index.events()
+            linked = self.index.by_google_id
+        google_events = (self.google_mirror.overlapping(start, end) if ranged
+                         else self.google_mirror.events())
         
-        for g_event in google_events:
-            # Check if this Google event is already in local storage
-            exists = any(
-                event.get('google_calendar_id') == g_event['id'] 
-                for event in local_events
-            )
-            
-            if not exists:
-                # Add Google event to the list
-                all_events.append({
-                    "id": f"google_{g_event['id']}",
-                    "title": g_event['title'],
-                    "start_time": g_event['start_time'],
-                    "description": g_event['description'],
-                    "event_type": "google_calendar",
-                    "google_calendar_id": g_event['id'],
-                    "google_calendar_link": g_event.get('link', '')
-                })
+        # Hash join on google_calendar_id: skip Google events already stored locally
+        all_events.extend(
+            g_event for g_event in google_events
+            if g_event['google_calendar_id'] not in linked
+        )
         
         return all_events
     
     def get_event(self, event_id: str) -> Optional[Dict[str, Any]]:
         """Get a specific event by ID"""
-        for event in self.events:
-            if event['id'] == event_id:
-                return event
-        return None
+        with self._lock:
+            self._refresh()
+            return self.index.get(event_id)
     
     def update_event(self, event_id: str, **kwargs) -> bool:
         """Update an existing event"""
-        for event in self.events:
-            if event['id'] == event_id:
-                event.update(kwargs)
-                event['updated_at'] = datetime.now().isoformat()
-                self._save_events()
-                return True
-        return False
+        with self._lock:
+            self._refresh()
+            event = self.index.get(event_id)
+            if event is None:
+                return False
+            kwargs.pop('id', None)
+            event.update(kwargs)
+            event['updated_at'] = datetime.now().isoformat()
+            self.index.reindex(event)
+            self._save_events(event)
+            return True
     
     def delete_event(self, event_id: str) -> bool:
         """Delete an event"""
-        for i, event in enumerate(self.events):
-            if event['id'] == event_id:
-                del self.events[i]
-                self._save_events()
-                return True
-        return False
+        with self._lock:
+            self._refresh()
+            event = self.index.remove(event_id)
+            if event is None:
+                return False
+            self._delete_saved_event(event_id)
+            return True
     
     def schedule_breaks(self, study_duration: int, break_duration: int, start_time: str) -> Dict[str, Any]:
         """Schedule study session with automatic breaks"""
         try:
             start_dt = datetime.fromisoformat(start_time)
-            
-            # Create study session event
-            study_event_id = self.create_event(
-                title="Study Session",
-                start_time=start_dt.isoformat(),
-                duration_minutes=study_duration,
-                description="Focused study time"
-            )
-            
-            # Create break event
             break_start = start_dt + timedelta(minutes=study_duration)
-            break_event_id = self.create_event(
-                title="Study Break",
-                start_time=break_start.isoformat(),
-                duration_minutes=break_duration,
-                description="Take a break and recharge"
-            )
+            
+            # Study session and break go out together
+            study_event, break_event = self.create_events([
+                {"title": "Study Session", "start_time": start_dt.isoformat(),
+                 "duration_minutes": study_duration, "description": "Focused study time"},
+                {"title": "Study Break", "start_time": break_start.isoformat(),
+                 "duration_minutes": break_duration, "description": "Take a break and recharge"}
+            ])
             
             return {
                 "success": True,
-                "study_event_id": study_event_id,
-                "break_event_id": break_event_id,
+                "study_event_id": study_event["id"],
+                "break_event_id": break_event["id"],
                 "message": "Study session and break scheduled successfully"
             }
             
@@ -871,15 +1449,63 @@ class CalendarService:
                 "error": str(e)
             }
     
-    def sync_external_calendar(self) -> Dict[str, Any]:
-        """Sync with Google Calendar"""
+    @staticmethod
+    def plan_pomodoro_series(start_time: str, cycles: int,
+                             study_duration: int = Config.DEFAULT_STUDY_DURATION,
+                             break_duration: int = Config.DEFAULT_BREAK_DURATION,
+                             long_break_duration: int = Config.LONG_BREAK_DURATION,
+                             long_break_every: int = Config.POMODOROS_BEFORE_LONG_BREAK) -> List[Dict[str, Any]]:
+        """Back-to-back study blocks and breaks for ``cycles`` Pomodoros.
+
+        Every ``long_break_every``-th break is a long one; the series ends
+        with the last study block.
+        """
+        current = datetime.fromisoformat(start_time)
+        events = []
+        for cycle in range(1, cycles + 1):
+            events.append({"title": f"Study Session {cycle}/{cycles}", "start_time": current.isoformat(),
+                           "duration_minutes": study_duration, "description": "Focused study time"})
+            current += timedelta(minutes=study_duration)
+            if cycle == cycles:
+                break
+            
+            long_break = long_break_every > 0 and cycle % long_break_every == 0
+            duration = long_break_duration if long_break else break_duration
+            events.append({"title": "Long Break" if long_break else "Study Break", "start_time": current.isoformat(),
+                           "duration_minutes": duration, "description": "Take a break and recharge"})
+            current += timedelta(minutes=duration)
+        return events
+    
+    def schedule_series(self, start_time: str, cycles: int, **durations) -> Dict[str, Any]:
+        """Schedule ``cycles`` Pomodoro cycles as one batch (see plan_pomodoro_series)"""
+        try:
+            planned = self.plan_pomodoro_series(start_time, cycles, **durations)
+            created = self.create_events(planned)
+            
+            return {
+                "success": True,
+                "event_ids": [event["id"] for event in created],
+                "events": created,
+                "google_synced": sum(1 for event in created if event.get("google_calendar_id")),
+                "message": f"Scheduled {cycles} study cycles ({len(created)} events)"
+            }
+            
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e)
+            }
+    
+    def sync_external_calendar(self, full: bool = False) -> Dict[str, Any]:
+        """Sync the Google Calendar mirror now (incrementally unless ``full``)"""
         try:
-            google_events = self.google_calendar.get_events()
+            result = self.google_mirror.sync(full=full)
             return {
                 "success": True,
                 "message": "Google Calendar sync completed",
-                "synced_events": len(google_events),
-                "events": google_events
+                "synced_events": result["changes"],
+                "full_sync": result["full_sync"],
+                "events": self.google_mirror.events()
             }
         except Exception as e:
             return {
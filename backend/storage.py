@@ -0,0 +1,809 @@
+"""
+Storage layer for Smart Study Orchestrator data (JSON files or SQLite)
+"""
+import base64
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from bisect import bisect_left, bisect_right, insort
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from config import Config
+from utils import load_json_data, save_json_data, read_json_file, write_json_file
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# =============================================================================
+# APPEND-ONLY SESSION LOG
+# =============================================================================
+
+def _write_snapshot(file_path: str, sessions: List[Dict[str, Any]]):
+    """Atomically replace a snapshot file (temp file, fsync, rename)"""
+    directory = os.path.dirname(file_path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.snapshot-', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(sessions, f, indent=2, default=str)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    _fsync_directory(directory)
+
+def _fsync_directory(directory: str):
+    """Persist a rename/unlink in a directory (no-op where unsupported)"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+class SessionLogLockedError(RuntimeError):
+    """The session log is owned by another process (usually the server)"""
+
+def _try_lock(f) -> bool:
+    """Non-blocking exclusive lock on an open file, held until it is closed"""
+    try:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+class SessionLog:
+    """Append-only JSON-lines log of session writes with background compaction.
+
+    Every line is either ``{"op": "put", "record": {...}}`` carrying the full
+    session or ``{"op": "delete", "id": ...}``, so replaying a line twice
+    gives the same result. The latest state is always
+    snapshot + compacting log + active log: compaction renames the active log
+    aside, folds it into a new snapshot that atomically replaces the old one
+    and only then deletes the renamed log.
+
+    One process owns the log: ``replay`` takes an exclusive lock on a
+    ``.lock`` file next to it, and only the owner truncates, appends or
+    compacts. Another process that replays (a CLI tool while the server is
+    running) gets the sessions read-only, and its writes and ``compact``
+    raise SessionLogLockedError instead of moving the log from under the
+    owner.
+    """
+
+    def __init__(self, snapshot_path: str,
+                 max_bytes: int = Config.SESSION_LOG_MAX_BYTES,
+                 max_records: int = Config.SESSION_LOG_MAX_RECORDS,
+                 fsync: bool = Config.SESSION_LOG_FSYNC):
+        base = os.path.splitext(snapshot_path)[0]
+        self.snapshot_path = snapshot_path
+        self.log_path = base + '.log.jsonl'
+        self.compacting_path = base + '.compacting.jsonl'
+        self.lock_path = base + '.lock'
+        self.max_bytes = max_bytes
+        self.max_records = max_records
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._file = None
+        self._lock_file = None
+        self._log_bytes = 0
+        self._log_records = 0
+        self._compactor: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _read_log(path: str) -> Tuple[List[Dict[str, Any]], int]:
+        """Read log records, stopping at a torn or corrupt tail.
+
+        Returns the records and the byte length of the valid prefix.
+        """
+        records = []
+        valid_bytes = 0
+        if not os.path.exists(path):
+            return records, valid_bytes
+        with open(path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # partial write from a crash, never acknowledged
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    break
+                valid_bytes += len(line)
+        return records, valid_bytes
+
+    @staticmethod
+    def _apply(sessions: List[Optional[Dict[str, Any]]], positions: Dict[str, int],
+               entry: Dict[str, Any]):
+        """Apply one log entry to a session list"""
+        if entry.get('op') == 'delete':
+            position = positions.pop(entry.get('id'), None)
+            if position is not None:
+                sessions[position] = None
+            return
+        record = entry.get('record')
+        if not isinstance(record, dict) or not record.get('id'):
+            return
+        position = positions.get(record['id'])
+        if position is None:
+            positions[record['id']] = len(sessions)
+            sessions.append(record)
+        else:
+            sessions[position] = record
+
+    def _fold(self, sessions: List[Dict[str, Any]], log_paths: List[str]) -> List[Dict[str, Any]]:
+        """Fold log files on top of a snapshot list"""
+        folded: List[Optional[Dict[str, Any]]] = list(sessions)
+        positions = {s['id']: i for i, s in enumerate(folded) if s.get('id')}
+        for path in log_paths:
+            records, _ = self._read_log(path)
+            for entry in records:
+                self._apply(folded, positions, entry)
+        return [s for s in folded if s is not None]
+
+    def read_all(self) -> List[Dict[str, Any]]:
+        """Rebuild the latest session list without touching the files"""
+        return self._fold(read_json_file(self.snapshot_path) or [],
+                          [self.compacting_path, self.log_path])
+
+    @property
+    def owner(self) -> bool:
+        return self._lock_file is not None
+
+    def _acquire(self) -> bool:
+        """Become the log's owner, unless another process already is"""
+        if self._lock_file is None:
+            os.makedirs(os.path.dirname(self.lock_path) or '.', exist_ok=True)
+            lock_file = open(self.lock_path, 'a+b')
+            if not _try_lock(lock_file):
+                lock_file.close()
+                return False
+            self._lock_file = lock_file
+        return True
+
+    def _check_owner(self):
+        if self._lock_file is None:
+            raise SessionLogLockedError(
+                f"{self.log_path} is held by another process; stop it before writing or compacting")
+
+    def replay(self) -> List[Dict[str, Any]]:
+        """Rebuild the latest session list and open the log for appending
+        (read-only, without touching the files, if another process owns it)"""
+        if not self._acquire():
+            print(f"⚠️  {self.log_path} is in use by another process: sessions are read-only here")
+            return self.read_all()
+
+        sessions = self._fold(load_json_data(self.snapshot_path, mutable=True),
+                              [self.compacting_path, self.log_path])
+
+        with self._lock:
+            records, valid_bytes = self._read_log(self.log_path)
+            if os.path.exists(self.log_path) and os.path.getsize(self.log_path) > valid_bytes:
+                # Drop the torn tail so the next append starts on a clean line
+                with open(self.log_path, 'r+b') as f:
+                    f.truncate(valid_bytes)
+            self._log_bytes = valid_bytes
+            self._log_records = len(records)
+
+            # Finish a compaction interrupted by a crash or restart
+            if os.path.exists(self.compacting_path) or self._needs_compaction():
+                self._start_compaction()
+
+        return sessions
+
+    def append(self, entry: Dict[str, Any]):
+        """Durably append one entry to the active log"""
+        data = (json.dumps(entry, default=str) + '\n').encode('utf-8')
+        with self._lock:
+            self._check_owner()
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.log_path) or '.', exist_ok=True)
+                self._file = open(self.log_path, 'ab')
+            self._file.write(data)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self._log_bytes += len(data)
+            self._log_records += 1
+
+            if self._needs_compaction():
+                self._start_compaction()
+
+    def put(self, record: Dict[str, Any]):
+        self.append({'op': 'put', 'record': record})
+
+    def delete(self, session_id: str):
+        self.append({'op': 'delete', 'id': session_id})
+
+    def _needs_compaction(self) -> bool:
+        return self._log_bytes >= self.max_bytes or self._log_records >= self.max_records
+
+    def _start_compaction(self):
+        """Rotate the active log and fold it in the background (lock held)"""
+        if self._compactor and self._compactor.is_alive():
+            return
+
+        if not os.path.exists(self.compacting_path) and self._log_records:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            os.replace(self.log_path, self.compacting_path)
+            _fsync_directory(os.path.dirname(self.log_path) or '.')
+            self._log_bytes = 0
+            self._log_records = 0
+
+        if not os.path.exists(self.compacting_path):
+            return
+
+        self._compactor = threading.Thread(
+            target=self._compact, name='session-log-compactor', daemon=True)
+        self._compactor.start()
+
+    def _compact(self):
+        """Fold the compacting log into a new snapshot"""
+        try:
+            snapshot = []
+            if os.path.exists(self.snapshot_path):
+                # Read strictly: a snapshot we can't parse must never be replaced
+                with open(self.snapshot_path, 'r') as f:
+                    snapshot = json.load(f)
+            sessions = self._fold(snapshot, [self.compacting_path])
+            _write_snapshot(self.snapshot_path, sessions)
+            try:
+                os.remove(self.compacting_path)
+            except FileNotFoundError:
+                pass
+            _fsync_directory(os.path.dirname(self.compacting_path) or '.')
+            print(f"✅ Compacted session log into {self.snapshot_path} ({len(sessions)} sessions)")
+        except Exception as e:
+            print(f"Error compacting session log: {e}")
+
+    def compact(self):
+        """Fold all pending log records into the snapshot and wait for it"""
+        self.wait()
+        with self._lock:
+            self._check_owner()
+            self._start_compaction()
+        self.wait()
+
+    def wait(self, timeout: Optional[float] = None):
+        """Wait for a running background compaction to finish"""
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join(timeout)
+
+    def close(self):
+        """Close the log and give up ownership (after any compaction)"""
+        self.wait()
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if self._lock_file is not None:
+                self._lock_file.close()
+                self._lock_file = None
+
+# =============================================================================
+# STORAGE BACKENDS
+# =============================================================================
+
+def _collection_name(file_path: str) -> str:
+    """Map a data file path to its collection name (study_sessions.json -> study_sessions)"""
+    return os.path.splitext(os.path.basename(file_path))[0]
+
+class JsonFileBackend:
+    """Flat JSON files under Config.DATA_DIR (the original storage model)"""
+
+    name = 'json'
+
+    def exists(self, file_path: str) -> bool:
+        return os.path.exists(file_path)
+
+    def load(self, file_path: str) -> Any:
+        return read_json_file(file_path)
+
+    def save(self, file_path: str, data: Any):
+        write_json_file(file_path, data)
+
+class SQLiteBackend:
+    """Embedded SQLite storage for sessions, calendar events and documents.
+
+    Record collections (study sessions, calendar events) get one row per
+    record with indexed subject/start_time/end_time columns next to the JSON
+    body, so a point update or delete touches only its own row.
+    Anything else (user preferences) is stored as a single JSON document.
+    The database runs in WAL mode so readers never block the writer and
+    several processes can write concurrently; statements are parameterized
+    and reused from the connection's statement cache.
+    """
+
+    name = 'sqlite'
+    RECORD_COLLECTIONS = ('study_sessions', 'calendar_events')
+    INDEXED_COLUMNS = ('subject', 'start_time', 'end_time')
+
+    def __init__(self, db_path: str = Config.SQLITE_DB_FILE):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(db_path, timeout=30, isolation_level=None,
+                                     check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._create_schema()
+
+    def _create_schema(self):
+        with self._lock:
+            for table in self.RECORD_COLLECTIONS:
+                self._conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {table} ("
+                    "id TEXT PRIMARY KEY, subject TEXT, start_time TEXT, end_time TEXT, "
+                    "data TEXT NOT NULL)"
+                )
+                for column in self.INDEXED_COLUMNS:
+                    self._conn.execute(
+                        f"CREATE INDEX IF NOT EXISTS idx_{table}_{column} ON {table} ({column})"
+                    )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS documents (name TEXT PRIMARY KEY, data TEXT NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+            )
+
+    @contextmanager
+    def _transaction(self):
+        """Run a group of writes as one IMMEDIATE transaction"""
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield self._conn
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+            self._conn.execute('COMMIT')
+
+    def _record_table(self, file_path: str) -> Optional[str]:
+        name = _collection_name(file_path)
+        return name if name in self.RECORD_COLLECTIONS else None
+
+    @staticmethod
+    def _row(record: Dict[str, Any]) -> Tuple:
+        return (
+            record['id'],
+            record.get('subject'),
+            record.get('start_time'),
+            record.get('end_time'),
+            json.dumps(record, default=str)
+        )
+
+    @staticmethod
+    def _upsert_sql(table: str) -> str:
+        return (
+            f"INSERT INTO {table} (id, subject, start_time, end_time, data) "
+            "VALUES (?, ?, ?, ?, ?) ON CONFLICT(id) DO UPDATE SET "
+            "subject = excluded.subject, start_time = excluded.start_time, "
+            "end_time = excluded.end_time, data = excluded.data"
+        )
+
+    def exists(self, file_path: str) -> bool:
+        if self._record_table(file_path):
+            return True
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM documents WHERE name = ?", (_collection_name(file_path),)
+            ).fetchone()
+        return row is not None
+
+    def load(self, file_path: str) -> Any:
+        """Load a whole collection (records in insertion order) or document"""
+        table = self._record_table(file_path)
+        with self._lock:
+            if table:
+                rows = self._conn.execute(f"SELECT data FROM {table} ORDER BY rowid").fetchall()
+                return [json.loads(row[0]) for row in rows]
+            row = self._conn.execute(
+                "SELECT data FROM documents WHERE name = ?", (_collection_name(file_path),)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save(self, file_path: str, data: Any):
+        """Replace a whole collection or document.
+
+        Rows missing from ``data`` are deleted, so record collections should
+        be changed through ``upsert``/``delete``; ``save`` is for migration
+        and bulk replacement.
+        """
+        table = self._record_table(file_path)
+        if not table:
+            with self._transaction() as conn:
+                conn.execute(
+                    "INSERT INTO documents (name, data) VALUES (?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET data = excluded.data",
+                    (_collection_name(file_path), json.dumps(data, default=str))
+                )
+            return
+
+        records = [r for r in (data or []) if isinstance(r, dict) and r.get('id')]
+        keep_ids = {r['id'] for r in records}
+        with self._transaction() as conn:
+            stale = [(row[0],) for row in conn.execute(f"SELECT id FROM {table}")
+                     if row[0] not in keep_ids]
+            conn.executemany(f"DELETE FROM {table} WHERE id = ?", stale)
+            conn.executemany(self._upsert_sql(table), [self._row(r) for r in records])
+
+    def upsert(self, file_path: str, *records: Dict[str, Any]):
+        """Insert or update records (one transaction), leaving other rows alone"""
+        table = self._record_table(file_path)
+        with self._transaction() as conn:
+            conn.executemany(self._upsert_sql(table), [self._row(r) for r in records])
+
+    def delete(self, file_path: str, record_id: str) -> bool:
+        """Delete a single record"""
+        table = self._record_table(file_path)
+        with self._transaction() as conn:
+            cursor = conn.execute(f"DELETE FROM {table} WHERE id = ?", (record_id,))
+        return cursor.rowcount > 0
+
+    def data_version(self) -> int:
+        """Counter that changes when another connection commits to the database"""
+        with self._lock:
+            return self._conn.execute('PRAGMA data_version').fetchone()[0]
+
+    def get_meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str):
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO meta (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, value)
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+def migrate_json_to_sqlite(backend: Optional[SQLiteBackend] = None, force: bool = False) -> Dict[str, int]:
+    """One-shot copy of the JSON data files into the SQLite database.
+
+    Runs once per database (recorded in the meta table) unless ``force`` is set.
+    """
+    backend = backend or SQLiteBackend()
+    if backend.get_meta('migrated_from_json') and not force:
+        return {}
+
+    counts = {}
+    sessions = SessionLog(Config.STUDY_SESSIONS_FILE).read_all()
+    backend.save(Config.STUDY_SESSIONS_FILE, sessions)
+    counts['study_sessions'] = len(sessions)
+
+    events = read_json_file(Config.CALENDAR_EVENTS_FILE) or []
+    backend.save(Config.CALENDAR_EVENTS_FILE, events)
+    counts['calendar_events'] = len(events)
+
+    preferences = read_json_file(Config.USER_PREFERENCES_FILE)
+    if preferences is not None:
+        backend.save(Config.USER_PREFERENCES_FILE, preferences)
+        counts['user_preferences'] = 1
+
+    backend.set_meta('migrated_from_json', datetime.now().isoformat())
+    print(f"✅ Migrated JSON data to SQLite: {counts}")
+    return counts
+
+_storage_backend = None
+_storage_backend_lock = threading.Lock()
+
+def get_storage_backend():
+    """Return the process-wide backend selected by Config.STORAGE_BACKEND"""
+    global _storage_backend
+    with _storage_backend_lock:
+        if _storage_backend is None:
+            if Config.STORAGE_BACKEND == 'sqlite':
+                _storage_backend = SQLiteBackend()
+                migrate_json_to_sqlite(_storage_backend)
+            elif Config.STORAGE_BACKEND == 'json':
+                _storage_backend = JsonFileBackend()
+            else:
+                raise ValueError(f"Unknown storage backend: {Config.STORAGE_BACKEND}")
+        return _storage_backend
+
+# =============================================================================
+# SESSION STORE
+# =============================================================================
+
+SortKey = Tuple[str, str]
+
+def _sort_key(session: Dict[str, Any]) -> SortKey:
+    """Position of a session in the (start_time, id) index; unstarted sessions sort first"""
+    return (session.get('start_time') or '', session['id'])
+
+def _remove_sorted(keys: List[SortKey], key: SortKey):
+    position = bisect_left(keys, key)
+    if position < len(keys) and keys[position] == key:
+        del keys[position]
+
+def encode_cursor(key: SortKey) -> str:
+    """Encode a (start_time, id) position as an opaque page cursor"""
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor: str) -> SortKey:
+    """Decode a page cursor, raising ValueError if it is malformed"""
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not (isinstance(key, list) and len(key) == 2 and all(isinstance(k, str) for k in key)):
+        raise ValueError("Invalid cursor")
+    return (key[0], key[1])
+
+class SessionStore:
+    """Study session store with an in-memory id -> record index.
+
+    Sessions are loaded once and kept in memory, so lookups and point
+    updates no longer parse or scan the whole history. A sorted
+    (start_time, id) index, overall and per subject, serves time-ordered
+    pages without touching the rest of the history. With the SQLite
+    backend each change is a single-row upsert and the store reloads when
+    another process commits; with JSON files in "log" mode each change
+    appends one record to the session log instead of rewriting the sessions
+    file. Returned records are the stored objects; callers must go through
+    ``update`` to change them.
+    """
+
+    def __init__(self, file_path: str = Config.STUDY_SESSIONS_FILE,
+                 mode: str = Config.SESSION_STORAGE_MODE, backend=None):
+        self.file_path = file_path
+        self.backend = backend or get_storage_backend()
+        self._db = self.backend if isinstance(self.backend, SQLiteBackend) else None
+        self.mode = 'sqlite' if self._db else mode
+        self._log = SessionLog(file_path) if self.mode == 'log' else None
+        self._db_version = None
+        self._lock = threading.RLock()
+        self._sessions: List[Dict[str, Any]] = []
+        self._index: Dict[str, Dict[str, Any]] = {}
+        self._order: List[SortKey] = []
+        self._by_subject: Dict[Optional[str], List[SortKey]] = {}
+        self._listeners: List[Any] = []
+        self._load()
+
+    def _load(self):
+        """Load sessions from storage and rebuild the id index"""
+        with self._lock:
+            if self._db:
+                self._db_version = self._db.data_version()
+                self._sessions = self._db.load(self.file_path)
+            elif self._log:
+                self._sessions = self._log.replay()
+            else:
+                self._sessions = load_json_data(self.file_path, mutable=True)
+            self._rebuild_indexes()
+
+    def _rebuild_indexes(self):
+        self._index = {s['id']: s for s in self._sessions if s.get('id')}
+        self._order = sorted(_sort_key(s) for s in self._index.values())
+        self._by_subject = {}
+        for key in self._order:
+            subject = self._index[key[1]].get('subject')
+            self._by_subject.setdefault(subject, []).append(key)
+
+    def _index_add(self, session: Dict[str, Any]):
+        key = _sort_key(session)
+        insort(self._order, key)
+        insort(self._by_subject.setdefault(session.get('subject'), []), key)
+
+    def _index_remove(self, session: Dict[str, Any]):
+        key = _sort_key(session)
+        _remove_sorted(self._order, key)
+        subject_keys = self._by_subject.get(session.get('subject'))
+        if subject_keys is not None:
+            _remove_sorted(subject_keys, key)
+            if not subject_keys:
+                del self._by_subject[session.get('subject')]
+
+    def _refresh(self):
+        """Reload if another process committed to the database"""
+        if self._db and self._db.data_version() != self._db_version:
+            self._load()
+            self._notify_reset()
+
+    def add_listener(self, listener):
+        """Register an object notified of changes (under the store lock).
+
+        Listeners implement ``session_changed(old, new)``, with ``old`` a copy
+        of the session before the change (None on create), and
+        ``sessions_reset(sessions)`` for bulk replacement or reload.
+        """
+        with self._lock:
+            if listener not in self._listeners:
+                self._listeners.append(listener)
+
+    def _notify(self, old: Optional[Dict[str, Any]], new: Dict[str, Any]):
+        for listener in self._listeners:
+            try:
+                listener.session_changed(old, new)
+            except Exception as e:
+                print(f"Error in session listener {type(listener).__name__}: {e}")
+
+    def _notify_reset(self):
+        for listener in self._listeners:
+            try:
+                listener.sessions_reset(list(self._sessions))
+            except Exception as e:
+                print(f"Error in session listener {type(listener).__name__}: {e}")
+
+    def _write(self, session: Dict[str, Any]) -> bool:
+        """Persist one changed session"""
+        if self._db:
+            self._db.upsert(self.file_path, session)
+            return True
+        if self._log:
+            self._log.put(session)
+            return True
+        return save_json_data(self.file_path, self._sessions)
+
+    def all(self) -> List[Dict[str, Any]]:
+        """Return all sessions in insertion order"""
+        with self._lock:
+            self._refresh()
+            return list(self._sessions)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.all())
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Return a session by id, or None if it doesn't exist"""
+        if self._db:
+            with self._lock:
+                self._refresh()
+        return self._index.get(session_id)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._index
+
+    def create(self, session: Dict[str, Any]) -> Dict[str, Any]:
+        """Add a new session record"""
+        with self._lock:
+            self._refresh()
+            if session['id'] in self._index:
+                raise ValueError(f"Session {session['id']} already exists")
+            self._sessions.append(session)
+            self._index[session['id']] = session
+            self._index_add(session)
+            self._write(session)
+            self._notify(None, session)
+            return session
+
+    def update(self, session_id: str, **changes) -> Optional[Dict[str, Any]]:
+        """Apply field changes to a session, return None if it doesn't exist"""
+        with self._lock:
+            self._refresh()
+            session = self._index.get(session_id)
+            if session is None:
+                return None
+            old = dict(session)
+            reindex = 'start_time' in changes or 'subject' in changes
+            if reindex:
+                self._index_remove(session)
+            session.update(changes)
+            if reindex:
+                self._index_add(session)
+            self._write(session)
+            self._notify(old, session)
+            return session
+
+    def page(self, limit: Optional[int] = None, cursor: Optional[SortKey] = None,
+             subject: Optional[str] = None, since: Optional[str] = None,
+             until: Optional[str] = None, descending: bool = False
+             ) -> Tuple[List[Dict[str, Any]], Optional[SortKey]]:
+        """Return sessions ordered by (start_time, id) and the cursor of the next page.
+
+        ``since``/``until`` bound start_time (since <= start_time < until),
+        ``cursor`` is the last key of the previous page. Only the keys of
+        the requested page are visited.
+        """
+        with self._lock:
+            self._refresh()
+            keys = self._order if subject is None else self._by_subject.get(subject, [])
+            lo = bisect_left(keys, (since, '')) if since else 0
+            hi = bisect_left(keys, (until, '')) if until else len(keys)
+
+            if descending:
+                if cursor is not None:
+                    hi = min(hi, bisect_left(keys, cursor))
+                start = max(lo, hi - limit) if limit else lo
+                selected = keys[start:hi][::-1]
+                has_more = start > lo
+            else:
+                if cursor is not None:
+                    lo = max(lo, bisect_right(keys, cursor))
+                end = min(hi, lo + limit) if limit else hi
+                selected = keys[lo:end]
+                has_more = end < hi
+
+            sessions = [self._index[key[1]] for key in selected]
+            next_cursor = selected[-1] if selected and has_more else None
+            return sessions, next_cursor
+
+    def replace_all(self, sessions: List[Dict[str, Any]]) -> bool:
+        """Replace the whole session list (used by maintenance tasks)"""
+        with self._lock:
+            sessions = list(sessions)
+            if self._log:
+                new_ids = {s['id'] for s in sessions if s.get('id')}
+                for session_id in self._index:
+                    if session_id not in new_ids:
+                        self._log.delete(session_id)
+                for session in sessions:
+                    if session.get('id') and self._index.get(session['id']) != session:
+                        self._log.put(session)
+            self._sessions = sessions
+            self._rebuild_indexes()
+            self._notify_reset()
+            if self._log:
+                self._log.compact()
+                return True
+            if self._db:
+                self._db.save(self.file_path, self._sessions)
+                return True
+            return save_json_data(self.file_path, self._sessions)
+
+    def compact(self):
+        """Fold the session log into the sessions file (log mode only)"""
+        if self._log:
+            self._log.compact()
+
+    def close(self):
+        """Release the session log (log mode only)"""
+        if self._log:
+            self._log.close()
+
+_session_store: Optional[SessionStore] = None
+_session_store_lock = threading.Lock()
+
+def get_session_store() -> SessionStore:
+    """Return the process-wide session store"""
+    global _session_store
+    with _session_store_lock:
+        if _session_store is None:
+            _session_store = SessionStore()
+        return _session_store
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Smart Study Orchestrator storage tools")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    migrate_parser = subparsers.add_parser('migrate', help="Copy JSON data files into SQLite")
+    migrate_parser.add_argument('--force', action='store_true', help="Re-run even if already migrated")
+    subparsers.add_parser('compact', help="Fold the session log into study_sessions.json")
+    args = parser.parse_args()
+
+    if args.command == 'migrate':
+        migrate_json_to_sqlite(force=args.force)
+    elif args.command == 'compact':
+        try:
+            SessionStore(backend=JsonFileBackend()).compact()
+        except SessionLogLockedError as e:
+            print(f"❌ Not compacting: {e}")
+            raise SystemExit(1)
@@ -69,6 +69,11 @@ def run_comprehensive_tests():
     # Study functionality tests
     study_tests = [
         ("GET", "/api/study/sessions", 200),
+        ("GET", "/api/study/sessions?limit=10&order=desc&fields=id,subject,start_time", 200),
+        ("GET", "/api/study/sessions/export?format=ndjson", 200),
+        ("GET", "/api/study/analytics/timeseries?granularity=week", 200),
+        ("GET", "/api/study/plan/stream?subject=Math&duration=50", 200),
+        ("GET", "/api/calendar/events?from=2024-01-01&to=2024-12-31", 200),
         ("POST", "/api/study/session", {
             "subject": "Test Mathematics",
             "duration": 25,
@@ -84,6 +89,7 @@ def run_comprehensive_tests():
             "websites": ["facebook.com", "youtube.com"],
             "duration": 25
         }, 200),
+        ("GET", "/api/study/blocked?host=m.youtube.com", 200),
         ("GET", "/api/study/preferences", 200),
     ]
     
@@ -101,6 +107,10 @@ def run_comprehensive_tests():
             "break_duration": 5,
             "start_time": "2025-05-24T16:00:00"
         }, 200),
+        ("POST", "/api/calendar/schedule-series", {
+            "cycles": 4,
+            "start_time": "2025-05-25T09:00:00"
+        }, 201),
     ]
     
     all_tests = [
@@ -0,0 +1,49 @@
+"""
+Shared setup for the backend unit tests
+
+Modules under backend/ are imported as top-level modules and resolve
+Config.DATA_DIR ("data") against the working directory, so the tests run
+from a scratch copy of backend/data and never touch the real files.
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def pytest_sessionstart(session):
+    """Move into the scratch copy before any test module is imported"""
+    workdir = tempfile.mkdtemp(prefix='study-tests-')
+    shutil.copytree(os.path.join(BACKEND_DIR, 'data'), os.path.join(workdir, 'data'),
+                    ignore=shutil.ignore_patterns('llm_cache', '*.db*', '*.jsonl', '*.lock', 'block_leases.json'))
+    os.chdir(workdir)
+
+
+class FakeClock:
+    """Manually advanced time source for code that takes a ``clock``"""
+
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+@pytest.fixture(scope='session')
+def app():
+    """The Flask app over the scratch data directory, without background workers"""
+    from app import create_app
+    return create_app(start_workers=False)
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,123 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from analytics import ROLLUP_SECTIONS, StudyAggregates
+from conftest import FakeClock
+from storage import JsonFileBackend
+
+NOW = datetime(2030, 3, 15, 12, 30)
+SUBJECTS = ('Math', 'Physics', 'History')
+
+
+@pytest.fixture
+def clock():
+    return FakeClock(NOW.timestamp())
+
+
+@pytest.fixture
+def make_aggregates(tmp_path, clock):
+    def make():
+        # Flushes only happen when a test asks for one
+        return StudyAggregates(str(tmp_path / 'analytics_aggregates.json'), backend=JsonFileBackend(),
+                               flush_delay=3600, hour_retention_days=30, clock=clock)
+    return make
+
+
+def random_session(rng, session_id):
+    start = NOW - timedelta(days=rng.randrange(120), hours=rng.randrange(24), minutes=rng.randrange(60))
+    goals = [f"g{n}" for n in range(rng.randrange(4))]
+    return {
+        "id": session_id, "subject": rng.choice(SUBJECTS), "start_time": start.isoformat(),
+        "end_time": (start + timedelta(minutes=50)).isoformat(),
+        "duration_minutes": rng.randrange(10, 120), "focus_score": rng.choice([0, 4, 7, 9]),
+        "goals": goals, "completed_goals": goals[:rng.randrange(len(goals) + 1)],
+        "distractions": rng.randrange(5), "breaks_taken": rng.randrange(3)
+    }
+
+
+def buckets(aggregates):
+    return {key: value for key, value in aggregates.data.items() if key != 'updated_at'}
+
+
+def rebuilt(make_aggregates, sessions):
+    fresh = make_aggregates()
+    fresh.rebuild(sessions)
+    return fresh
+
+
+def test_adding_then_removing_a_session_restores_every_bucket(make_aggregates):
+    rng = random.Random(3)
+    aggregates = make_aggregates()
+    for n in range(40):
+        aggregates.session_changed(None, random_session(rng, f"s{n}"))
+    before = buckets(aggregates)
+
+    # New subject and new hour/day/week/month keys, all dropped again on removal
+    extra = dict(random_session(rng, "extra"), subject="Chemistry",
+                 start_time=(NOW - timedelta(days=200)).isoformat())
+    aggregates.session_changed(None, extra)
+    assert "Chemistry" in aggregates.data['subjects']
+    aggregates.session_changed(extra, dict(extra, end_time=None))
+
+    assert buckets(aggregates) == before
+
+
+def test_rollups_match_a_full_rebuild_after_random_changes(make_aggregates):
+    rng = random.Random(11)
+    aggregates = make_aggregates()
+    sessions = {}
+    for step in range(300):
+        session_id = f"s{rng.randrange(60)}"
+        old = sessions.get(session_id)
+        if old and rng.random() < 0.5:
+            # Re-end with new metrics, a moved start time or a new subject
+            new = dict(random_session(rng, session_id), subject=old['subject'] if rng.random() < 0.5 else 'Art')
+        elif old:
+            new = dict(old, end_time=None)
+        else:
+            new = random_session(rng, session_id)
+        sessions[session_id] = new
+        aggregates.session_changed(old, new)
+
+    expected = rebuilt(make_aggregates, list(sessions.values()))
+    assert buckets(aggregates) == buckets(expected)
+    for granularity in ROLLUP_SECTIONS:
+        assert aggregates.timeseries(granularity) == expected.timeseries(granularity)
+    assert aggregates.overview() == expected.overview()
+
+
+def test_hour_buckets_age_out_with_the_clock(make_aggregates, clock):
+    aggregates = make_aggregates()
+    recent = dict(random_session(random.Random(5), "recent"), start_time=(NOW - timedelta(hours=2)).isoformat())
+    aggregates.session_changed(None, recent)
+    hour = (NOW - timedelta(hours=2)).strftime('%Y-%m-%dT%H:00')
+    assert [row['period'] for row in aggregates.timeseries('hour')] == [hour]
+
+    clock.advance(timedelta(days=31).total_seconds())
+    aggregates.flush()
+
+    assert aggregates.timeseries('hour') == []
+    assert len(aggregates.timeseries('day')) == 1
+    assert buckets(aggregates) == buckets(rebuilt(make_aggregates, [recent]))
+
+    # Removing it later doesn't touch the expired hour
+    aggregates.session_changed(recent, dict(recent, end_time=None))
+    assert buckets(aggregates) == buckets(rebuilt(make_aggregates, []))
+
+
+def test_flushed_parts_reload_to_the_same_buckets(make_aggregates, clock):
+    rng = random.Random(8)
+    aggregates = make_aggregates()
+    sessions = [random_session(rng, f"s{n}") for n in range(25)]
+    for session in sessions:
+        aggregates.session_changed(None, session)
+    aggregates.flush()
+
+    reloaded = make_aggregates()
+
+    assert buckets(reloaded) == buckets(aggregates)
+    assert reloaded.data['updated_at'] == NOW.isoformat()
+    assert reloaded.is_current(sessions)
+    assert not reloaded.is_current(sessions[1:])
@@ -0,0 +1,89 @@
+import asyncio
+from types import SimpleNamespace
+
+from circuit_breaker import CircuitBreaker
+from conftest import FakeClock
+from llm_cache import LLMResponseCache
+from services import AsyncGroqService, GroqService
+
+
+class SlowCompletions:
+    """Async stand-in for chat.completions that answers after ``delay``"""
+
+    def __init__(self, delay: float = 0.0, reply: str = '{"study_blocks": []}'):
+        self.delay = delay
+        self.reply = reply
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        message = SimpleNamespace(content=self.reply)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def make_service(completions, breaker=None, max_concurrency=1):
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    groq = GroqService(client=client, cache=LLMResponseCache(max_entries=8, ttl_seconds=60),
+                       breaker=breaker or CircuitBreaker('test'))
+    return AsyncGroqService(groq, async_client=client, max_concurrency=max_concurrency)
+
+
+def half_open_breaker(clock):
+    breaker = CircuitBreaker('test', minimum_calls=1, open_seconds=30, clock=clock)
+    breaker.record_failure(0.1)
+    clock.advance(31)
+    return breaker
+
+
+def test_cancelled_probe_is_released():
+    clock = FakeClock()
+    breaker = half_open_breaker(clock)
+    service = make_service(SlowCompletions(delay=10), breaker=breaker)
+
+    async def cancel_probe():
+        call = asyncio.ensure_future(service._call_upstream('key', [], 0.3, 100, deadline=5))
+        await asyncio.sleep(0.01)
+        call.cancel()
+        await asyncio.gather(call, return_exceptions=True)
+
+    asyncio.run(cancel_probe())
+
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request()
+
+
+def test_timed_out_wait_gives_its_semaphore_slot_back():
+    completions = SlowCompletions(delay=0.2)
+    service = make_service(completions, max_concurrency=1)
+
+    async def run():
+        # The second call times out while queued behind the first
+        slow = asyncio.ensure_future(service._call_upstream('a', [], 0.3, 100, deadline=1))
+        await asyncio.sleep(0.01)
+        queued = asyncio.ensure_future(service._call_upstream('b', [], 0.3, 100, deadline=0.05))
+        results = await asyncio.gather(slow, queued, return_exceptions=True)
+        assert isinstance(results[1], asyncio.TimeoutError)
+        # The only slot is free again for the next call
+        await service._call_upstream('c', [], 0.3, 100, deadline=1)
+
+    asyncio.run(run())
+
+    assert service._semaphore._value == 1
+    assert service.queued == 0 and service.active == 0
+    assert completions.calls == 2
+
+
+def test_finished_call_leaves_a_newer_in_flight_call_alone():
+    service = make_service(SlowCompletions())
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        old, newer = loop.create_future(), loop.create_future()
+        service._in_flight['key'] = newer
+        service._forget_in_flight('key', old)
+        assert service._in_flight['key'] is newer
+        service._forget_in_flight('key', newer)
+        assert 'key' not in service._in_flight
+
+    asyncio.run(run())
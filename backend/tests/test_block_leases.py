@@ -0,0 +1,181 @@
+import pytest
+
+from block_leases import BlockLeaseScheduler
+from conftest import FakeClock
+from storage import JsonFileBackend
+
+
+class RecordingHosts:
+    """on_change stand-in that remembers what it was handed and can fail"""
+
+    def __init__(self):
+        self.applied = []
+        self.fail_with = None
+
+    def __call__(self, blocked):
+        if self.fail_with is not None:
+            raise self.fail_with
+        self.applied.append(blocked.domains())
+        return True, 0
+
+
+@pytest.fixture
+def leases_file(tmp_path):
+    return str(tmp_path / 'block_leases.json')
+
+
+def make_scheduler(leases_file, clock, hosts=None):
+    return BlockLeaseScheduler(hosts or RecordingHosts(), file_path=leases_file,
+                               backend=JsonFileBackend(), clock=clock)
+
+
+def test_lease_expires_on_time(leases_file):
+    clock = FakeClock()
+    hosts = RecordingHosts()
+    scheduler = make_scheduler(leases_file, clock, hosts)
+
+    scheduler.add(['youtube.com'], 60)
+    clock.advance(59)
+    assert scheduler.expire_due() == []
+    clock.advance(1)
+
+    assert scheduler.expire_due() == ['youtube.com']
+    assert scheduler.domains() == [] and scheduler.next_expiry() is None
+    assert hosts.applied == [['youtube.com'], []]
+
+
+def test_overlapping_holders_keep_the_domain_blocked(leases_file):
+    clock = FakeClock()
+    hosts = RecordingHosts()
+    scheduler = make_scheduler(leases_file, clock, hosts)
+
+    scheduler.add(['youtube.com'], 60, holder='session-1')
+    scheduler.add(['youtube.com'], 120, holder='session-2')
+    clock.advance(60)
+
+    assert scheduler.expire_due() == []
+    assert scheduler.domains() == ['youtube.com']
+    clock.advance(60)
+    assert scheduler.expire_due() == ['youtube.com']
+    # Only entering and leaving the set reached on_change
+    assert hosts.applied == [['youtube.com'], []]
+
+
+def test_extending_a_lease_keeps_the_later_expiry(leases_file):
+    clock = FakeClock()
+    scheduler = make_scheduler(leases_file, clock)
+
+    scheduler.add(['youtube.com'], 120)
+    scheduler.add(['youtube.com'], 60)
+    clock.advance(60)
+
+    assert scheduler.expire_due() == []
+    assert scheduler.expires_at('youtube.com') == clock.now + 60
+
+
+def test_release_ends_only_the_holders_leases(leases_file):
+    clock = FakeClock()
+    scheduler = make_scheduler(leases_file, clock)
+    scheduler.add(['youtube.com', 'reddit.com'], 60, holder='session-1')
+    scheduler.add(['reddit.com'], 60, holder='session-2')
+
+    scheduler.release(holder='session-1')
+
+    assert scheduler.domains() == ['reddit.com']
+    scheduler.release()
+    assert scheduler.domains() == [] and scheduler.leases == {}
+
+
+def test_leases_survive_a_restart(leases_file):
+    clock = FakeClock()
+    make_scheduler(leases_file, clock).add(['youtube.com'], 60)
+    make_scheduler(leases_file, clock).add(['reddit.com'], 600)
+
+    clock.advance(120)
+    hosts = RecordingHosts()
+    restarted = make_scheduler(leases_file, clock, hosts)
+    assert restarted.domains() == ['reddit.com', 'youtube.com']
+
+    # What expired while the app was down is released before anything else
+    assert restarted.expire_due() == ['youtube.com']
+    assert hosts.applied == [['reddit.com']]
+    assert make_scheduler(leases_file, clock).domains() == ['reddit.com']
+
+
+def test_failed_apply_rolls_the_lease_back(leases_file):
+    clock = FakeClock()
+    hosts = RecordingHosts()
+    scheduler = make_scheduler(leases_file, clock, hosts)
+    hosts.fail_with = PermissionError('hosts file is read-only')
+
+    with pytest.raises(PermissionError):
+        scheduler.add(['youtube.com'], 60)
+
+    assert scheduler.domains() == [] and scheduler.leases == {}
+    assert not scheduler.blocked.is_blocked('youtube.com')
+    assert make_scheduler(leases_file, clock).domains() == []
+
+    # A retry once the file is writable applies the block
+    hosts.fail_with = None
+    assert scheduler.add(['youtube.com'], 60) == (True, 0)
+    assert hosts.applied == [['youtube.com']]
+
+
+def test_failed_release_keeps_the_lease(leases_file):
+    clock = FakeClock()
+    hosts = RecordingHosts()
+    scheduler = make_scheduler(leases_file, clock, hosts)
+    scheduler.add(['youtube.com'], 60)
+    hosts.fail_with = PermissionError('hosts file is read-only')
+
+    with pytest.raises(PermissionError):
+        scheduler.release()
+    clock.advance(60)
+    with pytest.raises(PermissionError):
+        scheduler.expire_due()
+
+    assert scheduler.domains() == ['youtube.com']
+    assert scheduler.next_expiry() == clock.now
+    hosts.fail_with = None
+    assert scheduler.expire_due() == ['youtube.com']
+
+
+def test_blocking_retry_after_permission_error_writes_hosts(tmp_path, leases_file, monkeypatch):
+    from services import WebsiteBlockingService
+
+    hosts_file = tmp_path / 'hosts'
+    hosts_file.write_text('127.0.0.1 localhost\n')
+    service = WebsiteBlockingService(hosts_file=str(hosts_file), leases_file=leases_file,
+                                     clock=FakeClock(), engine='hosts')
+    monkeypatch.setattr(service, '_flush_dns_cache', lambda: None)
+    write = service.hosts.write
+
+    def read_only(content):
+        raise PermissionError('hosts file is read-only')
+
+    monkeypatch.setattr(service.hosts, 'write', read_only)
+    assert service.block_websites(['youtube.com'], 25)['success'] is False
+    assert not service.is_blocked('youtube.com')
+
+    monkeypatch.setattr(service.hosts, 'write', write)
+    result = service.block_websites(['youtube.com'], 25)
+    assert result['success'] and result['hosts_changed']
+    assert 'youtube.com' in hosts_file.read_text()
+
+
+def test_emergency_cleanup_clears_the_leases_too(tmp_path, leases_file, monkeypatch):
+    import cleanup_hosts
+    from hosts_file import HostsFile
+
+    monkeypatch.setattr(cleanup_hosts.os, 'system', lambda command: 0)
+    hosts_file = tmp_path / 'hosts'
+    hosts = HostsFile(str(hosts_file))
+    hosts_file.write_text(hosts.render(['127.0.0.1 localhost\n'], ['127.0.0.1 youtube.com']))
+    clock = FakeClock()
+    make_scheduler(leases_file, clock).add(['youtube.com'], 3600)
+
+    assert cleanup_hosts.unblock_all_websites(str(hosts_file), leases_file, JsonFileBackend())
+
+    assert hosts_file.read_text() == '127.0.0.1 localhost\n'
+    # A restart finds nothing to re-apply
+    assert make_scheduler(leases_file, clock).domains() == []
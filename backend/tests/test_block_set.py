@@ -0,0 +1,42 @@
+from block_set import BlockedDomainSet, expand_domain
+from config import Config
+
+
+def test_a_domain_blocks_every_subdomain():
+    blocked = BlockedDomainSet()
+    blocked.acquire(['youtube.com'])
+
+    for host in ('youtube.com', 'www.youtube.com', 'm.youtube.com', 'mobile.youtube.com',
+                 'cdn.youtube.com', 'a.b.youtube.com'):
+        assert blocked.is_blocked(host), host
+    assert not blocked.is_blocked('notyoutube.com')
+    assert not blocked.is_blocked('youtube.com.evil.example')
+
+
+def test_www_domain_blocks_only_names_under_www():
+    blocked = BlockedDomainSet()
+    blocked.acquire(['www.reddit.com'])
+
+    assert blocked.is_blocked('www.reddit.com')
+    assert not blocked.is_blocked('reddit.com') and not blocked.is_blocked('old.reddit.com')
+
+
+def test_domain_and_wildcard_share_the_suffix_until_both_are_released():
+    blocked = BlockedDomainSet()
+    blocked.acquire(['youtube.com', '*.youtube.com'])
+
+    blocked.release(['youtube.com'])
+    assert blocked.is_blocked('m.youtube.com')
+    assert len(blocked.matcher) == 1
+
+    blocked.release(['*.youtube.com'])
+    assert not blocked.is_blocked('m.youtube.com')
+    assert len(blocked.matcher) == 0 and blocked.hosts == []
+
+
+def test_hosts_file_lists_the_common_subdomains():
+    expected = ['youtube.com'] + [f"{sub}.youtube.com" for sub in Config.BLOCK_WILDCARD_SUBDOMAINS]
+
+    assert list(expand_domain('youtube.com')) == expected
+    assert expand_domain('*.youtube.com') == expand_domain('youtube.com')
+    assert expand_domain('www.youtube.com') == ('www.youtube.com',)
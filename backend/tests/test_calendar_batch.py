@@ -0,0 +1,64 @@
+import pytest
+
+from config import Config
+from google_fakes import FakeCalendarAPI, FakeHttpError
+from services import CalendarService, GoogleCalendarService
+from storage import JsonFileBackend
+
+
+class RejectingCalendarAPI(FakeCalendarAPI):
+    """Refuses to insert events whose summary is in ``rejected``"""
+
+    def __init__(self, rejected=()):
+        super().__init__()
+        self.rejected = set(rejected)
+
+    def insert_event(self, body):
+        if body.get('summary') in self.rejected:
+            raise FakeHttpError(403, 'rateLimitExceeded')
+        return super().insert_event(body)
+
+
+def specs(*titles):
+    return [{"title": title, "start_time": "2030-01-01T09:00:00", "duration_minutes": 25}
+            for title in titles]
+
+
+@pytest.fixture
+def calendar_service(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'CALENDAR_EVENTS_FILE', str(tmp_path / 'calendar_events.json'))
+
+    def make(api):
+        return CalendarService(google_calendar=GoogleCalendarService(service=api), backend=JsonFileBackend())
+    return make
+
+
+def test_batch_reports_each_insert():
+    api = RejectingCalendarAPI(rejected={'b'})
+
+    results = GoogleCalendarService(service=api).create_events(specs('a', 'b', 'c'))
+
+    assert [r['success'] for r in results] == [True, False, True]
+    assert 'rateLimitExceeded' in results[1]['error']
+    assert api.http_requests == 1
+    assert sorted(e['summary'] for e in api.stored_events()) == ['a', 'c']
+
+
+def test_batch_is_split_at_the_request_limit(monkeypatch):
+    monkeypatch.setattr(Config, 'GOOGLE_BATCH_MAX_REQUESTS', 2)
+    api = FakeCalendarAPI()
+
+    results = GoogleCalendarService(service=api).create_events(specs('a', 'b', 'c', 'd', 'e'))
+
+    assert all(r['success'] for r in results)
+    assert api.http_requests == 3
+
+
+def test_partial_failure_still_saves_every_event_locally(calendar_service):
+    service = calendar_service(RejectingCalendarAPI(rejected={'b'}))
+
+    created = service.create_events(specs('a', 'b', 'c'))
+
+    assert [bool(e.get('google_calendar_id')) for e in created] == [True, False, True]
+    reloaded = calendar_service(FakeCalendarAPI())
+    assert sorted(e['title'] for e in reloaded.get_events()) == ['a', 'b', 'c']
@@ -0,0 +1,52 @@
+from datetime import datetime
+
+import pytest
+
+from app import parse_event_range
+from config import Config
+from google_fakes import FakeCalendarAPI
+from services import CalendarService, GoogleCalendarService
+from storage import JsonFileBackend
+
+
+@pytest.fixture
+def calendar_service(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'CALENDAR_EVENTS_FILE', str(tmp_path / 'calendar_events.json'))
+
+    def make():
+        return CalendarService(google_calendar=GoogleCalendarService(service=FakeCalendarAPI()),
+                               backend=JsonFileBackend())
+    return make
+
+
+def test_deleted_event_is_gone_from_the_index_and_the_file(calendar_service):
+    service = calendar_service()
+    ids = [service.create_event(title, f"2030-01-0{day}T09:00:00", 30)
+           for day, title in enumerate('abcd', start=1)]
+
+    assert service.delete_event(ids[1])
+    assert not service.delete_event(ids[1])
+
+    assert [e['title'] for e in service.events] == ['a', 'c', 'd']
+    assert service.get_event(ids[1]) is None
+    assert service.get_events('2030-01-02') == []
+    assert [e['title'] for e in calendar_service().get_events()] == ['a', 'c', 'd']
+
+
+def test_date_only_to_includes_that_whole_day():
+    start, end = parse_event_range({'from': '2030-01-01', 'to': '2030-01-02'})
+
+    assert start == datetime(2030, 1, 1).timestamp()
+    assert datetime(2030, 1, 2, 23, 59, 59).timestamp() < end < datetime(2030, 1, 3).timestamp()
+    # A datetime is taken as given
+    assert parse_event_range({'to': '2030-01-02T12:00:00'}) == (None, datetime(2030, 1, 2, 12).timestamp())
+
+
+def test_range_ending_on_a_date_returns_events_late_that_day(calendar_service):
+    service = calendar_service()
+    service.create_event('late', '2030-01-02T23:30:00', 15)
+    service.create_event('next day', '2030-01-03T00:00:00', 15)
+
+    start, end = parse_event_range({'from': '2030-01-02', 'to': '2030-01-02'})
+
+    assert [e['title'] for e in service.get_events(start=start, end=end)] == ['late']
@@ -0,0 +1,91 @@
+import pytest
+
+from calendar_sync import GoogleCalendarMirror
+from config import Config
+from google_fakes import FakeCalendarAPI
+from services import GoogleCalendarService
+from storage import JsonFileBackend
+
+
+def add_event(api, event_id, day, summary=None):
+    api.insert_event({
+        'id': event_id,
+        'summary': summary or event_id,
+        'start': {'dateTime': f'2030-01-{day:02d}T10:00:00'},
+        'end': {'dateTime': f'2030-01-{day:02d}T11:00:00'}
+    })
+
+
+@pytest.fixture
+def api():
+    api = FakeCalendarAPI()
+    for day in range(1, 11):
+        add_event(api, f'e{day}', day)
+    return api
+
+
+@pytest.fixture
+def mirror_file(tmp_path):
+    return str(tmp_path / 'google_calendar_mirror.json')
+
+
+def make_mirror(api, mirror_file):
+    return GoogleCalendarMirror(GoogleCalendarService(service=api), file_path=mirror_file,
+                                backend=JsonFileBackend())
+
+
+def mirrored_titles(mirror):
+    return {event['id']: event['title'] for event in mirror.events()}
+
+
+def test_first_sync_pages_through_the_calendar(api, mirror_file, monkeypatch):
+    monkeypatch.setattr(Config, 'GOOGLE_SYNC_PAGE_SIZE', 4)
+    mirror = make_mirror(api, mirror_file)
+
+    result = mirror.sync()
+
+    assert result == {"full_sync": True, "changes": 10, "events": 10}
+    assert api.calls.count('events.list') == 3
+    assert mirror.sync_token is not None
+
+
+def test_incremental_sync_applies_only_changes(api, mirror_file):
+    mirror = make_mirror(api, mirror_file)
+    mirror.sync()
+
+    api.delete_event('e3')
+    api.patch_event('e4', {'summary': 'moved'})
+    add_event(api, 'e11', 11)
+    result = mirror.sync()
+
+    assert result == {"full_sync": False, "changes": 3, "events": 10}
+    titles = mirrored_titles(mirror)
+    assert 'google_e3' not in titles and 'google_e11' in titles
+    assert titles['google_e4'] == 'moved'
+    assert mirror.sync() == {"full_sync": False, "changes": 0, "events": 10}
+
+
+def test_expired_sync_token_falls_back_to_a_full_sync(api, mirror_file):
+    mirror = make_mirror(api, mirror_file)
+    mirror.sync()
+
+    api.expire_sync_tokens()
+    api.delete_event('e5')
+    result = mirror.sync()
+
+    assert result == {"full_sync": True, "changes": 9, "events": 9}
+    assert 'google_e5' not in mirrored_titles(mirror)
+    assert mirror.full_syncs == 2 and mirror.incremental_syncs == 0
+    # The fresh token works for the next incremental sync
+    add_event(api, 'e12', 12)
+    assert mirror.sync()["full_sync"] is False
+
+
+def test_restart_resumes_from_the_persisted_token(api, mirror_file):
+    make_mirror(api, mirror_file).sync()
+    add_event(api, 'e13', 13)
+
+    restarted = make_mirror(api, mirror_file)
+    assert len(restarted.events()) == 10
+
+    assert restarted.sync() == {"full_sync": False, "changes": 1, "events": 11}
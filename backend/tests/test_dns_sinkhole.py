@@ -0,0 +1,136 @@
+import random
+import socket
+import struct
+
+import pytest
+
+from block_set import BlockedDomainSet
+from dns_sinkhole import (QTYPE_A, QTYPE_AAAA, RCODE_SERVFAIL, DnsSinkhole, StubDnsUpstream,
+                          format_address, parse_address)
+
+UPSTREAM_IP = '192.0.2.7'
+
+
+def query(address, name, qtype=QTYPE_A):
+    """Send one query over UDP; returns (rcode, answer count, last 4 bytes)"""
+    query_id = random.randrange(65536)
+    question = b''.join(bytes([len(label)]) + label.encode() for label in name.split('.'))
+    packet = struct.pack('!HHHHHH', query_id, 0x0100, 1, 0, 0, 0) + question + b'\0' + struct.pack('!HH', qtype, 1)
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.settimeout(3)
+        sock.sendto(packet, address)
+        response, _ = sock.recvfrom(512)
+    assert response[:2] == packet[:2]
+    answers = struct.unpack('!H', response[6:8])[0]
+    return response[3] & 0xF, answers, response[-4:]
+
+
+def ipv6_loopback_available():
+    try:
+        with socket.socket(socket.AF_INET6, socket.SOCK_DGRAM) as sock:
+            sock.bind(('::1', 0))
+        return True
+    except OSError:
+        return False
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('1.1.1.1:5353', ('1.1.1.1', 5353)),
+    ('1.1.1.1', ('1.1.1.1', 53)),
+    ('dns.example:853', ('dns.example', 853)),
+    ('[2606:4700::1111]:5353', ('2606:4700::1111', 5353)),
+    ('[::1]', ('::1', 53)),
+    ('2606:4700::1111', ('2606:4700::1111', 53)),
+    ('::1', ('::1', 53)),
+    ('fe80::1%eth0', ('fe80::1%eth0', 53)),
+])
+def test_parse_address(value, expected):
+    assert parse_address(value) == expected
+    assert parse_address(format_address(expected)) == expected
+
+
+@pytest.mark.parametrize('value', ['[::1', '[::1]53', '[::1]:', '1.1.1.1:dns'])
+def test_malformed_addresses_are_rejected(value):
+    with pytest.raises(ValueError):
+        parse_address(value)
+
+
+@pytest.fixture
+def upstream():
+    stub = StubDnsUpstream(UPSTREAM_IP)
+    yield stub
+    stub.stop()
+
+
+@pytest.fixture
+def sinkhole(upstream):
+    hole = DnsSinkhole(port=0, upstream=upstream.start(), redirect_ip='127.0.0.1')
+    hole.start()
+    yield hole
+    hole.stop()
+
+
+def test_blocked_names_get_the_redirect_address(sinkhole, upstream):
+    blocked = BlockedDomainSet()
+    blocked.acquire(['youtube.com'])
+    sinkhole.update(blocked)
+
+    rcode, answers, rdata = query(sinkhole.address, 'youtube.com')
+
+    assert (rcode, answers, socket.inet_ntoa(rdata)) == (0, 1, '127.0.0.1')
+    assert upstream.queries == 0 and sinkhole.blocked_answers == 1
+
+
+def test_other_names_are_forwarded(sinkhole, upstream):
+    blocked = BlockedDomainSet()
+    blocked.acquire(['youtube.com'])
+    sinkhole.update(blocked)
+
+    rcode, answers, rdata = query(sinkhole.address, 'example.com')
+
+    assert (rcode, answers, socket.inet_ntoa(rdata)) == (0, 1, UPSTREAM_IP)
+    assert upstream.queries == 1 and sinkhole.forwarded == 1
+
+
+def test_wildcards_and_set_changes_apply_to_the_next_query(sinkhole):
+    blocked = BlockedDomainSet()
+    sinkhole.update(blocked)
+    assert socket.inet_ntoa(query(sinkhole.address, 'old.reddit.com')[2]) == UPSTREAM_IP
+
+    blocked.acquire(['*.reddit.com'])
+    assert socket.inet_ntoa(query(sinkhole.address, 'old.reddit.com')[2]) == '127.0.0.1'
+    # AAAA for a blocked name points at the IPv6 loopback
+    rcode, answers, rdata = query(sinkhole.address, 'reddit.com', QTYPE_AAAA)
+    assert (rcode, answers, rdata) == (0, 1, socket.inet_pton(socket.AF_INET6, '::1')[-4:])
+
+    blocked.release(['*.reddit.com'])
+    assert socket.inet_ntoa(query(sinkhole.address, 'old.reddit.com')[2]) == UPSTREAM_IP
+
+
+def test_unreachable_upstream_answers_servfail():
+    hole = DnsSinkhole(port=0, upstream='127.0.0.1:9', upstream_timeout=0.3)
+    hole.start()
+    try:
+        rcode, answers, _ = query(hole.address, 'example.com')
+    finally:
+        hole.stop()
+
+    assert (rcode, answers) == (RCODE_SERVFAIL, 0)
+    assert hole.upstream_errors == 1
+
+
+@pytest.mark.skipif(not ipv6_loopback_available(), reason="no IPv6 loopback")
+def test_ipv6_upstream_is_forwarded_to():
+    stub = StubDnsUpstream(UPSTREAM_IP, host='::1')
+    upstream = stub.start()
+    hole = DnsSinkhole(port=0, upstream=upstream)
+    hole.start()
+    try:
+        rcode, answers, rdata = query(hole.address, 'example.com')
+    finally:
+        hole.stop()
+        stub.stop()
+
+    assert upstream.startswith('[::1]:')
+    assert (rcode, answers, socket.inet_ntoa(rdata)) == (0, 1, UPSTREAM_IP)
+    assert hole.stats()["upstream"] == upstream
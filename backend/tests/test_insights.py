@@ -0,0 +1,99 @@
+from datetime import datetime
+
+import pytest
+
+from conftest import FakeClock
+from insights import InsightsPrecomputer
+from storage import JsonFileBackend, SessionStore
+
+
+class StubGroqService:
+    """Counts analyses; each one reports how many completed sessions it saw"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def analyze_study_pattern(self, sessions):
+        self.calls += 1
+        return {"completed": sum(1 for s in sessions if s.get('end_time'))}
+
+    def _get_default_analysis(self):
+        return {"completed": None}
+
+
+def completed(session_id, minutes=25):
+    return {"id": session_id, "subject": "Math", "start_time": f"2030-01-01T09:{len(session_id):02d}:00",
+            "end_time": "2030-01-01T10:00:00", "duration_minutes": minutes, "focus_score": 7}
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return str(tmp_path / 'study_sessions.json'), str(tmp_path / 'ai_insights.json')
+
+
+def open_store(paths):
+    return SessionStore(paths[0], mode='snapshot', backend=JsonFileBackend())
+
+
+def open_precomputer(paths, store, groq=None, clock=None):
+    precomputer = InsightsPrecomputer(groq or StubGroqService(), store, file_path=paths[1],
+                                      backend=JsonFileBackend(), clock=clock or FakeClock())
+    store.add_listener(precomputer)
+    return precomputer
+
+
+def test_session_change_invalidates_then_recomputes_the_next_version(paths):
+    clock = FakeClock()
+    groq = StubGroqService()
+    store = open_store(paths)
+    precomputer = open_precomputer(paths, store, groq, clock)
+
+    first = precomputer.latest()
+    assert first["stale"] and first["insights"] == {"completed": None}
+    assert precomputer.wait_until_current(timeout=5)
+    assert precomputer.latest() == {"insights": {"completed": 0}, "version": 1, "stale": False,
+                                    "computed_at": datetime.fromtimestamp(clock.now).isoformat()}
+
+    clock.advance(60)
+    store.create(completed("a"))
+    assert precomputer.version == 2
+    assert precomputer.wait_until_current(timeout=5)
+
+    latest = precomputer.latest()
+    assert (latest["insights"], latest["version"], latest["stale"]) == ({"completed": 1}, 2, False)
+    assert latest["computed_at"] == datetime.fromtimestamp(clock.now).isoformat()
+    assert groq.calls == 2
+
+
+def test_unfinished_sessions_do_not_invalidate(paths):
+    store = open_store(paths)
+    precomputer = open_precomputer(paths, store)
+    precomputer.refresh()
+
+    store.create({"id": "running", "subject": "Math", "start_time": "2030-01-01T09:00:00"})
+
+    assert precomputer.version == 1 and not precomputer.latest()["stale"]
+
+
+def test_restart_keeps_insights_current_only_if_the_sessions_match(paths):
+    store = open_store(paths)
+    store.create(completed("a"))
+    open_precomputer(paths, store).refresh()
+
+    groq = StubGroqService()
+    restarted = open_precomputer(paths, open_store(paths), groq)
+    assert not restarted.latest()["stale"]
+    assert groq.calls == 0
+
+    # Sessions changed while the server was down (another process, an import)
+    offline = open_store(paths)
+    offline.create(completed("b"))
+    offline.update("a", duration_minutes=50)
+
+    restarted = open_precomputer(paths, open_store(paths), groq)
+    latest = restarted.latest()
+    assert latest["stale"] and latest["insights"] == {"completed": 1}
+    assert restarted.wait_until_current(timeout=5)
+    latest = restarted.latest()
+    assert not latest["stale"] and latest["insights"] == {"completed": 2}
+    assert latest["version"] == 2 and groq.calls == 1
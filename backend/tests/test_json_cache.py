@@ -0,0 +1,110 @@
+import copy
+import json
+import os
+
+import pytest
+
+from config import Config
+from utils import FrozenDict, FrozenList, load_json_data, load_json_document, read_json_file, write_json_file
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    path = str(tmp_path / 'study_sessions.json')
+    with open(path, 'w') as f:
+        json.dump([{"id": "a", "goals": ["x"]}], f)
+    return path
+
+
+@pytest.fixture
+def json_storage(monkeypatch):
+    monkeypatch.setattr(Config, 'STORAGE_BACKEND', 'json')
+
+
+def rewrite(path, data, mtime_ns=None):
+    """Write ``data`` outside the cache, optionally pinning the file's mtime"""
+    with open(path, 'w') as f:
+        json.dump(data, f)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_unchanged_file_is_served_from_the_cache(data_file):
+    first = read_json_file(data_file)
+
+    assert read_json_file(data_file) is first
+    assert first == [{"id": "a", "goals": ["x"]}]
+
+
+def test_mtime_change_with_the_same_size_is_reloaded(data_file):
+    first = read_json_file(data_file)
+    mtime_ns = os.stat(data_file).st_mtime_ns
+
+    rewrite(data_file, [{"id": "b", "goals": ["y"]}], mtime_ns=mtime_ns + 1_000_000)
+
+    assert read_json_file(data_file) == [{"id": "b", "goals": ["y"]}]
+    assert read_json_file(data_file) is not first
+
+
+def test_size_change_with_the_same_mtime_is_reloaded(data_file):
+    read_json_file(data_file)
+    mtime_ns = os.stat(data_file).st_mtime_ns
+
+    rewrite(data_file, [{"id": "a", "goals": ["x", "y"]}], mtime_ns=mtime_ns)
+
+    assert read_json_file(data_file) == [{"id": "a", "goals": ["x", "y"]}]
+
+
+def test_deleted_file_reads_as_none(data_file):
+    read_json_file(data_file)
+    os.remove(data_file)
+
+    assert read_json_file(data_file) is None
+
+
+def test_cached_data_rejects_mutation_at_every_level(data_file):
+    sessions = read_json_file(data_file)
+    session = sessions[0]
+    assert isinstance(sessions, FrozenList) and isinstance(session, FrozenDict)
+    assert isinstance(session["goals"], FrozenList)
+
+    mutations = [
+        lambda: sessions.append({}), lambda: sessions.extend([{}]), lambda: sessions.pop(),
+        lambda: sessions.sort(), lambda: sessions.__setitem__(0, {}), lambda: sessions.__delitem__(0),
+        lambda: session.__setitem__("id", "b"), lambda: session.update(id="b"),
+        lambda: session.pop("id"), lambda: session.setdefault("new", 1), lambda: session.clear(),
+        lambda: session["goals"].append("y"), lambda: session["goals"].remove("x"),
+    ]
+    for mutate in mutations:
+        with pytest.raises(TypeError):
+            mutate()
+
+    assert read_json_file(data_file) == [{"id": "a", "goals": ["x"]}]
+    # Copies are plain, mutable containers
+    copied = copy.deepcopy(sessions)
+    assert type(copied) is list and type(copied[0]) is dict
+    copied[0]["goals"].append("y")
+    assert session["goals"] == ["x"]
+
+
+def test_mutable_load_returns_an_independent_copy(data_file, json_storage):
+    mine = load_json_data(data_file, mutable=True)
+    mine[0]["goals"].append("y")
+    mine.append({"id": "b"})
+
+    assert type(mine) is list and type(mine[0]) is dict
+    assert load_json_data(data_file) == [{"id": "a", "goals": ["x"]}]
+    assert load_json_data(data_file, mutable=True) == [{"id": "a", "goals": ["x"]}]
+    assert load_json_data(data_file, mutable=True) is not load_json_data(data_file, mutable=True)
+
+
+def test_written_data_is_cached_apart_from_the_caller(tmp_path, json_storage):
+    path = str(tmp_path / 'user_preferences.json')
+    preferences = {"theme": "dark", "subjects": ["Math"]}
+
+    write_json_file(path, preferences)
+    preferences["subjects"].append("Physics")
+
+    assert load_json_document(path) == {"theme": "dark", "subjects": ["Math"]}
+    with open(path) as f:
+        assert json.load(f) == {"theme": "dark", "subjects": ["Math"]}
@@ -0,0 +1,102 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from conftest import FakeClock
+from llm_cache import LLMResponseCache
+from services import GroqService
+
+
+class StubCompletions:
+    """Stands in for the Groq client's chat.completions"""
+
+    def __init__(self, reply: str):
+        self.reply = reply
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        message = SimpleNamespace(content=self.reply)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+@pytest.fixture
+def stub_client():
+    return SimpleNamespace(chat=SimpleNamespace(completions=StubCompletions('{"study_blocks": []}')))
+
+
+def make_service(client, cache_dir, clock, ttl=60):
+    cache = LLMResponseCache(max_entries=8, ttl_seconds=ttl, disk_dir=str(cache_dir), clock=clock)
+    return GroqService(client=client, cache=cache)
+
+
+def test_repeated_call_is_served_from_memory(stub_client, tmp_path):
+    service = make_service(stub_client, tmp_path, FakeClock())
+
+    first = service.generate_study_plan("Math", 30, ["algebra"])
+    second = service.generate_study_plan("Math", 30, ["algebra"])
+
+    assert first == second and first["ai_mode"] == "real"
+    assert stub_client.chat.completions.calls == 1
+    assert service.cache.hits == 1 and service.cache.disk_hits == 0
+
+
+def test_memory_miss_falls_back_to_disk(stub_client, tmp_path):
+    clock = FakeClock()
+    make_service(stub_client, tmp_path, clock).generate_study_plan("Math", 30, ["algebra"])
+
+    # A fresh process: empty LRU, same cache directory
+    restarted = make_service(stub_client, tmp_path, clock)
+    restarted.generate_study_plan("Math", 30, ["algebra"])
+
+    assert stub_client.chat.completions.calls == 1
+    assert restarted.cache.disk_hits == 1
+
+
+def test_expired_entries_go_back_to_the_client(stub_client, tmp_path):
+    clock = FakeClock()
+    service = make_service(stub_client, tmp_path, clock, ttl=60)
+    service.generate_study_plan("Math", 30, ["algebra"])
+
+    clock.advance(61)
+    service.generate_study_plan("Math", 30, ["algebra"])
+
+    assert stub_client.chat.completions.calls == 2
+    assert service.cache.misses == 2
+
+
+def test_lru_evicts_least_recently_used(tmp_path):
+    cache = LLMResponseCache(max_entries=2, ttl_seconds=60, clock=FakeClock())
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_sweep_removes_expired_and_over_cap_files(tmp_path):
+    clock = FakeClock()
+    cache = LLMResponseCache(ttl_seconds=60, disk_dir=str(tmp_path), clock=clock,
+                             disk_max_entries=2, sweep_interval=3600)
+    cache.set("old", 1)
+    clock.advance(61)
+    for key in ("k1", "k2", "k3"):
+        cache.set(key, key)
+        clock.advance(1)
+
+    assert cache.sweep() == 2  # "old" expired, "k1" over the cap
+    assert sorted(os.listdir(tmp_path)) == ["k2.json", "k3.json"]
+
+
+def test_set_sweeps_on_interval(tmp_path):
+    clock = FakeClock()
+    cache = LLMResponseCache(ttl_seconds=60, disk_dir=str(tmp_path), clock=clock, sweep_interval=120)
+    cache.set("stale", 1)
+    clock.advance(130)
+    cache.set("fresh", 2)
+
+    assert os.listdir(tmp_path) == ["fresh.json"]
@@ -0,0 +1,101 @@
+import json
+from types import SimpleNamespace
+
+from llm_cache import LLMResponseCache
+from services import GroqService, StudyBlockStreamParser, fake_completion_stream
+
+BLOCKS = [
+    {"activity": "Study {sets}", "duration": 25, "type": "study",
+     "description": 'Prove "A } B" and escape \\ then ] too'},
+    {"activity": "Short break", "duration": 5, "type": "break", "description": "{}\"{"},
+    {"activity": "Review", "duration": 25, "type": "study", "description": "tab\tand unicode é"},
+]
+PLAN = {"study_blocks": BLOCKS, "focus_techniques": ["Self-testing"], "tips": "use {braces}"}
+
+
+def test_each_block_is_emitted_when_its_closing_brace_arrives():
+    text = json.dumps(PLAN)
+    closing = [text.index(json.dumps(block)) + len(json.dumps(block)) - 1 for block in BLOCKS]
+    parser = StudyBlockStreamParser()
+
+    emitted = []
+    for offset, chunk in zip(range(0, len(text), 3), fake_completion_stream(text, chunk_size=3)):
+        for block in parser.feed(chunk):
+            emitted.append((block, offset // 3))
+
+    assert [block for block, _ in emitted] == BLOCKS
+    assert [chunk for _, chunk in emitted] == [end // 3 for end in closing]
+    assert parser.state == 'done'
+    assert json.loads(parser.text) == PLAN
+
+
+def test_blocks_split_one_character_at_a_time():
+    parser = StudyBlockStreamParser()
+    blocks = []
+    for chunk in fake_completion_stream('```json\n' + json.dumps(PLAN) + '\n```', chunk_size=1):
+        blocks.extend(parser.feed(chunk))
+
+    assert blocks == BLOCKS
+
+
+def sse_events(response):
+    events = []
+    for message in response.get_data(as_text=True).split('\n\n'):
+        if message:
+            event, data = message.split('\n', 1)
+            events.append((event[len('event: '):], json.loads(data[len('data: '):])))
+    return events
+
+
+def test_mock_plan_streams_meta_blocks_then_plan(client):
+    response = client.get('/api/study/plan/stream?subject=Math&duration=90&goals=algebra,geometry')
+
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+    events = sse_events(response)
+    names = [event for event, _ in events]
+    plan = events[-1][1]
+    assert names == ['meta'] + ['block'] * len(plan['study_blocks']) + ['plan']
+    assert [data for event, data in events if event == 'block'] == plan['study_blocks']
+
+
+def test_failing_stream_ends_with_an_error_event(app, client, monkeypatch):
+    groq_service = app.extensions['study_orchestrator']['groq_service']
+
+    def failing_stream(subject, duration, goals):
+        yield "meta", {"ai_mode": "real"}
+        raise RuntimeError("upstream went away")
+
+    monkeypatch.setattr(groq_service, 'stream_study_plan', failing_stream)
+    events = sse_events(client.get('/api/study/plan/stream?subject=Math'))
+
+    assert events == [("meta", {"ai_mode": "real"}), ("error", {"error": "upstream went away"})]
+
+
+class BrokenStreamCompletions:
+    """Streams the first part of a reply, then fails like a dropped connection"""
+
+    def __init__(self, text, fail_after):
+        self.text = text
+        self.fail_after = fail_after
+
+    def create(self, **kwargs):
+        def chunks():
+            for chunk in fake_completion_stream(self.text[:self.fail_after], chunk_size=8):
+                yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=chunk))])
+            raise ConnectionError("stream reset")
+        return chunks()
+
+
+def test_upstream_failure_mid_stream_falls_back_to_the_mock_plan():
+    text = json.dumps(PLAN)
+    first_block_end = text.index(json.dumps(BLOCKS[0])) + len(json.dumps(BLOCKS[0]))
+    client = SimpleNamespace(chat=SimpleNamespace(completions=BrokenStreamCompletions(text, first_block_end + 4)))
+    service = GroqService(client=client, cache=LLMResponseCache(max_entries=4, ttl_seconds=60))
+
+    events = list(service.stream_study_plan("Math", 60, ["algebra"]))
+
+    assert [event for event, _ in events] == ['meta', 'block', 'plan']
+    assert events[1][1] == BLOCKS[0]
+    assert events[-1][1] == service._get_intelligent_mock_study_plan("Math", 60, ["algebra"])
+    assert service.breaker.failures == 1
@@ -0,0 +1,116 @@
+import json
+import os
+import random
+
+import pytest
+
+import storage
+from storage import SessionLog, SessionLogLockedError
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    return str(tmp_path / 'study_sessions.json')
+
+
+def open_log(snapshot_path, **kwargs):
+    log = SessionLog(snapshot_path, fsync=False, **kwargs)
+    return log, log.replay()
+
+
+def session(session_id, **fields):
+    return {"id": session_id, "subject": "Math", **fields}
+
+
+def test_snapshot_plus_log_replays_to_the_final_state(snapshot_path):
+    log, _ = open_log(snapshot_path, max_records=5)
+    expected = {}
+    rng = random.Random(7)
+    for step in range(200):
+        session_id = f"s{rng.randrange(20)}"
+        if session_id in expected and rng.random() < 0.3:
+            log.delete(session_id)
+            del expected[session_id]
+        else:
+            record = session(session_id, step=step)
+            log.put(record)
+            expected[session_id] = record
+    log.wait()
+
+    # Part of the history is in the snapshot, the rest still in the log
+    assert os.path.exists(snapshot_path) and os.path.exists(log.log_path)
+    assert log.read_all() == list(expected.values())
+    log.close()
+    assert open_log(snapshot_path)[1] == list(expected.values())
+
+
+def test_torn_last_line_is_dropped_and_truncated(snapshot_path):
+    log, _ = open_log(snapshot_path)
+    log.put(session("a"))
+    log.put(session("b"))
+    log.close()
+    with open(log.log_path, 'ab') as f:
+        f.write(b'{"op": "put", "record": {"id": "c"')
+    valid_size = os.path.getsize(log.log_path) - len(b'{"op": "put", "record": {"id": "c"')
+
+    log, sessions = open_log(snapshot_path)
+
+    assert [s['id'] for s in sessions] == ['a', 'b']
+    assert os.path.getsize(log.log_path) == valid_size
+    # The next append starts on a clean line
+    log.put(session("d"))
+    log.close()
+    assert [s['id'] for s in open_log(snapshot_path)[1]] == ['a', 'b', 'd']
+
+
+def test_crash_between_rename_and_snapshot_write_is_recovered(snapshot_path, monkeypatch):
+    log, _ = open_log(snapshot_path)
+    log.put(session("a"))
+    log.compact()
+    log.put(session("b"))
+    log.put(session("a", status="completed"))
+
+    def crash(file_path, sessions):
+        raise OSError("disk full")
+
+    # The log is renamed aside, then writing the new snapshot fails
+    monkeypatch.setattr(storage, '_write_snapshot', crash)
+    log.compact()
+    log.close()
+    assert os.path.exists(log.compacting_path) and not os.path.exists(log.log_path)
+    with open(snapshot_path) as f:
+        assert [s['id'] for s in json.load(f)] == ['a']
+
+    monkeypatch.undo()
+    log, sessions = open_log(snapshot_path)
+    expected = [session("a", status="completed"), session("b")]
+    assert sessions == expected
+
+    # replay finishes the interrupted compaction
+    log.wait()
+    assert not os.path.exists(log.compacting_path)
+    with open(snapshot_path) as f:
+        assert json.load(f) == expected
+    log.close()
+
+
+def test_a_second_process_gets_the_log_read_only(snapshot_path):
+    owner, _ = open_log(snapshot_path)
+    owner.put(session("a"))
+
+    other, sessions = open_log(snapshot_path)
+
+    assert owner.owner and not other.owner
+    assert [s['id'] for s in sessions] == ['a']
+    with pytest.raises(SessionLogLockedError):
+        other.put(session("b"))
+    with pytest.raises(SessionLogLockedError):
+        other.compact()
+    # The owner's log was left where it was
+    owner.put(session("c"))
+    owner.close()
+
+    successor, sessions = open_log(snapshot_path)
+    assert successor.owner
+    assert [s['id'] for s in sessions] == ['a', 'c']
+    successor.close()
@@ -0,0 +1,102 @@
+import base64
+import json
+
+import pytest
+
+from config import Config
+from storage import JsonFileBackend, SessionStore, encode_cursor
+
+# Three sessions share each start time, so only the id breaks the tie
+SESSIONS = [
+    {"id": f"s{n:02d}", "subject": "Math" if n % 2 else "Physics",
+     "start_time": f"2030-01-{1 + n // 3:02d}T09:00:00"}
+    for n in (7, 2, 11, 0, 5, 9, 1, 10, 4, 8, 3, 6)
+]
+IDS = sorted(s['id'] for s in SESSIONS)  # same order as (start_time, id) here
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SessionStore(str(tmp_path / 'study_sessions.json'), mode='snapshot', backend=JsonFileBackend())
+    for session in SESSIONS:
+        store.create(dict(session))
+    return store
+
+
+def walk(store, limit, **filters):
+    """Follow next cursors to the end; returns the ids of each page"""
+    pages, cursor = [], None
+    while True:
+        sessions, cursor = store.page(limit=limit, cursor=cursor, **filters)
+        pages.append([s['id'] for s in sessions])
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.parametrize('limit', [1, 2, 4, 5])
+def test_ties_on_start_time_are_paged_by_id_without_gaps(store, limit):
+    ascending = walk(store, limit)
+    descending = walk(store, limit, descending=True)
+
+    assert [i for page in ascending for i in page] == IDS
+    assert [i for page in descending for i in page] == IDS[::-1]
+    assert all(len(page) == limit for page in ascending[:-1])
+
+
+def test_cursor_of_a_deleted_session_still_resumes_after_it(store):
+    first, cursor = store.page(limit=4)
+    assert cursor == ('2030-01-02T09:00:00', 's03')
+
+    store.replace_all([s for s in store.all() if s['id'] != 's03'])
+
+    rest, _ = store.page(limit=4, cursor=cursor)
+    assert [s['id'] for s in rest] == ['s04', 's05', 's06', 's07']
+    back, _ = store.page(limit=2, cursor=cursor, descending=True)
+    assert [s['id'] for s in back] == ['s02', 's01']
+
+
+def test_descending_pages_stay_inside_since_and_until(store):
+    pages = walk(store, 2, since='2030-01-02', until='2030-01-04T09:00:00', descending=True)
+
+    # since is inclusive, until exclusive
+    assert pages == [['s08', 's07'], ['s06', 's05'], ['s04', 's03']]
+    assert walk(store, 2, subject='Math', since='2030-01-02', descending=True) == [['s11', 's09'], ['s07', 's05'], ['s03']]
+
+
+def test_pages_over_the_route_match_the_store(app, client):
+    store = app.extensions['study_orchestrator']['session_store']
+    expected = [s['id'] for s in store.page(descending=True)[0]]
+
+    ids, cursor = [], None
+    while True:
+        query = {'limit': 3, 'order': 'desc', 'fields': 'id'}
+        if cursor:
+            query['cursor'] = cursor
+        body = client.get('/api/study/sessions', query_string=query).get_json()
+        assert body['count'] == len(body['sessions']) <= 3
+        ids.extend(s['id'] for s in body['sessions'])
+        cursor = body['next_cursor']
+        if cursor is None:
+            break
+
+    assert ids == expected
+
+
+def bad_cursor(value):
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode()
+
+
+@pytest.mark.parametrize('query, error', [
+    ('limit=0', 'limit must be between'),
+    (f'limit={Config.SESSIONS_PAGE_MAX_LIMIT + 1}', 'limit must be between'),
+    ('limit=ten', 'limit must be an integer'),
+    ('cursor=not-base64!', 'Invalid cursor'),
+    (f'cursor={bad_cursor(["2030-01-01"])}', 'Invalid cursor'),
+    (f'cursor={bad_cursor([2030, "s01"])}', 'Invalid cursor'),
+    (f'limit=5&cursor={encode_cursor(("2030-01-01", "s01"))}&order=sideways', "order must be"),
+])
+def test_bad_paging_parameters_are_rejected(client, query, error):
+    response = client.get(f'/api/study/sessions?{query}')
+
+    assert response.status_code == 400
+    assert error in response.get_json()['error']
@@ -0,0 +1,114 @@
+import json
+
+import pytest
+
+from config import Config
+from storage import SessionStore, SQLiteBackend, migrate_json_to_sqlite
+
+SESSIONS = 'study_sessions.json'
+
+
+def session(session_id, subject="Math", **fields):
+    return {"id": session_id, "subject": subject, "start_time": f"2030-01-01T09:0{session_id[-1]}:00", **fields}
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'study.db')
+
+
+@pytest.fixture
+def backend(db_path):
+    db = SQLiteBackend(db_path)
+    yield db
+    db.close()
+
+
+def test_upsert_update_and_delete_round_trip(backend):
+    backend.upsert(SESSIONS, session("s1"), session("s2"), session("s3"))
+    backend.upsert(SESSIONS, session("s2", subject="Physics", end_time="2030-01-01T10:00:00"))
+
+    # Updated rows keep their place; the indexed columns follow the body
+    assert backend.load(SESSIONS) == [session("s1"), session("s2", subject="Physics", end_time="2030-01-01T10:00:00"),
+                                      session("s3")]
+    row = backend._conn.execute("SELECT subject, end_time FROM study_sessions WHERE id = 's2'").fetchone()
+    assert row == ("Physics", "2030-01-01T10:00:00")
+
+    assert backend.delete(SESSIONS, "s1")
+    assert not backend.delete(SESSIONS, "s1")
+    assert [s['id'] for s in backend.load(SESSIONS)] == ["s2", "s3"]
+
+
+def test_save_replaces_the_collection_and_documents(backend):
+    backend.upsert(SESSIONS, session("s1"), session("s2"))
+
+    backend.save(SESSIONS, [session("s2", status="completed"), session("s4"), {"no": "id"}])
+    assert backend.load(SESSIONS) == [session("s2", status="completed"), session("s4")]
+
+    assert backend.load('user_preferences.json') is None and not backend.exists('user_preferences.json')
+    backend.save('user_preferences.json', {"theme": "dark"})
+    backend.save('user_preferences.json', {"theme": "light", "break_minutes": 5})
+    assert backend.load('user_preferences.json') == {"theme": "light", "break_minutes": 5}
+    assert backend.exists('user_preferences.json')
+
+
+def test_store_reloads_after_another_connection_commits(backend, db_path):
+    store = SessionStore(SESSIONS, backend=backend)
+    store.create(session("s1"))
+    version = backend.data_version()
+
+    # Our own commits don't count as foreign changes
+    assert store._db_version == version
+
+    other = SQLiteBackend(db_path)
+    other.upsert(SESSIONS, session("s2"), session("s1", status="completed"))
+    assert backend.data_version() != version
+
+    assert store.get("s1")["status"] == "completed"
+    assert [s['id'] for s in store.all()] == ["s1", "s2"]
+
+    other.delete(SESSIONS, "s2")
+    assert store.get("s2") is None and [s['id'] for s in store.all()] == ["s1"]
+    other.close()
+
+
+@pytest.fixture
+def json_files(tmp_path, monkeypatch):
+    files = {name: str(tmp_path / f"{name}.json")
+             for name in ('study_sessions', 'calendar_events', 'user_preferences')}
+    monkeypatch.setattr(Config, 'STUDY_SESSIONS_FILE', files['study_sessions'])
+    monkeypatch.setattr(Config, 'CALENDAR_EVENTS_FILE', files['calendar_events'])
+    monkeypatch.setattr(Config, 'USER_PREFERENCES_FILE', files['user_preferences'])
+
+    def write(name, data):
+        with open(files[name], 'w') as f:
+            json.dump(data, f)
+    write('study_sessions', [session("s1"), session("s2")])
+    write('calendar_events', [{"id": "e1", "title": "Review", "start_time": "2030-01-01T09:00:00"}])
+    write('user_preferences', {"theme": "dark"})
+    return write
+
+
+def test_migration_runs_once_per_database(backend, json_files):
+    assert migrate_json_to_sqlite(backend) == {"study_sessions": 2, "calendar_events": 1, "user_preferences": 1}
+    assert backend.get_meta('migrated_from_json')
+
+    # Later JSON changes are not copied again, so they can't clobber SQLite data
+    backend.upsert(Config.STUDY_SESSIONS_FILE, session("s3"))
+    json_files('study_sessions', [session("s9")])
+    assert migrate_json_to_sqlite(backend) == {}
+    assert [s['id'] for s in backend.load(Config.STUDY_SESSIONS_FILE)] == ["s1", "s2", "s3"]
+
+    assert migrate_json_to_sqlite(backend, force=True)["study_sessions"] == 1
+    assert [s['id'] for s in backend.load(Config.STUDY_SESSIONS_FILE)] == ["s9"]
+
+
+def test_migration_is_recorded_in_the_database_file(db_path, json_files):
+    first = SQLiteBackend(db_path)
+    migrate_json_to_sqlite(first)
+    first.close()
+
+    reopened = SQLiteBackend(db_path)
+    assert migrate_json_to_sqlite(reopened) == {}
+    assert reopened.load(Config.USER_PREFERENCES_FILE) == {"theme": "dark"}
+    reopened.close()
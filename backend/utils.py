@@ -1,44 +1,236 @@
+import csv
+import io
 import json
 import os
-from typing import Any, Dict, List
+import threading
+import zlib
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
 from datetime import datetime
 
-def load_json_data(file_path: str) -> List[Dict[str, Any]]:
-    """Load JSON data from file, return empty list if file doesn't exist"""
+# Read-through cache of parsed JSON files: abspath -> ((st_mtime_ns, st_size), data)
+_json_cache: Dict[str, Tuple[Tuple[int, int], Any]] = {}
+_json_cache_lock = threading.Lock()
+
+def _use_json_files() -> bool:
+    """Check whether data lives in flat JSON files (Config.STORAGE_BACKEND)"""
+    from config import Config
+    return Config.STORAGE_BACKEND == 'json'
+
+def _json_key(key: Any) -> str:
+    """Convert a dict key the way json.dump does"""
+    if isinstance(key, str):
+        return key
+    if key is True:
+        return 'true'
+    if key is False:
+        return 'false'
+    if key is None:
+        return 'null'
+    return str(key)
+
+def _read_only(self, *args, **kwargs):
+    raise TypeError("Cached JSON data is read-only; load it with mutable=True to change it")
+
+class FrozenDict(dict):
+    """dict that refuses mutation, handed out by the JSON read cache"""
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _read_only
+    __ior__ = _read_only
+
+    def __reduce__(self):
+        return (dict, (dict(self),))
+
+class FrozenList(list):
+    """list that refuses mutation, handed out by the JSON read cache"""
+    __setitem__ = __delitem__ = append = extend = insert = pop = remove = clear = _read_only
+    sort = reverse = __iadd__ = __imul__ = _read_only
+
+    def __reduce__(self):
+        return (list, (list(self),))
+
+def freeze_json(data: Any) -> Any:
+    """Convert a JSON structure to read-only containers, the way json.dump(default=str) would see it"""
+    if isinstance(data, dict):
+        return FrozenDict((_json_key(k), freeze_json(v)) for k, v in data.items())
+    if isinstance(data, (list, tuple)):
+        return FrozenList(freeze_json(v) for v in data)
+    if data is None or isinstance(data, (str, int, float, bool)):
+        return data
+    return str(data)
+
+def thaw_json(data: Any) -> Any:
+    """Return a mutable deep copy of (possibly read-only) JSON data"""
+    if isinstance(data, dict):
+        return {k: thaw_json(v) for k, v in data.items()}
+    if isinstance(data, list):
+        return [thaw_json(v) for v in data]
+    return data
+
+def _file_signature(file_path: str) -> Tuple[int, int]:
+    stat = os.stat(file_path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+def clear_json_cache():
+    """Drop all cached JSON file contents"""
+    with _json_cache_lock:
+        _json_cache.clear()
+
+def read_json_file(file_path: str) -> Any:
+    """Read a JSON file, return None if it doesn't exist.
+
+    Parsed contents are cached per path and revalidated against the file's
+    (st_mtime_ns, st_size) on every call. All callers share the same
+    read-only structure, so nobody can change what another caller sees.
+    """
+    key = os.path.abspath(file_path)
     try:
-        if os.path.exists(file_path):
-            with open(file_path, 'r') as f:
-                data = json.load(f)
-                return data if isinstance(data, list) else []
-        return []
+        signature = _file_signature(file_path)
+    except FileNotFoundError:
+        with _json_cache_lock:
+            _json_cache.pop(key, None)
+        return None
+    
+    with _json_cache_lock:
+        cached = _json_cache.get(key)
+    if cached and cached[0] == signature:
+        return cached[1]
+    
+    with open(file_path, 'r') as f:
+        data = freeze_json(json.load(f))
+    with _json_cache_lock:
+        _json_cache[key] = (signature, data)
+    return data
+
+def write_json_file(file_path: str, data: Any):
+    """Write data to a JSON file and refresh its cache entry"""
+    # Create directory if it doesn't exist
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    
+    cached_data = freeze_json(data)
+    key = os.path.abspath(file_path)
+    with _json_cache_lock:
+        _json_cache.pop(key, None)
+        with open(file_path, 'w') as f:
+            json.dump(cached_data, f, indent=2)
+        _json_cache[key] = (_file_signature(file_path), cached_data)
+
+def load_json_data(file_path: str, mutable: bool = False) -> List[Dict[str, Any]]:
+    """Load JSON data from the configured storage backend, return empty list if missing.
+
+    JSON files are served from a shared read-only cache; pass ``mutable=True``
+    to get a private copy that can be changed.
+    """
+    try:
+        if _use_json_files():
+            data = read_json_file(file_path)
+            if mutable:
+                data = thaw_json(data)
+        else:
+            from storage import get_storage_backend
+            data = get_storage_backend().load(file_path)
+        return data if isinstance(data, list) else []
     except Exception as e:
         print(f"Error loading JSON data from {file_path}: {e}")
         return []
 
+def load_json_document(file_path: str, mutable: bool = False) -> Dict[str, Any]:
+    """Like load_json_data for files holding one JSON object (preferences);
+    returns an empty dict if missing"""
+    try:
+        if _use_json_files():
+            data = read_json_file(file_path)
+            if mutable:
+                data = thaw_json(data)
+        else:
+            from storage import get_storage_backend
+            data = get_storage_backend().load(file_path)
+        return data if isinstance(data, dict) else {}
+    except Exception as e:
+        print(f"Error loading JSON data from {file_path}: {e}")
+        return {}
+
 def save_json_data(file_path: str, data: Any) -> bool:
-    """Save JSON data to file"""
+    """Save JSON data to the configured storage backend"""
     try:
-        # Create directory if it doesn't exist
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
-        
-        with open(file_path, 'w') as f:
-            json.dump(data, f, indent=2, default=str)
+        if _use_json_files():
+            write_json_file(file_path, data)
+        else:
+            from storage import get_storage_backend
+            get_storage_backend().save(file_path, data)
         return True
     except Exception as e:
         print(f"Error saving JSON data to {file_path}: {e}")
         return False
 
+def data_exists(file_path: str) -> bool:
+    """Check whether data for a file path exists in the configured storage backend"""
+    if _use_json_files():
+        return os.path.exists(file_path)
+    from storage import get_storage_backend
+    return get_storage_backend().exists(file_path)
+
+# Export streams are flushed to the client in chunks of roughly this size
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+def iter_ndjson(records: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """Serialize records as newline-delimited JSON, yielding ~64KB chunks"""
+    buffer, size = [], 0
+    for record in records:
+        line = json.dumps(record, default=str) + '\n'
+        buffer.append(line)
+        size += len(line)
+        if size >= EXPORT_CHUNK_SIZE:
+            yield ''.join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield ''.join(buffer)
+
+def iter_csv(records: Iterable[Dict[str, Any]], columns: List[str]) -> Iterator[str]:
+    """Serialize records as CSV with a header row, yielding ~64KB chunks.
+
+    List and dict values are written as JSON strings.
+    """
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(columns)
+    for record in records:
+        row = []
+        for column in columns:
+            value = record.get(column)
+            if isinstance(value, (list, dict)):
+                value = json.dumps(value, default=str)
+            row.append('' if value is None else value)
+        writer.writerow(row)
+        if output.tell() >= EXPORT_CHUNK_SIZE:
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate()
+    if output.tell():
+        yield output.getvalue()
+
+def gzip_chunks(chunks: Iterable[str]) -> Iterator[bytes]:
+    """Gzip-compress a stream of text chunks incrementally"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+def format_sse(event: str, data: Any) -> str:
+    """One Server-Sent Events message with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
 def initialize_data_files():
     """Initialize required data files with default structure"""
     
     # Initialize study sessions file
     sessions_file = "data/study_sessions.json"
-    if not os.path.exists(sessions_file):
+    if not data_exists(sessions_file):
         save_json_data(sessions_file, [])
     
     # Initialize user preferences file
     preferences_file = "data/user_preferences.json"
-    if not os.path.exists(preferences_file):
+    if not data_exists(preferences_file):
         default_preferences = {
             "default_study_duration": 25,
             "default_break_duration": 5,
@@ -63,7 +255,7 @@ def initialize_data_files():
     
     # Initialize calendar events file
     calendar_file = "data/calendar_events.json"
-    if not os.path.exists(calendar_file):
+    if not data_exists(calendar_file):
         save_json_data(calendar_file, [])
     
     print("Data files initialized successfully")
@@ -170,10 +362,12 @@ def get_study_statistics(sessions: List[Dict[str, Any]]) -> Dict[str, Any]:
 def clean_old_sessions(max_age_days: int = 30):
     """Clean up old session data"""
     try:
-        from config import Config
-        sessions_data = load_json_data(Config.STUDY_SESSIONS_FILE)
+        from datetime import timedelta
+        from storage import get_session_store
+        session_store = get_session_store()
+        sessions_data = session_store.all()
         
-        cutoff_date = datetime.now() - datetime.timedelta(days=max_age_days)
+        cutoff_date = datetime.now() - timedelta(days=max_age_days)
         
         # Filter sessions newer than cutoff date
         filtered_sessions = []
@@ -183,7 +377,7 @@ def clean_old_sessions(max_age_days: int = 30):
                 if session_date >= cutoff_date:
                     filtered_sessions.append(session)
         
-        save_json_data(Config.STUDY_SESSIONS_FILE, filtered_sessions)
+        session_store.replace_all(filtered_sessions)
         print(f"Cleaned {len(sessions_data) - len(filtered_sessions)} old sessions")
         
     except Exception as e:
@@ -200,6 +394,10 @@ def export_data_backup(backup_dir: str = "backups"):
         backup_path = os.path.join(backup_dir, f"backup_{timestamp}")
         os.makedirs(backup_path, exist_ok=True)
         
+        # Fold pending session log records into the sessions file first
+        from storage import get_session_store
+        get_session_store().compact()
+        
         # Copy data files
         data_files = [
             Config.STUDY_SESSIONS_FILE,
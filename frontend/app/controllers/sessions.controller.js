@@ -65,9 +65,18 @@ function($scope, $interval, ApiService, NotificationService) {
             goals: session.goals || []
         };
 
-        ApiService.generateStudyPlan(planData).then(function(response) {
-            session.studyPlan = response.data;
+        // Show study blocks as they stream in, falling back to the plain request
+        session.studyPlan = { study_blocks: [] };
+        ApiService.streamStudyPlan(planData, function(block) {
+            session.studyPlan.study_blocks.push(block);
+        }).then(function(plan) {
+            session.studyPlan = plan;
             NotificationService.success('AI study plan generated');
+        }).catch(function() {
+            return ApiService.generateStudyPlan(planData).then(function(response) {
+                session.studyPlan = response.data;
+                NotificationService.success('AI study plan generated');
+            });
         }).catch(function(error) {
             NotificationService.warning('Could not generate AI study plan');
         });
@@ -1,5 +1,5 @@
 angular.module('studyOrchestratorApp')
-.service('ApiService', ['$http', '$q', function($http, $q) {
+.service('ApiService', ['$http', '$q', '$rootScope', function($http, $q, $rootScope) {
     var baseUrl = 'http://localhost:5000/api';
     var service = {};
 
@@ -57,6 +57,47 @@ angular.module('studyOrchestratorApp')
         return apiCall('POST', '/study/plan', planData);
     };
 
+    // Streams a study plan over Server-Sent Events. onBlock is called with
+    // each study block as soon as the backend has parsed it; the promise
+    // resolves with the complete plan.
+    service.streamStudyPlan = function(planData, onBlock) {
+        var deferred = $q.defer();
+        if (!window.EventSource) {
+            deferred.reject(new Error('EventSource not supported'));
+            return deferred.promise;
+        }
+
+        var url = baseUrl + '/study/plan/stream' +
+            '?subject=' + encodeURIComponent(planData.subject) +
+            '&duration=' + encodeURIComponent(planData.duration || 25) +
+            '&goals=' + encodeURIComponent((planData.goals || []).join(','));
+        var source = new EventSource(url);
+
+        source.addEventListener('block', function(event) {
+            var block = JSON.parse(event.data);
+            $rootScope.$applyAsync(function() {
+                if (onBlock) {
+                    onBlock(block);
+                }
+            });
+        });
+        source.addEventListener('plan', function(event) {
+            source.close();
+            var plan = JSON.parse(event.data);
+            $rootScope.$applyAsync(function() {
+                deferred.resolve(plan);
+            });
+        });
+        source.onerror = function(error) {
+            source.close();
+            $rootScope.$applyAsync(function() {
+                deferred.reject(error);
+            });
+        };
+
+        return deferred.promise;
+    };
+
     // Analytics endpoints
     service.getAnalytics = function() {
         return apiCall('GET', '/study/analytics');